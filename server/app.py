@@ -1,15 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 import asyncio
 
 from utils.db import db
+from utils.inference_backend import InferenceUnavailableError, inference_backend
+from utils.generation_scheduler import get_generation_scheduler
+from utils.metrics import MetricsMiddleware, render_metrics
+from utils.parse_pool import get_parse_pool
+from utils.task_queue import get_task_queue
 from view.UserView import router as user_router
 from view.ProjectView import router as project_router
 from view.FileView import router as file_router
 from view.AuthView import router as auth_router
 from view.DocumentationView import router as documentation_router
+from view.TaskView import router as task_router
+from controller.TaskController import task_worker
 
 # Set up logging
 logging.basicConfig(
@@ -28,12 +35,25 @@ async def app_lifespan(app: FastAPI):
     try:
         await db.connect_to_database(app)
         print("Database connection established.")
-        print("Documentation service using Hugging Face Inference API.")
+        try:
+            await inference_backend.start()
+            print(f"Documentation service using the '{inference_backend.name}' inference backend.")
+        except InferenceUnavailableError as e:
+            # Requests fall back to basic docstrings until the backend is usable
+            print(f"Inference backend '{inference_backend.name}' unavailable: {str(e)}")
+        # Resume queued and interrupted background tasks
+        task_worker.start()
         
         # This special yield pattern is required for Python 3.13 compatibility
         yield
     # Clean up resources when the app stops
     finally:
+        # Hand running background tasks back to the queue before their resources go away
+        await task_worker.stop()
+        # Release pooled connections, batchers and worker pools
+        await inference_backend.close()
+        print("Inference backend closed.")
+        get_parse_pool().close()
         # Disconnect from database
         await db.close_database_connection()
         print("Database connection closed.")
@@ -63,13 +83,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every request by route template for /metrics
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Python Documentation Generator API!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose metrics in the Prometheus text format."""
+    queued_tasks = None
+    try:
+        queued_tasks = await get_task_queue().count_by_status()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not count tasks for metrics: {str(e)}")
+    body, content_type = render_metrics(queued_tasks, get_generation_scheduler().get_state()["queued"])
+    return Response(content=body, media_type=content_type)
+
 # Include routers
 app.include_router(auth_router, prefix="/api", tags=["authentication"])
 app.include_router(user_router, prefix="/api", tags=["users"])
 app.include_router(project_router, prefix="/api", tags=["projects"])
 app.include_router(file_router, prefix="/api", tags=["files"])
-app.include_router(documentation_router, prefix="/api", tags=["documentation"])
\ No newline at end of file
+app.include_router(documentation_router, prefix="/api", tags=["documentation"])
+app.include_router(task_router, prefix="/api", tags=["tasks"])
\ No newline at end of file
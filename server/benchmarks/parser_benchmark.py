@@ -0,0 +1,255 @@
+"""
+Parser benchmarks on synthetic modules.
+
+Measures wall time, peak memory and output size of CodeParserService
+(parse_code and parse_file) and ASTEnhancedDocGenerator (ast_to_dict and
+flatten_ast_data) on generated modules, from a small realistic file up to
+10k top-level functions, deeply nested classes and huge literal tables.
+
+Results are compared with a stored baseline; the run fails when a
+measurement regresses by more than the tolerance. Timings depend on the
+machine, so record the baseline where you compare:
+
+    python -m benchmarks.parser_benchmark --update-baseline
+    python -m benchmarks.parser_benchmark
+"""
+import argparse
+import ast
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.ast_enhancer import ASTEnhancedDocGenerator
+from utils.parser import CodeParserService
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser_baseline.json")
+METRICS = ("seconds", "peak_kib", "output_bytes")
+
+
+def function_source(name: str, indent: str = "") -> str:
+    """A function with the statements the parser and the AST enhancer look at."""
+    lines = [
+        "@cached",
+        f"def {name}(self, items, limit=10, *args, **kwargs):",
+        '    """Process items up to a limit."""',
+        "    total = 0",
+        "    for item in items:",
+        "        if item > limit and not kwargs.get('strict'):",
+        "            raise ValueError(item)",
+        "        total += transform(item)  # running total",
+        "    try:",
+        "        return normalize(total)",
+        "    except ArithmeticError:",
+        "        return None",
+    ]
+    return "\n".join(indent + line for line in lines) + "\n"
+
+
+def small_module() -> str:
+    """A realistic module: 50 functions and 5 classes of 8 methods."""
+    parts = ["import os\nfrom typing import Any\n\n"]
+    parts += [function_source(f"helper_{i}") + "\n" for i in range(50)]
+    for c in range(5):
+        parts.append(f"class Service{c}(Base):\n    \"\"\"A service.\"\"\"\n\n")
+        parts += [function_source(f"method_{m}", "    ") + "\n" for m in range(8)]
+    return "".join(parts)
+
+
+def many_functions_module(count: int = 10_000) -> str:
+    """A module with thousands of top-level functions."""
+    return "\n".join(function_source(f"function_{i}") for i in range(count))
+
+
+def nested_classes_module(depth: int = 50, breadth: int = 20) -> str:
+    """Classes nested `depth` levels deep, repeated `breadth` times, with methods at every level."""
+    parts = []
+    for b in range(breadth):
+        for level in range(depth):
+            indent = "    " * level
+            parts.append(f"{indent}class Level{b}_{level}(Base{level}):\n")
+            parts.append(function_source(f"method_{level}", indent + "    "))
+        parts.append("\n")
+    return "".join(parts)
+
+
+def literal_table_module(rows: int = 100_000) -> str:
+    """A generated lookup table: one huge dict literal and a few functions using it."""
+    entries = "".join(f"    'key_{i}': ({i}, 'value_{i}', {i * 0.5}),\n" for i in range(rows))
+    functions = "".join(function_source(f"lookup_{i}") + "\n" for i in range(10))
+    return f"TABLE = {{\n{entries}}}\n\n{functions}"
+
+
+# name -> source generator
+CASES: Dict[str, Callable[[], str]] = {
+    "small": small_module,
+    "functions_10k": many_functions_module,
+    "nested_classes": nested_classes_module,
+    "literal_table": literal_table_module,
+}
+
+
+def json_size(value: Any) -> int:
+    """Size of a result as it would be stored or sent."""
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+def build_targets(code: str, file_path: str) -> Dict[str, Callable[[], Any]]:
+    """Zero-argument callables for each benchmarked function, with their inputs prepared."""
+    parser = CodeParserService()
+    enhancer = ASTEnhancedDocGenerator()
+    tree = ast.parse(code)
+    ast_data = {"type": "Module", "body": enhancer.ast_to_dict(tree)}
+    return {
+        "parse_code": lambda: parser.parse_code(code),
+        "parse_file": lambda: parser.parse_file(file_path),
+        "ast_to_dict": lambda: enhancer.ast_to_dict(tree),
+        "flatten_ast_data": lambda: enhancer.flatten_ast_data(ast_data),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Measure one callable.
+
+    Time is the fastest of `repeat` runs (as with timeit, slower runs measure
+    other load on the machine); peak memory comes from one extra run under
+    tracemalloc, which would distort the timings.
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        del result
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    output_bytes = json_size(result)
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(min(timings), 4),
+        "peak_kib": round(peak / 1024, 1),
+        "output_bytes": output_bytes,
+    }
+
+
+def run_benchmarks(case_names: List[str], repeat: int) -> Dict[str, Any]:
+    """Run every target on every selected case."""
+    results = {}
+    for name in case_names:
+        code = CASES[name]()
+        with tempfile.NamedTemporaryFile("w", suffix=".py", encoding="utf-8", delete=False) as file:
+            file.write(code)
+        try:
+            results[name] = {"source_bytes": len(code.encode("utf-8"))}
+            for target, fn in build_targets(code, file.name).items():
+                results[name][target] = measure(fn, repeat)
+                print(f"{name:16} {target:18} " + "  ".join(
+                    f"{metric}={value}" for metric, value in results[name][target].items()
+                ), flush=True)
+        finally:
+            os.remove(file.name)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": results,
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float,
+    size_tolerance: float,
+    min_seconds: float,
+) -> List[str]:
+    """
+    Find measurements that got worse than the baseline by more than their tolerance.
+
+    Timings vary with the load on the machine, so they get a wider tolerance
+    than memory and output size, which barely move between runs. Timings
+    below `min_seconds` in both runs are ignored, being mostly noise.
+    """
+    regressions = []
+    for case, targets in results["cases"].items():
+        for target, measured in targets.items():
+            expected = baseline.get("cases", {}).get(case, {}).get(target)
+            if not isinstance(measured, dict) or not isinstance(expected, dict):
+                continue
+            for metric in METRICS:
+                old, new = expected.get(metric), measured.get(metric)
+                if old is None or new is None:
+                    continue
+                if metric == "seconds" and max(old, new) < min_seconds:
+                    continue
+                tolerance = time_tolerance if metric == "seconds" else size_tolerance
+                if new > old * (1 + tolerance):
+                    change = (new / old - 1) * 100 if old else float("inf")
+                    regressions.append(f"{case}/{target} {metric}: {old} -> {new} (+{change:.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the code parser on synthetic modules")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES), help="Cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed slowdown as a fraction")
+    parser.add_argument("--size-tolerance", type=float, default=0.1, help="Allowed growth of peak memory and output size as a fraction")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="Ignore timing changes below this")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.cases, max(1, args.repeat))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+        # Keep cases that were not run this time
+        baseline.update({key: value for key, value in results.items() if key != "cases"})
+        baseline.setdefault("cases", {}).update(results["cases"])
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.time_tolerance, args.size_tolerance, args.min_seconds)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
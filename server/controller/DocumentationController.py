@@ -3,6 +3,7 @@ import asyncio
 import logging
 import os
 import json
+import time
 from fastapi import HTTPException, Depends
 from model.Documentation import (
     DocstringRequest,
@@ -24,10 +25,19 @@ from controller.ProjectController import (
 from utils.db import get_db, get_transaction_session
 from utils.document_helper import prepare_document_for_response, create_document_model
 from bson import ObjectId
-import httpx
-from typing import Optional, List
+from pymongo import UpdateOne
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, List
 from dotenv import load_dotenv
-from utils.parser import CodeParserService
+from utils.parser import CodeParserService, get_source_slicer
+from utils.inference_backend import InferenceBackend, InferenceUnavailableError, get_inference_backend
+from utils.docstring_cache import get_docstring_cache, hash_code, make_cache_key
+from utils.single_flight import SingleFlight
+from utils.circuit_breaker import get_circuit_breaker
+from utils.generation_scheduler import GenerationPriority, get_generation_scheduler
+from utils.adaptive_limiter import get_inference_limiter
+from utils.hedging import get_inference_hedger
+from utils.local_docstring import get_local_docstring_generator
+from utils.metrics import count_fallback, observe_inference, set_item_type, track_generation
 import json
 
 
@@ -35,16 +45,17 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-HUGGINGFACE_ENDPOINT = os.getenv('HUGGINGFACE_ENDPOINT')
-HUGGINGFACE_TOKEN = os.getenv('HUGGINGFACE_TOKEN')
-
 code_parser = CodeParserService()
 
-# Retry configuration for cold start handling
-MAX_RETRIES = 10  # Increased to 10 attempts
-INITIAL_RETRY_DELAY = 10.0  # Constant 10 seconds
-MAX_RETRY_DELAY = 10.0  # Keep it constant at 10 seconds
-COLD_START_TIMEOUT = 180  # Increase total timeout to 3 minutes
+# Registry of in-flight generations, keyed by normalized code hash
+generation_flights = SingleFlight()
+# Background generations that upgrade drafts returned to interactive callers
+draft_upgrades = set()
+
+# Maximum number of items generated concurrently within one file
+ITEM_CONCURRENCY = int(os.getenv("DOC_ITEM_CONCURRENCY", "8"))
+# Maximum number of files documented concurrently in parallel project runs
+FILE_CONCURRENCY = int(os.getenv("DOC_FILE_CONCURRENCY", "4"))
 
 def is_file_excluded(file_doc: dict, project_exclusions: dict, use_defaults: bool = True) -> bool:
     """Check if a file should be excluded from documentation."""
@@ -133,13 +144,26 @@ def is_code_item_excluded(item_name: str, item_type: str, file_exclusions: dict,
     return False
 
 
-async def generate_docstring_for_code(request: DocstringRequest) -> DocstringResponse:
-    """Generate a docstring for a code snippet using HF model with cold start handling."""
+async def generate_docstring_for_code(
+    request: DocstringRequest,
+    priority: int = GenerationPriority.INTERACTIVE,
+    draft: bool = False
+) -> DocstringResponse:
+    """
+    Generate a docstring for a code snippet using the configured inference backend.
     
-    if not HUGGINGFACE_ENDPOINT or not HUGGINGFACE_TOKEN:
+    Generations are admitted by the shared scheduler in priority order, so
+    interactive requests overtake queued bulk work. With draft, a cache miss
+    returns the local AST draft right away and the model generates in the
+    background; asking again returns the cached model result.
+    """
+    backend = get_inference_backend()
+    
+    configuration_error = backend.configuration_error()
+    if configuration_error:
         raise HTTPException(
             status_code=500, 
-            detail="HuggingFace configuration not found"
+            detail=configuration_error
         )
     
     if not request.code or not request.code.strip():
@@ -148,170 +172,110 @@ async def generate_docstring_for_code(request: DocstringRequest) -> DocstringRes
             detail="Code cannot be empty"
         )
     
-    headers = {
-        "Authorization": f"Bearer {HUGGINGFACE_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    
-    # Simplified payload - let handler.py handle hyperparameters
-    payload = {
-        "inputs": request.code
-    }
+    # Serve previously generated docstrings without calling the model
+    cached_docstring = await get_docstring_cache().get(request.code, backend.model_id)
+    if cached_docstring is not None:
+        logger.debug("Docstring cache hit")
+        return DocstringResponse(
+            original_code=request.code,
+            generated_docstring=cached_docstring,
+            success=True
+        )
     
-    # Implement retry logic with constant delay
-    retry_delay = INITIAL_RETRY_DELAY  # Constant 10 seconds
-    last_error = None
+    # Identical snippets already in flight share the first caller's request
+    key = make_cache_key(request.code, backend.model_id)
     
-    async with httpx.AsyncClient(timeout=COLD_START_TIMEOUT) as client:
-        for attempt in range(MAX_RETRIES):
-            try:
-                logger.info(f"HuggingFace request attempt {attempt + 1}/{MAX_RETRIES}")
-                
-                response = await client.post(
-                    HUGGINGFACE_ENDPOINT,
-                    headers=headers,
-                    json=payload
-                )
-                
-                # Handle different response scenarios
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        
-                        # Check if model is still loading (empty response or loading message)
-                        if not result or (isinstance(result, list) and len(result) == 0):
-                            logger.warning(f"Empty response from HuggingFace (attempt {attempt + 1}), model may be loading")
-                            if attempt < MAX_RETRIES - 1:
-                                logger.info(f"Waiting {retry_delay} seconds before next attempt...")
-                                await asyncio.sleep(retry_delay)
-                                continue
-                            else:
-                                raise HTTPException(
-                                    status_code=503,
-                                    detail="Model is loading. Please try again in a few moments."
-                                )
-                        
-                        # Check for loading status in response
-                        if isinstance(result, dict) and result.get("error") and "loading" in str(result.get("error")).lower():
-                            logger.warning(f"Model loading detected (attempt {attempt + 1}): {result.get('error')}")
-                            if attempt < MAX_RETRIES - 1:
-                                logger.info(f"Waiting {retry_delay} seconds before next attempt...")
-                                await asyncio.sleep(retry_delay)
-                                continue
-                            else:
-                                raise HTTPException(
-                                    status_code=503,
-                                    detail="Model is loading. Please try again in a few moments."
-                                )
-                        
-                        # Extract generated text - simplified since handler.py processes the response
-                        generated_text = ""
-                        if isinstance(result, list) and len(result) > 0:
-                            generated_text = result[0].get("generated_text", str(result[0])).strip()
-                        elif isinstance(result, dict):
-                            generated_text = result.get("generated_text", str(result)).strip()
-                        else:
-                            generated_text = str(result).strip()
-                        
-                        if not generated_text:
-                            logger.warning(f"No generated text in response (attempt {attempt + 1})")
-                            if attempt < MAX_RETRIES - 1:
-                                logger.info(f"Waiting {retry_delay} seconds before next attempt...")
-                                await asyncio.sleep(retry_delay)
-                                continue
-                            else:
-                                generated_text = generate_fallback_docstring(request.code)
-                        
-                        # Clean up the generated docstring
-                        generated_docstring = clean_generated_docstring(generated_text, request.code)
-                        
-                        logger.info(f"✅ Successfully generated docstring after {attempt + 1} attempts")
-                        return DocstringResponse(
-                            original_code=request.code,
-                            generated_docstring=generated_docstring,
-                            success=True
-                        )
-                        
-                    except Exception as e:
-                        logger.error(f"Error parsing HuggingFace response (attempt {attempt + 1}): {str(e)}")
-                        last_error = e
-                        
-                elif response.status_code == 503:
-                    # Service unavailable - model is loading
-                    error_text = response.text
-                    logger.warning(f"HuggingFace service unavailable (attempt {attempt + 1}): {error_text}")
-                    
-                    if "loading" in error_text.lower() or "model" in error_text.lower():
-                        if attempt < MAX_RETRIES - 1:
-                            logger.info(f"Model is loading, waiting {retry_delay} seconds before retry")
-                            await asyncio.sleep(retry_delay)
-                            continue
-                        else:
-                            raise HTTPException(
-                                status_code=503,
-                                detail="Model is still loading after multiple attempts. Please try again later."
-                            )
-                    else:
-                        raise HTTPException(
-                            status_code=503,
-                            detail=f"HuggingFace service unavailable: {error_text}"
-                        )
-                        
-                else:
-                    # Other HTTP errors
-                    error_text = response.text
-                    logger.error(f"HuggingFace API error (attempt {attempt + 1}): {response.status_code} - {error_text}")
-                    
-                    if attempt < MAX_RETRIES - 1 and response.status_code in [429, 502, 503, 504]:
-                        # Retry for rate limits and server errors
-                        logger.info(f"Retrying in {retry_delay} seconds...")
-                        await asyncio.sleep(retry_delay)
-                        continue
-                    else:
-                        raise HTTPException(
-                            status_code=response.status_code,
-                            detail=f"HuggingFace API error: {error_text}"
-                        )
-                        
-            except httpx.TimeoutException:
-                logger.warning(f"Request timeout (attempt {attempt + 1})")
-                last_error = "Request timeout"
-                if attempt < MAX_RETRIES - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    await asyncio.sleep(retry_delay)
-                    continue
-                    
-            except httpx.RequestError as e:
-                logger.error(f"Request error (attempt {attempt + 1}): {str(e)}")
-                last_error = str(e)
-                if attempt < MAX_RETRIES - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    await asyncio.sleep(retry_delay)
-                    continue
-                    
-            except Exception as e:
-                logger.error(f"Unexpected error (attempt {attempt + 1}): {str(e)}")
-                last_error = str(e)
-                if attempt < MAX_RETRIES - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    await asyncio.sleep(retry_delay)
-                    continue
-                else:
-                    break
+    if draft:
+        # Nobody waits for the upgrade, so it only runs when higher classes leave room
+        upgrade = asyncio.create_task(generation_flights.do(
+            key, lambda: generate_with_backend(request, backend, GenerationPriority.SPECULATIVE, key)
+        ))
+        draft_upgrades.add(upgrade)
+        upgrade.add_done_callback(draft_upgrades.discard)
+        return DocstringResponse(
+            original_code=request.code,
+            generated_docstring=generate_fallback_docstring(request.code),
+            success=True,
+            draft=True,
+            message="Local draft; the model result will be available shortly"
+        )
     
-    # If we get here, all retries failed
-    logger.error(f"❌ All {MAX_RETRIES} attempts failed. Last error: {last_error}")
+    # A more urgent caller joining queued work lifts it to its own priority
+    get_generation_scheduler().boost(key, priority)
+    response = await generation_flights.do(key, lambda: generate_with_backend(request, backend, priority, key))
+    if response.original_code != request.code:
+        response = response.model_copy(update={"original_code": request.code})
+    return response
+
+def fallback_response(request: DocstringRequest, message: str) -> DocstringResponse:
+    """Build the response used when the model cannot produce a docstring."""
+    return DocstringResponse(
+        original_code=request.code,
+        generated_docstring=generate_fallback_docstring(request.code),
+        success=False,
+        message=message
+    )
+
+async def generate_with_backend(
+    request: DocstringRequest,
+    backend: InferenceBackend,
+    priority: int = GenerationPriority.INTERACTIVE,
+    key: Optional[str] = None
+) -> DocstringResponse:
+    """Generate, clean and cache one docstring, falling back when the backend is unavailable."""
+    try:
+        async with get_generation_scheduler().slot(priority, key):
+            started = time.perf_counter()
+            outcome = "unavailable"
+            with track_generation(backend.name):
+                try:
+                    generated_text = await backend.generate(request.code)
+                    outcome = "success"
+                finally:
+                    observe_inference(backend.name, outcome, time.perf_counter() - started)
+    except InferenceUnavailableError as e:
+        # Return a fallback response instead of failing completely
+        count_fallback(backend.name)
+        return fallback_response(request, f"{str(e)}. Generated fallback docstring.")
     
-    # Return a fallback response instead of failing completely
-    fallback_docstring = generate_fallback_docstring(request.code)
+    # Clean up the generated docstring
+    generated_docstring = clean_generated_docstring(generated_text, request.code)
+    await get_docstring_cache().set(request.code, generated_docstring, backend.model_id)
     
     return DocstringResponse(
         original_code=request.code,
-        generated_docstring=fallback_docstring,
-        success=False,
-        message=f"HuggingFace model unavailable after {MAX_RETRIES} attempts. Generated fallback docstring."
+        generated_docstring=generated_docstring,
+        success=True
     )
 
+def get_inference_status() -> dict:
+    """Get the active backend, the endpoint health state and the current concurrency limit."""
+    return {
+        "backend": get_inference_backend().get_state(),
+        "scheduler": get_generation_scheduler().get_state(),
+        "circuit_breaker": get_circuit_breaker().get_state(),
+        "concurrency_limiter": get_inference_limiter().get_state(),
+        "hedging": get_inference_hedger().get_state()
+    }
+
+def get_docstring_cache_stats() -> dict:
+    """Get hit/miss counters of the docstring cache."""
+    return get_docstring_cache().get_stats()
+
+async def invalidate_docstring_cache(model_id: Optional[str] = None) -> dict:
+    """Invalidate cached docstrings for a model version."""
+    try:
+        cache = get_docstring_cache()
+        deleted = await cache.invalidate(model_id)
+        return {
+            "model_id": model_id or cache.get_stats()["model_id"],
+            "deleted_count": deleted,
+            "success": True
+        }
+    except Exception as e:
+        logger.error(f"Error invalidating docstring cache: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Cache invalidation failed: {str(e)}")
+
 def clean_generated_docstring(generated_text: str, original_code: str) -> str:
     """Clean up the generated docstring."""
     if not generated_text:
@@ -344,7 +308,12 @@ def clean_generated_docstring(generated_text: str, original_code: str) -> str:
     return cleaned
 
 def generate_fallback_docstring(code: str) -> str:
-    """Generate a basic fallback docstring when AI generation fails."""
+    """Generate a Google-style docstring from the code's AST when AI generation fails."""
+    try:
+        return get_local_docstring_generator().generate(code)
+    except Exception as e:
+        logger.warning(f"Local docstring generation failed: {str(e)}")
+    
     try:
         lines = code.strip().split('\n')
         first_line = lines[0].strip()
@@ -362,12 +331,341 @@ def generate_fallback_docstring(code: str) -> str:
     except:
         return '"""Generated documentation."""'
 
+def get_item_code(item: dict, file_doc: dict) -> str:
+    """Get the code of a structure item, sliced from the file content by its byte range."""
+    if item.get("start_byte") is not None:
+        return get_source_slicer(file_doc.get("content", "")).slice(item["start_byte"], item["end_byte"])
+    
+    # Structures stored before byte ranges kept the code, or only line numbers
+    code = item.get("code", "")
+    if not code:
+        content = file_doc.get("content", "")
+        lines = content.split('\n')
+        start_line = item.get("line", 1) - 1
+        end_line = item.get("end_line", start_line + 1)
+        code = '\n'.join(lines[start_line:end_line])
+    return code
+
+def documentation_item_key(item_type: str, item_name: str, occurrence: int = 0) -> str:
+    """
+    Build the key of one documented item within its file.
+    
+    Qualified names are not unique: a property getter and its setter, or a
+    redefined function, share one. The occurrence counts earlier items of the
+    same type and name in source order, so the key survives lines moving.
+    """
+    return f"{item_type}:{item_name}:{occurrence}"
+
+def collect_documentation_targets(structure: dict, file_exclusions: dict, options) -> tuple[list, int]:
+    """
+    Walk a file structure in source order and collect the items to document.
+    
+    Functions come first, then each class followed by its methods. Methods
+    are independent targets: they are generated alongside their class and
+    kept even if the class fails. Each target gets an item_key that is
+    unique within the file.
+    
+    Returns:
+        Tuple of (targets, excluded_count)
+    """
+    include_private = getattr(options, 'include_private', False)
+    targets = []
+    excluded_count = 0
+    occurrences = {}
+    
+    def item_key(item_type: str, item_name: str) -> str:
+        occurrence = occurrences.get((item_type, item_name), 0)
+        occurrences[(item_type, item_name)] = occurrence + 1
+        return documentation_item_key(item_type, item_name, occurrence)
+    
+    for func in structure.get("functions", []):
+        if is_code_item_excluded(func["name"], "function", file_exclusions, use_defaults=True):
+            logger.debug(f"Skipping excluded function: {func['name']}")
+            excluded_count += 1
+            continue
+        
+        if not include_private and func["name"].startswith("_"):
+            logger.debug(f"Skipping private function: {func['name']}")
+            excluded_count += 1
+            continue
+        
+        targets.append({
+            "index": len(targets),
+            "item_type": "function",
+            "item_name": func["name"],
+            "item_key": item_key("function", func["name"]),
+            "node": func
+        })
+    
+    for cls in structure.get("classes", []):
+        if is_code_item_excluded(cls["name"], "class", file_exclusions, use_defaults=True):
+            logger.debug(f"Skipping excluded class: {cls['name']}")
+            excluded_count += 1
+            continue
+        
+        if not include_private and cls["name"].startswith("_"):
+            logger.debug(f"Skipping private class: {cls['name']}")
+            excluded_count += 1
+            continue
+        
+        targets.append({
+            "index": len(targets),
+            "item_type": "class",
+            "item_name": cls["name"],
+            "item_key": item_key("class", cls["name"]),
+            "node": cls
+        })
+        
+        for method in cls.get("methods", []):
+            method_full_name = f"{cls['name']}.{method['name']}"
+            
+            if is_code_item_excluded(method_full_name, "method", file_exclusions, use_defaults=True):
+                logger.debug(f"Skipping excluded method: {method_full_name}")
+                excluded_count += 1
+                continue
+            
+            if not include_private and method["name"].startswith("_"):
+                logger.debug(f"Skipping private method: {method_full_name}")
+                excluded_count += 1
+                continue
+            
+            targets.append({
+                "index": len(targets),
+                "item_type": "method",
+                "item_name": method_full_name,
+                "item_key": item_key("method", method_full_name),
+                "node": method
+            })
+    
+    return targets, excluded_count
+
+async def document_target(
+    target: dict,
+    file_doc: dict,
+    semaphore: asyncio.Semaphore,
+    priority: int = GenerationPriority.FILE
+) -> dict:
+    """Generate the docstring for one collected item and build its database record."""
+    node = target["node"]
+    code = get_item_code(node, file_doc)
+    # Label this item's cache lookups and generations with its type
+    set_item_type(target["item_type"])
+    
+    async with semaphore:
+        docstring_resp = await generate_docstring_for_code(DocstringRequest(code=code), priority)
+    
+    return build_item_record(target, code, docstring_resp.generated_docstring, docstring_resp.success, get_inference_backend().name)
+
+def build_item_record(target: dict, code: str, docstring: str, success: bool, model: str) -> dict:
+    """Build the database record of one documented item."""
+    node = target["node"]
+    return {
+        "item_id": str(ObjectId()),
+        "item_type": target["item_type"],
+        "item_name": target["item_name"],
+        "item_key": target["item_key"],
+        "original_code": code,
+        "code_hash": hash_code(code),
+        "generated_docstring": docstring,
+        "documented_at": datetime.now(timezone.utc),
+        "generation_success": success,
+        "ai_model_used": model,
+        "line_number": node.get("line"),
+        "end_line_number": node.get("end_line")
+    }
+
+def draft_item_record(target: dict, file_doc: dict) -> dict:
+    """Build a local AST draft of an item; the model result overwrites it when stored."""
+    code = get_item_code(target["node"], file_doc)
+    return {
+        **build_item_record(target, code, generate_fallback_docstring(code), False, "local-ast"),
+        "draft": True
+    }
+
+# Receives progress events while documentation runs (used by the streaming endpoints)
+EventCallback = Callable[[dict], Awaitable[None]]
+
+class DocumentationAborted(Exception):
+    """
+    Raised by an event listener to stop a documentation run.
+    
+    Unlike other errors it is not recorded as an item or file failure: it
+    cancels the rest of the run and propagates to the caller.
+    """
+
+async def gather_results(aws) -> list:
+    """
+    Run awaitables concurrently and return their results or exceptions in order.
+    
+    Like asyncio.gather(..., return_exceptions=True), except that a
+    DocumentationAborted or a cancellation is not returned as a result:
+    the remaining awaitables are cancelled and it is raised.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.cancelled():
+                    raise asyncio.CancelledError()
+                if isinstance(task.exception(), DocumentationAborted):
+                    raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()  # No effect on finished tasks
+        # Wait for the cancelled ones and retrieve every exception
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return [task.exception() if task.exception() is not None else task.result() for task in tasks]
+
+async def emit_event(on_event: Optional[EventCallback], event: dict):
+    """Send a progress event if a listener is attached."""
+    if on_event is not None:
+        await on_event(event)
+
+def documented_item_event(item: dict) -> dict:
+    """Convert a stored documentation item into its DocumentedItem form for events."""
+    return DocumentedItem(
+        type=item.get("item_type", "unknown"),
+        name=item.get("item_name", ""),
+        original_code=item.get("original_code", ""),
+        generated_docstring=item.get("generated_docstring", "")
+    ).model_dump()
+
+def index_documented_items(items: list) -> dict:
+    """
+    Map stored items by item_key for incremental runs.
+    
+    Items stored before item keys get one derived from their source order,
+    the same way collect_documentation_targets numbers duplicates.
+    """
+    indexed = {}
+    occurrences = {}
+    for item in items:
+        name_key = (item.get("item_type"), item.get("item_name"))
+        occurrence = occurrences.get(name_key, 0)
+        occurrences[name_key] = occurrence + 1
+        key = item.get("item_key") or documentation_item_key(*name_key, occurrence)
+        indexed[key] = item
+    return indexed
+
+def reuse_documented_item(target: dict, file_doc: dict, previous_items: dict) -> Optional[dict]:
+    """
+    Return the stored record of an unchanged item, or None if it must be regenerated.
+    
+    Items are unchanged when their normalized code hash matches; fallback
+    docstrings from failed generations are always retried.
+    """
+    previous = previous_items.get(target["item_key"])
+    if not previous or not previous.get("generation_success", False):
+        return None
+    
+    node = target["node"]
+    code = get_item_code(node, file_doc)
+    code_hash = hash_code(code)
+    if (previous.get("code_hash") or hash_code(previous.get("original_code", ""))) != code_hash:
+        return None
+    
+    # Keep the docstring, refresh where the item now sits in the file
+    return {
+        **previous,
+        "item_key": target["item_key"],
+        "original_code": code,
+        "code_hash": code_hash,
+        "line_number": node.get("line"),
+        "end_line_number": node.get("end_line")
+    }
+
+def documentation_item_update(file_id: ObjectId, project_id: ObjectId, item: dict, position: int) -> tuple[dict, dict]:
+    """Build the filter and update that upsert one documented item, keyed by file and item_key."""
+    record = {key: value for key, value in item.items() if key != "_id"}
+    record.update({"file_id": file_id, "project_id": project_id, "position": position})
+    update = {"$set": record}
+    if not record.get("draft"):
+        # A generated item replaces its draft
+        update["$unset"] = {"draft": ""}
+    return {"file_id": file_id, "item_key": item["item_key"]}, update
+
+async def store_documentation_item(db, file_id: ObjectId, project_id: ObjectId, item: dict, position: int):
+    """Upsert one documented item as soon as it completes, so partial progress survives failures."""
+    query, update = documentation_item_update(file_id, project_id, item, position)
+    await db.documentation_items.update_one(query, update, upsert=True)
+
+async def load_documentation_items(db, file_id: ObjectId, summary: Optional[dict] = None) -> list:
+    """
+    Load a file's documented items in source order.
+    
+    Falls back to the embedded documentation_items array of summaries
+    written before items were stored individually.
+    """
+    items = await db.documentation_items.find({"file_id": file_id}).sort("position", 1).to_list(length=None)
+    if not items and summary:
+        items = summary.get("documentation_items", [])
+    return items
+
+async def summarize_documentation_items(db, file_id: ObjectId, failed_count: int = 0) -> dict:
+    """
+    Derive a file's documentation counters from its stored items.
+    
+    Args:
+        db: Database instance
+        file_id: The documented file
+        failed_count: Items of the last run that raised and were not stored
+    
+    Returns:
+        Item counts by type and the generation success rate
+    """
+    def count_type(item_type: str) -> dict:
+        return {"$sum": {"$cond": [{"$eq": ["$item_type", item_type]}, 1, 0]}}
+    
+    pipeline = [
+        {"$match": {"file_id": file_id}},
+        {"$group": {
+            "_id": None,
+            "total_items": {"$sum": 1},
+            "total_functions": count_type("function"),
+            "total_classes": count_type("class"),
+            "total_methods": count_type("method"),
+            "success_count": {"$sum": {"$cond": ["$generation_success", 1, 0]}}
+        }}
+    ]
+    results = await db.documentation_items.aggregate(pipeline).to_list(length=1)
+    summary = results[0] if results else {
+        "total_items": 0, "total_functions": 0, "total_classes": 0, "total_methods": 0, "success_count": 0
+    }
+    
+    attempted = summary["total_items"] + failed_count
+    return {
+        "total_items": summary["total_items"],
+        "total_functions": summary["total_functions"],
+        "total_classes": summary["total_classes"],
+        "total_methods": summary["total_methods"],
+        "success_rate": summary["success_count"] / attempted if attempted > 0 else 1.0
+    }
+
 async def document_file_functions(
     file_id: str, 
     options: Optional[FileDocumentationRequest] = None,
-    db = Depends(get_db)
+    db = Depends(get_db),
+    on_event: Optional[EventCallback] = None,
+    priority: int = GenerationPriority.FILE
 ) -> FileDocumentationResponse:
-    """Generate documentation for all functions/classes in a file, respecting exclusions."""
+    """
+    Generate documentation for all functions/classes in a file, respecting exclusions.
+    
+    With options.incremental, stored items whose code hash still matches are
+    kept and only new or changed items are regenerated; items no longer in
+    the file are dropped. Items are stored one by one as they complete, and
+    a run interrupted before its summary was written resumes incrementally.
+    Items whose generation fails keep their stored version; if nothing could
+    be generated the run fails with a 503 and stored documentation is kept.
+    
+    If on_event is given, it receives a "file_start" event and then one "item"
+    (or "item_error") event per item as soon as that item completes. With
+    options.drafts, an "item_draft" event with the local AST draft of every
+    item to generate comes first; drafts are stored until replaced. A
+    DocumentationAborted raised by on_event stops the run and propagates.
+    """
     
     if not ObjectId.is_valid(file_id):
         raise HTTPException(status_code=400, detail="Invalid file ID")
@@ -386,17 +684,35 @@ async def document_file_functions(
             "file_id": ObjectId(file_id)
         })
         
-        if existing_docs and not getattr(options, 'regenerate', False):
+        regenerate = getattr(options, 'regenerate', False)
+        incremental = getattr(options, 'incremental', False) and not regenerate
+        
+        if existing_docs and not regenerate and not incremental:
             # Return existing documentation
             logger.info(f"Returning existing documentation for file {file_id}")
+            stored_items = await load_documentation_items(db, ObjectId(file_id), existing_docs)
+            await emit_event(on_event, {
+                "event": "file_start",
+                "file_id": file_id,
+                "file_name": file_doc["file_name"],
+                "items_total": len(stored_items)
+            })
             documented_items = []
-            for item in existing_docs.get("documentation_items", []):
+            for index, item in enumerate(stored_items):
                 documented_items.append(DocumentedItem(
                     type=item.get("item_type", "unknown"),
                     name=item.get("item_name", ""),
                     original_code=item.get("original_code", ""),
                     generated_docstring=item.get("generated_docstring", "")
                 ))
+                await emit_event(on_event, {
+                    "event": "item",
+                    "file_name": file_doc["file_name"],
+                    "item": documented_items[-1].model_dump(),
+                    "generation_success": item.get("generation_success", True),
+                    "items_done": index + 1,
+                    "items_total": len(stored_items)
+                })
             
             return FileDocumentationResponse(
                 file_name=file_doc["file_name"],
@@ -426,212 +742,178 @@ async def document_file_functions(
                 detail="File structure not available. Please reprocess the file."
             )
         
-        documented_items = []
-        documentation_items = []  # For database storage
-        success_count = 0
-        total_count = 0
-        excluded_count = 0
-        
-        # Process functions with exclusion checks
-        for func in structure.get("functions", []):
-            # Check if function should be excluded using existing defaults
-            if is_code_item_excluded(func["name"], "function", file_exclusions, use_defaults=True):
-                logger.debug(f"Skipping excluded function: {func['name']}")
-                excluded_count += 1
-                continue
-            
-            # Check include_private option
-            if not getattr(options, 'include_private', False) and func["name"].startswith("_"):
-                logger.debug(f"Skipping private function: {func['name']}")
-                excluded_count += 1
-                continue
-            
-            total_count += 1
-            try:
-                # Generate docstring for this function
-                func_code = func.get("code", "")
-                if not func_code:
-                    content = file_doc.get("content", "")
-                    lines = content.split('\n')
-                    start_line = func.get("line", 1) - 1
-                    end_line = func.get("end_line", start_line + 1)
-                    func_code = '\n'.join(lines[start_line:end_line])
-                
-                docstring_req = DocstringRequest(code=func_code)
-                docstring_resp = await generate_docstring_for_code(docstring_req)
-                
-                # Create documentation item for database
-                doc_item = {
-                    "item_id": str(ObjectId()),
-                    "item_type": "function",
-                    "item_name": func["name"],
-                    "original_code": func_code,
-                    "generated_docstring": docstring_resp.generated_docstring,
-                    "documented_at": datetime.now(timezone.utc),
-                    "generation_success": docstring_resp.success,
-                    "ai_model_used": "huggingface",
-                    "line_number": func.get("line"),
-                    "end_line_number": func.get("end_line")
-                }
-                documentation_items.append(doc_item)
-                
-                # Create response item
-                documented_items.append(DocumentedItem(
-                    type="function",
-                    name=func["name"],
-                    original_code=func_code,
-                    generated_docstring=docstring_resp.generated_docstring
-                ))
-                
-                if docstring_resp.success:
-                    success_count += 1
-                    
-            except Exception as e:
-                logger.warning(f"Failed to document function {func['name']}: {str(e)}")
-                continue
+        # Collect items in source order, then generate them concurrently
+        targets, excluded_count = collect_documentation_targets(structure, file_exclusions, options)
         
-        # Process classes and their methods with exclusion checks
-        for cls in structure.get("classes", []):
-            # Check if class should be excluded using existing defaults
-            if is_code_item_excluded(cls["name"], "class", file_exclusions, use_defaults=True):
-                logger.debug(f"Skipping excluded class: {cls['name']}")
-                excluded_count += 1
-                continue
-            
-            # Check include_private option
-            if not getattr(options, 'include_private', False) and cls["name"].startswith("_"):
-                logger.debug(f"Skipping private class: {cls['name']}")
-                excluded_count += 1
-                continue
-            
-            total_count += 1
+        # Stored items survive failed generations; incremental runs also reuse them
+        stored_items = await load_documentation_items(db, ObjectId(file_id), existing_docs)
+        stored_by_key = index_documented_items(stored_items)
+        previous_items = {}
+        if not regenerate:
+            if stored_items and not existing_docs:
+                # Items of an interrupted run were stored; resume instead of starting over
+                logger.info(f"Resuming interrupted documentation for file {file_id} ({len(stored_items)} items stored)")
+                incremental = True
+            if incremental:
+                previous_items = stored_by_key
+        reused_count = 0
+        generated_count = 0  # Items generated by the model or reused this run
+        file_oid = ObjectId(file_id)
+        project_oid = ObjectId(file_doc["project_id"])
+        
+        concurrency = getattr(options, 'max_concurrency', None) or ITEM_CONCURRENCY
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        await emit_event(on_event, {
+            "event": "file_start",
+            "file_id": file_id,
+            "file_name": file_doc["file_name"],
+            "items_total": len(targets)
+        })
+        items_done = 0
+        
+        if getattr(options, 'drafts', False):
+            # Instant local drafts for everything the model will (re)generate
+            drafts = [
+                (target, draft_item_record(target, file_doc))
+                for target in targets
+                if reuse_documented_item(target, file_doc, previous_items) is None
+            ]
+            if drafts:
+                try:
+                    await db.documentation_items.bulk_write(
+                        [
+                            UpdateOne(*documentation_item_update(file_oid, project_oid, draft, target["index"]), upsert=True)
+                            for target, draft in drafts
+                        ],
+                        ordered=False
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to store drafts for file {file_id}: {str(e)}")
+            for target, draft in drafts:
+                await emit_event(on_event, {
+                    "event": "item_draft",
+                    "file_name": file_doc["file_name"],
+                    "item": documented_item_event(draft)
+                })
+        
+        async def run_target(target: dict) -> dict:
+            """Document one item and report it as soon as it completes."""
+            nonlocal items_done, reused_count, generated_count
             try:
-                # Document class
-                cls_code = cls.get("code", "")
-                if not cls_code:
-                    content = file_doc.get("content", "")
-                    lines = content.split('\n')
-                    start_line = cls.get("line", 1) - 1
-                    end_line = cls.get("end_line", start_line + 1)
-                    cls_code = '\n'.join(lines[start_line:end_line])
-                
-                class_docstring_req = DocstringRequest(code=cls_code)
-                class_docstring_resp = await generate_docstring_for_code(class_docstring_req)
-                
-                # Create documentation item for database
-                cls_doc_item = {
-                    "item_id": str(ObjectId()),
-                    "item_type": "class",
-                    "item_name": cls["name"],
-                    "original_code": cls_code,
-                    "generated_docstring": class_docstring_resp.generated_docstring,
-                    "documented_at": datetime.now(timezone.utc),
-                    "generation_success": class_docstring_resp.success,
-                    "ai_model_used": "huggingface",
-                    "line_number": cls.get("line"),
-                    "end_line_number": cls.get("end_line")
-                }
-                documentation_items.append(cls_doc_item)
-                
-                documented_items.append(DocumentedItem(
-                    type="class",
-                    name=cls["name"],
-                    original_code=cls_code,
-                    generated_docstring=class_docstring_resp.generated_docstring
-                ))
-                
-                if class_docstring_resp.success:
-                    success_count += 1
+                result = reuse_documented_item(target, file_doc, previous_items)
+                generation_success = True
+                if result is not None:
+                    reused_count += 1
+                    previous = previous_items[target["item_key"]]
+                    # Unchanged items are only rewritten if they moved or predate per-item storage or item keys
+                    needs_store = (
+                        "file_id" not in previous
+                        or "item_key" not in previous
+                        or previous.get("position") != target["index"]
+                        or previous.get("line_number") != result["line_number"]
+                        or previous.get("end_line_number") != result["end_line_number"]
+                    )
+                else:
+                    result = await document_target(target, file_doc, semaphore, priority)
+                    generation_success = result["generation_success"]
+                    needs_store = True
+                    stored = stored_by_key.get(target["item_key"])
+                    if not generation_success and stored is not None and stored.get("generation_success"):
+                        # Keep the stored docstring rather than replace it with a fallback
+                        result = {**stored, "item_key": target["item_key"]}
+                        needs_store = "file_id" not in stored or "item_key" not in stored
+                if generation_success:
+                    generated_count += 1
                 
-                # Document methods with exclusion checks
-                for method in cls.get("methods", []):
-                    method_full_name = f"{cls['name']}.{method['name']}"
-                    
-                    # Check if method should be excluded using existing defaults
-                    if is_code_item_excluded(method_full_name, "method", file_exclusions, use_defaults=True):
-                        logger.debug(f"Skipping excluded method: {method_full_name}")
-                        excluded_count += 1
-                        continue
-                    
-                    # Check include_private option
-                    if not getattr(options, 'include_private', False) and method["name"].startswith("_"):
-                        logger.debug(f"Skipping private method: {method_full_name}")
-                        excluded_count += 1
-                        continue
-                    
-                    total_count += 1
+                if needs_store:
                     try:
-                        method_code = method.get("code", "")
-                        if not method_code:
-                            content = file_doc.get("content", "")
-                            lines = content.split('\n')
-                            start_line = method.get("line", 1) - 1
-                            end_line = method.get("end_line", start_line + 1)
-                            method_code = '\n'.join(lines[start_line:end_line])
-                        
-                        method_docstring_req = DocstringRequest(code=method_code)
-                        method_docstring_resp = await generate_docstring_for_code(method_docstring_req)
-                        
-                        # Create documentation item for database
-                        method_doc_item = {
-                            "item_id": str(ObjectId()),
-                            "item_type": "method",
-                            "item_name": method_full_name,
-                            "original_code": method_code,
-                            "generated_docstring": method_docstring_resp.generated_docstring,
-                            "documented_at": datetime.now(timezone.utc),
-                            "generation_success": method_docstring_resp.success,
-                            "ai_model_used": "huggingface",
-                            "line_number": method.get("line"),
-                            "end_line_number": method.get("end_line")
-                        }
-                        documentation_items.append(method_doc_item)
-                        
-                        documented_items.append(DocumentedItem(
-                            type="method",
-                            name=method_full_name,
-                            original_code=method_code,
-                            generated_docstring=method_docstring_resp.generated_docstring
-                        ))
-                        
-                        if method_docstring_resp.success:
-                            success_count += 1
+                        await store_documentation_item(db, file_oid, project_oid, result, target["index"])
                     except Exception as e:
-                        logger.warning(f"Failed to document method {method_full_name}: {str(e)}")
-                        continue
-                        
+                        logger.warning(f"Failed to store {target['item_type']} {target['item_name']}: {str(e)}")
+            except DocumentationAborted:
+                raise
             except Exception as e:
-                logger.warning(f"Failed to document class {cls['name']}: {str(e)}")
-                continue
+                items_done += 1
+                await emit_event(on_event, {
+                    "event": "item_error",
+                    "file_name": file_doc["file_name"],
+                    "item_type": target["item_type"],
+                    "item_name": target["item_name"],
+                    "error": str(e),
+                    "items_done": items_done,
+                    "items_total": len(targets)
+                })
+                raise
+            items_done += 1
+            await emit_event(on_event, {
+                "event": "item",
+                "file_name": file_doc["file_name"],
+                "item": documented_item_event(result),
+                "generation_success": generation_success,
+                "items_done": items_done,
+                "items_total": len(targets)
+            })
+            return result
         
-        # Calculate success rate
-        success_rate = success_count / total_count if total_count > 0 else 1.0
+        results = await gather_results(run_target(target) for target in targets)
         
-        # Store documentation in database
-        file_documentation = {
-            "file_id": ObjectId(file_id),
-            "project_id": ObjectId(file_doc["project_id"]),
-            "file_name": file_doc["file_name"],
-            "documentation_items": documentation_items,
-            "total_items": len(documentation_items),
-            "documented_at": datetime.now(timezone.utc),
-            "documentation_complete": True,
-            "total_functions": len([item for item in documentation_items if item["item_type"] == "function"]),
-            "total_classes": len([item for item in documentation_items if item["item_type"] == "class"]),
-            "total_methods": len([item for item in documentation_items if item["item_type"] == "method"]),
-            "success_rate": success_rate
-        }
+        # Reassemble results in source order; failures stay isolated per item
+        documented_items = []
+        documentation_items = []
+        failed_count = 0
+        
+        for target, result in zip(targets, results):
+            # A failed class keeps its methods; they were generated on their own
+            if isinstance(result, BaseException):
+                failed_count += 1
+                logger.warning(f"Failed to document {target['item_type']} {target['item_name']}: {str(result)}")
+                # A previously stored docstring is kept
+                result = stored_by_key.get(target["item_key"])
+                if result is None or "file_id" not in result:
+                    continue
+            
+            documentation_items.append(result)
+            documented_items.append(DocumentedItem(
+                type=result["item_type"],
+                name=result["item_name"],
+                original_code=result["original_code"],
+                generated_docstring=result["generated_docstring"]
+            ))
+        
+        if targets and generated_count == 0:
+            # Nothing was generated (e.g. the endpoint is down); stored documentation is left as it was
+            raise HTTPException(
+                status_code=503,
+                detail=f"Could not generate documentation for any of the {len(targets)} items in {file_doc['file_name']}"
+            )
         
-        # Store in database (replace if exists)
+        # Store the file summary; the items were stored as they completed
         try:
+            # Drop items no longer in the file (removed or excluded); failed items keep their stored version
+            await db.documentation_items.delete_many({
+                "file_id": file_oid,
+                "item_key": {"$nin": [target["item_key"] for target in targets]}
+            })
+            
+            file_documentation = {
+                "file_id": file_oid,
+                "project_id": project_oid,
+                "file_name": file_doc["file_name"],
+                "documented_at": datetime.now(timezone.utc),
+                "documentation_complete": True,
+                **await summarize_documentation_items(db, file_oid, failed_count)
+            }
+            
+            # Replace if exists; this also drops the embedded items array of older summaries
             await db.file_documentation.replace_one(
-                {"file_id": ObjectId(file_id)},
+                {"file_id": file_oid},
                 file_documentation,
                 upsert=True
             )
-            logger.info(f"Stored detailed documentation in database for file {file_id}")
+            logger.info(f"Stored documentation summary in database for file {file_id}")
         except Exception as e:
-            logger.warning(f"Failed to store detailed documentation: {str(e)}")
+            logger.warning(f"Failed to store documentation summary: {str(e)}")
         
         # Update file record
         try:
@@ -652,6 +934,28 @@ async def document_file_functions(
         
         logger.info(f"Generated documentation for {len(documented_items)} items in file {file_id} (excluded {excluded_count} items)")
         
+        if incremental:
+            current_keys = {target["item_key"] for target in targets}
+            removed_count = len([key for key in previous_items if key not in current_keys])
+            regenerated_count = len(targets) - reused_count
+            logger.info(
+                f"Incremental documentation for file {file_id}: {regenerated_count} regenerated, "
+                f"{reused_count} unchanged, {removed_count} removed"
+            )
+            return FileDocumentationResponse(
+                file_name=file_doc["file_name"],
+                documented_items=documented_items,
+                total_items=len(documented_items),
+                success=True,
+                message=(
+                    f"Regenerated {regenerated_count} changed items, kept {reused_count} unchanged items "
+                    f"and removed {removed_count} deleted items (excluded {excluded_count} items)"
+                ),
+                regenerated_items=regenerated_count,
+                reused_items=reused_count,
+                removed_items=removed_count
+            )
+        
         return FileDocumentationResponse(
             file_name=file_doc["file_name"],
             documented_items=documented_items,
@@ -660,8 +964,8 @@ async def document_file_functions(
             message=f"Generated and stored documentation for {len(documented_items)} items (excluded {excluded_count} items)"
         )
         
-    except HTTPException as http_ex:
-        raise http_ex
+    except (HTTPException, DocumentationAborted):
+        raise
     except Exception as e:
         logger.error(f"Error documenting file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"File documentation failed: {str(e)}")
@@ -671,9 +975,20 @@ async def document_file_functions(
 async def document_project_functions(
     project_id: str,
     options: Optional[ProjectDocumentationRequest] = None,
-    db = Depends(get_db)
+    db = Depends(get_db),
+    on_event: Optional[EventCallback] = None,
+    completed_file_ids: Optional[set] = None,
+    priority: int = GenerationPriority.PROJECT
 ) -> ProjectDocumentationResponse:
-    """Generate documentation for all files in a project, respecting exclusions."""
+    """
+    Generate documentation for all files in a project, respecting exclusions.
+    
+    If on_event is given, it receives a "start" event, every file's item
+    events (tagged with file counters) and a "file" event per finished file.
+    Files in completed_file_ids (checkpoints of an interrupted run) are
+    served from their stored documentation instead of being regenerated.
+    A DocumentationAborted raised by on_event stops the run and propagates.
+    """
     
     if not ObjectId.is_valid(project_id):
         raise HTTPException(status_code=400, detail="Invalid project ID")
@@ -733,33 +1048,88 @@ async def document_project_functions(
                 detail="All files in project are excluded from documentation"
             )
         
-        documented_files = []
-        total_items = 0
+        # Create file documentation request
+        file_options = FileDocumentationRequest(
+            include_private=getattr(options, 'include_private', False),
+            include_examples=True,
+            include_type_hints=True,
+            regenerate=False,  # Don't regenerate existing docs in project documentation
+            incremental=getattr(options, 'incremental', False),
+            drafts=getattr(options, 'drafts', False)
+        )
         
-        # Document each non-excluded file
-        for file_doc in files_to_document:
-            file_id = str(file_doc["_id"])
-            
-            try:
-                # Create file documentation request
-                file_options = FileDocumentationRequest(
-                    include_private=getattr(options, 'include_private', False),
-                    include_examples=True,
-                    include_type_hints=True,
-                    regenerate=False  # Don't regenerate existing docs in project documentation
-                )
-                
-                # Document this file
-                file_response = await document_file_functions(
-                    file_id, file_options, db
-                )
-                
-                documented_files.append(file_response)
-                total_items += file_response.total_items
-                
-            except Exception as e:
-                logger.warning(f"Failed to document file {file_doc['file_name']}: {str(e)}")
-                continue
+        # Files finished before a restart keep their stored documentation
+        completed_file_ids = completed_file_ids or set()
+        resume_options = file_options.model_copy(update={"regenerate": False, "incremental": False})
+        
+        parallel = getattr(options, 'parallel', False)
+        file_concurrency = getattr(options, 'max_concurrent_files', None) or FILE_CONCURRENCY
+        file_semaphore = asyncio.Semaphore(max(1, file_concurrency) if parallel else 1)
+        
+        files_done = 0
+        await emit_event(on_event, {
+            "event": "start",
+            "project_name": project_doc["name"],
+            "files_total": len(files_to_document)
+        })
+        
+        async def forward_file_event(event: dict):
+            """Tag a file's events with project-level progress."""
+            await emit_event(on_event, {**event, "files_done": files_done, "files_total": len(files_to_document)})
+        
+        async def document_one_file(file_doc: dict) -> Optional[FileDocumentationResponse]:
+            """Document a single file, returning None if it fails."""
+            nonlocal files_done
+            async with file_semaphore:
+                started = time.perf_counter()
+                try:
+                    file_id = str(file_doc["_id"])
+                    file_response = await document_file_functions(
+                        file_id,
+                        resume_options if file_id in completed_file_ids else file_options,
+                        db,
+                        on_event=forward_file_event if on_event else None,
+                        priority=priority
+                    )
+                    file_response.elapsed_seconds = round(time.perf_counter() - started, 3)
+                    logger.info(f"Documented file {file_doc['file_name']} in {file_response.elapsed_seconds}s")
+                    files_done += 1
+                    await forward_file_event({
+                        "event": "file",
+                        "file_id": file_id,
+                        "file_name": file_doc["file_name"],
+                        "success": True,
+                        "total_items": file_response.total_items,
+                        "elapsed_seconds": file_response.elapsed_seconds
+                    })
+                    return file_response
+                except DocumentationAborted:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Failed to document file {file_doc['file_name']}: {str(e)}")
+                    files_done += 1
+                    await forward_file_event({
+                        "event": "file",
+                        "file_id": str(file_doc["_id"]),
+                        "file_name": file_doc["file_name"],
+                        "success": False,
+                        "error": getattr(e, "detail", str(e))
+                    })
+                    return None
+        
+        # Document each non-excluded file; in parallel mode files share the
+        # global in-flight inference limit of the shared inference client
+        run_started = time.perf_counter()
+        file_responses = await gather_results(document_one_file(file_doc) for file_doc in files_to_document)
+        makespan = round(time.perf_counter() - run_started, 3)
+        
+        documented_files = [response for response in file_responses if isinstance(response, FileDocumentationResponse)]
+        total_items = sum(response.total_items for response in documented_files)
+        
+        logger.info(
+            f"Project {project_id} documentation makespan: {makespan}s "
+            f"({'parallel' if parallel else 'sequential'}, {len(documented_files)} files)"
+        )
         
         if not documented_files:
             raise HTTPException(
@@ -792,15 +1162,80 @@ async def document_project_functions(
             total_files=len(documented_files),
             total_items=total_items,
             success=True,
-            message=f"Generated documentation for {len(documented_files)} files with {total_items} total items (excluded {excluded_files_count} files)"
+            message=f"Generated documentation for {len(documented_files)} files with {total_items} total items (excluded {excluded_files_count} files)",
+            makespan_seconds=makespan
         )
         
-    except HTTPException as http_ex:
-        raise http_ex
+    except (HTTPException, DocumentationAborted):
+        raise
     except Exception as e:
         logger.error(f"Error documenting project: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Project documentation failed: {str(e)}")
 
+def format_stream_event(event: dict, stream_format: str = "ndjson") -> str:
+    """Serialize one event as an NDJSON line or a Server-Sent Events frame."""
+    data = json.dumps(event, default=str)
+    if stream_format == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
+
+async def stream_documentation(
+    run: Callable[[EventCallback], Awaitable[Any]],
+    stream_format: str = "ndjson"
+) -> AsyncIterator[str]:
+    """
+    Run a documentation job and stream its progress events.
+    
+    The job is started before the response is sent, so validation errors
+    (invalid ID, missing file, nothing to document) still surface as regular
+    HTTP errors. After that, every event is streamed as soon as it is
+    emitted and the job's response is sent as a final "summary" event.
+    
+    Args:
+        run: Starts the job, given the callback that receives its events
+        stream_format: "ndjson" or "sse"
+    
+    Returns:
+        Async iterator over the serialized events
+    """
+    queue = asyncio.Queue()
+    task = asyncio.create_task(run(queue.put))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    
+    # Wait for the first event (or an early failure) before committing to a 200
+    first_event = await queue.get()
+    if first_event is None and not task.cancelled() and task.exception() is not None:
+        raise task.exception()
+    
+    async def events() -> AsyncIterator[str]:
+        try:
+            event = first_event
+            while event is not None:
+                yield format_stream_event(event, stream_format)
+                event = await queue.get()
+            
+            try:
+                result = task.result()
+            except HTTPException as e:
+                yield format_stream_event({"event": "error", "status_code": e.status_code, "detail": e.detail}, stream_format)
+                return
+            except Exception as e:
+                yield format_stream_event({"event": "error", "status_code": 500, "detail": str(e)}, stream_format)
+                return
+            
+            # The summary repeats the counters and messages but not the items already streamed
+            if isinstance(result, ProjectDocumentationResponse):
+                summary = result.model_dump(exclude={"documented_files": {"__all__": {"documented_items"}}})
+            else:
+                summary = result.model_dump(exclude={"documented_items"})
+            yield format_stream_event({"event": "summary", **summary}, stream_format)
+        finally:
+            # Stop generating if the client disconnected mid-stream
+            if not task.done():
+                task.cancel()
+    
+    return events()
+
 async def get_file_documentation_data(file_id: str, db) -> dict:
     """Retrieve stored documentation data for a file."""
     if not ObjectId.is_valid(file_id):
@@ -819,9 +1254,10 @@ async def get_file_documentation_data(file_id: str, db) -> dict:
                 detail="No documentation found for this file. Generate documentation first."
             )
         
-        # Get stored documentation from file_documentation collection
+        # Get the stored summary and items
         docs = await db.file_documentation.find_one({"file_id": ObjectId(file_id)})
-        if not docs:
+        stored_items = await load_documentation_items(db, ObjectId(file_id), docs)
+        if not docs and not stored_items:
             # Fallback: return basic info if file is marked as documented but no detailed docs exist
             return {
                 "file_name": file_doc["file_name"],
@@ -833,7 +1269,7 @@ async def get_file_documentation_data(file_id: str, db) -> dict:
         
         # Convert stored documentation items to response format
         documented_items = []
-        for item in docs.get("documentation_items", []):
+        for item in stored_items:
             documented_items.append({
                 "type": item.get("item_type", "unknown"),
                 "name": item.get("item_name", ""),
@@ -842,9 +1278,9 @@ async def get_file_documentation_data(file_id: str, db) -> dict:
             })
 
         return {
-            "file_name": docs["file_name"],
+            "file_name": file_doc["file_name"],
             "documented_items": documented_items,
-            "total_items": docs.get("total_items", len(documented_items)),
+            "total_items": (docs or {}).get("total_items", len(documented_items)),
             "success": True,
             "message": "Retrieved stored documentation"
         }
@@ -882,17 +1318,29 @@ async def get_project_documentation_data(project_id: str, db) -> dict:
         documented_files = []
         total_items = 0
         
+        # Load all summaries and items of the project at once
+        file_ids = [file_doc["_id"] for file_doc in files]
+        summaries = {
+            docs["file_id"]: docs
+            for docs in await db.file_documentation.find({"file_id": {"$in": file_ids}}).to_list(length=None)
+        }
+        items_by_file = {}
+        project_items = db.documentation_items.find({"file_id": {"$in": file_ids}}).sort([("file_id", 1), ("position", 1)])
+        for item in await project_items.to_list(length=None):
+            items_by_file.setdefault(item["file_id"], []).append(item)
+        
         # Get documentation for each file
         for file_doc in files:
             file_id = file_doc["_id"]
             
-            # Get stored documentation
-            docs = await db.file_documentation.find_one({"file_id": file_id})
+            # Get stored documentation (older summaries embed their items)
+            docs = summaries.get(file_id)
+            stored_items = items_by_file.get(file_id) or (docs or {}).get("documentation_items", [])
             
-            if docs:
+            if docs or stored_items:
                 # Convert stored documentation items to response format
                 documented_items = []
-                for item in docs.get("documentation_items", []):
+                for item in stored_items:
                     documented_items.append({
                         "type": item.get("item_type", "unknown"),
                         "name": item.get("item_name", ""),
@@ -944,9 +1392,10 @@ async def export_file_documentation_content(file_id: str, format: str, db) -> tu
     
     try:
         # Get documentation
-        docs = await db.file_documentation.find_one({"file_id": ObjectId(file_id)})
-        if not docs:
+        summary = await db.file_documentation.find_one({"file_id": ObjectId(file_id)})
+        if not summary:
             raise HTTPException(status_code=404, detail="No documentation found for this file")
+        docs = {**summary, "documentation_items": await load_documentation_items(db, ObjectId(file_id), summary)}
         
         if format == "markdown":
             content = generate_markdown_export(docs)
@@ -15,7 +15,9 @@ from utils.custom_types import PyObjectId
 from utils.db import get_db, get_transaction_session
 from bson import ObjectId
 from datetime import datetime, timezone
-from utils.parser import CodeParserService
+from utils.parser import decode_source, get_source_slicer
+from utils.parse_cache import get_parse_cache
+from utils.parse_pool import ParseLimitError
 from typing import List
 import fnmatch
 
@@ -54,8 +56,8 @@ DEFAULT_EXCLUDED_CLASSES = [
     "_*",  # Private classes
 ]
 
-# Initialize the code parser service
-code_parser = CodeParserService()
+# Parsed structures are cached by content; misses are parsed in worker processes
+parse_cache = get_parse_cache()
 
 def matches_pattern(name: str, patterns: List[str]) -> bool:
     """Check if a name matches any of the given patterns."""
@@ -159,24 +161,14 @@ async def upload_file(project_id: str, file: UploadFile, db=Depends(get_db)):
             status_code=409, detail=f"File {safe_filename} already exists"
         )
 
-    temp_file_path = None
     try:
-        # Read file content
+        # Read file content (BOM or coding cookie decide the encoding, UTF-8 otherwise)
         content = await file.read()
-        content_str = content.decode('utf-8')
-        
-        # Create temporary file for parsing (will be deleted after processing)
-        import tempfile
-        import uuid
-        temp_file_path = os.path.join(tempfile.gettempdir(), f"temp_{uuid.uuid4()}.py")
-        
-        # Write to temporary file for parsing
-        with open(temp_file_path, "w", encoding="utf-8") as f:
-            f.write(content_str)
+        content_str = decode_source(content)
 
         try:
             # Analyze file structure using the parser
-            structure = code_parser.parse_file(temp_file_path)
+            structure = await parse_cache.parse(content_str, safe_filename)
             processed = True
         except Exception as e:
             logger.error(f"Error parsing file: {str(e)}")
@@ -266,13 +258,6 @@ async def upload_file(project_id: str, file: UploadFile, db=Depends(get_db)):
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
-    finally:
-        # Always clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-            except Exception as cleanup_e:
-                logger.warning(f"Could not clean up temp file {temp_file_path}: {str(cleanup_e)}")
 
 async def get_project_files(
     project_id: str, skip: int = 0, limit: int = 100, db=Depends(get_db)
@@ -336,6 +321,24 @@ async def get_file(file_id: str, db=Depends(get_db)):
         logger.error(f"Error retrieving file: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving file")
 
+def attach_structure_code(structure: FileStructure, content: str, include_code: bool):
+    """
+    Fill in the code of every item from its byte range in the content, or clear it.
+    
+    Structures stored before byte ranges were recorded keep their stored code.
+    """
+    slicer = get_source_slicer(content) if include_code else None
+    items = list(structure.functions)
+    for cls in structure.classes:
+        items.append(cls)
+        items.extend(cls.methods)
+    
+    for item in items:
+        if not include_code:
+            item.code = None
+        elif item.start_byte is not None:
+            item.code = slicer.slice(item.start_byte, item.end_byte)
+
 async def get_file_structure(
     file_id: str,
     include_code: bool = False,
@@ -355,86 +358,49 @@ async def get_file_structure(
         file_exclusions = file.get("excluded_classes", [])
         function_exclusions = file.get("excluded_functions", [])
 
-        # Return structure if available, or parse from content if not processed yet
+        content = file.get("content")
+
+        # Use the stored structure if available, or parse from content if not processed yet
         if file.get("processed") and file.get("structure"):
+            structure_data = file["structure"]
+        elif content:
+            # Parse structure
             try:
-                structure = FileStructure.model_validate(file["structure"])
-
-                # Remove code fields if not requested
-                if not include_code:
-                    for cls in getattr(structure, "classes", []):
-                        if hasattr(cls, "code"):
-                            cls.code = None
-                        for method in getattr(cls, "methods", []):
-                            if hasattr(method, "code"):
-                                method.code = None
-                    for func in getattr(structure, "functions", []):
-                        if hasattr(func, "code"):
-                            func.code = None
-
-                # Apply exclusions to cached structure
-                structure = apply_exclusions_to_structure(
-                    structure, file_exclusions, function_exclusions, use_default_exclusions
-                )
+                structure_data = await parse_cache.parse(content, file["file_name"])
+            except ParseLimitError as e:
+                raise HTTPException(status_code=422, detail=f"File could not be parsed: {str(e)}")
+
+            # Update the file with structure
+            async with get_transaction_session(f"Update file structure for {file_id}") as session:
+                if session:
+                    await db.files.update_one(
+                        {"_id": ObjectId(file_id)},
+                        {"$set": {"structure": structure_data, "processed": True}},
+                        session=session
+                    )
+                else:
+                    await db.files.update_one(
+                        {"_id": ObjectId(file_id)},
+                        {"$set": {"structure": structure_data, "processed": True}}
+                    )
+        else:
+            raise HTTPException(status_code=404, detail="File content not found")
 
-                return structure
-            except Exception as e:
-                logger.error(f"Error validating file structure: {str(e)}")
-                raise HTTPException(status_code=500, detail="Invalid file structure format")
+        try:
+            structure = FileStructure.model_validate(structure_data)
+        except Exception as e:
+            logger.error(f"Error validating file structure: {str(e)}")
+            raise HTTPException(status_code=500, detail="Invalid file structure format")
 
-        # If file exists but structure not processed, parse from content
-        content = file.get("content")
-        if content:
-            # Create temporary file for parsing
-            import tempfile
-            import uuid
-            temp_file_path = os.path.join(tempfile.gettempdir(), f"temp_{uuid.uuid4()}.py")
-            
-            try:
-                # Write content to temporary file
-                with open(temp_file_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-                
-                # Parse structure
-                structure = code_parser.parse_file(temp_file_path)
-
-                # Prepare structure for database
-                structure_data = structure
-                if not isinstance(structure, dict):
-                    if hasattr(structure, "model_dump"):
-                        structure_data = structure.model_dump()
-                    elif hasattr(structure, "dict"):
-                        structure_data = structure.dict()
-
-                # Update the file with structure
-                async with get_transaction_session(f"Update file structure for {file_id}") as session:
-                    if session:
-                        await db.files.update_one(
-                            {"_id": ObjectId(file_id)},
-                            {"$set": {"structure": structure_data, "processed": True}},
-                            session=session
-                        )
-                    else:
-                        await db.files.update_one(
-                            {"_id": ObjectId(file_id)},
-                            {"$set": {"structure": structure_data, "processed": True}}
-                        )
-
-                # Apply exclusions
-                structure = apply_exclusions_to_structure(
-                    structure, file_exclusions, function_exclusions, use_default_exclusions
-                )
+        # Slice code out of the content only if requested
+        attach_structure_code(structure, content or "", include_code)
 
-                return structure
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    try:
-                        os.remove(temp_file_path)
-                    except:
-                        pass
-        else:
-            raise HTTPException(status_code=404, detail="File content not found")
+        # Apply exclusions
+        structure = apply_exclusions_to_structure(
+            structure, file_exclusions, function_exclusions, use_default_exclusions
+        )
+
+        return structure
             
     except HTTPException as http_ex:
         raise http_ex
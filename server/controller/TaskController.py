@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from controller.DocumentationController import DocumentationAborted, document_project_functions
+from model.Documentation import ProjectDocumentationRequest
+from utils.db import get_db
+from utils.metrics import set_route
+from utils.task_queue import TASK_LEASE_SECONDS, TaskStatus, get_task_queue
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Background worker configuration
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "1"))  # Tasks run concurrently by this process
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "2"))
+TASK_PROGRESS_INTERVAL = 1.0  # Minimum seconds between progress writes
+
+PROJECT_DOCUMENTATION_TASK = "project_documentation"
+
+
+class DocumentationProgress:
+    """
+    Turns documentation progress events into a task's progress record.
+
+    Item totals are only known for files that have started, so the ETA is
+    based on the fraction of files done, counting started files by the
+    share of their items already finished.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.started = False
+        self.files_total = 0
+        self.files = {}
+        self.failures = []
+
+    def handle(self, event: dict):
+        """Apply one event from document_project_functions."""
+        kind = event.get("event")
+
+        if kind == "start":
+            self.started = True
+            self.files_total = event["files_total"]
+
+        elif kind == "file_start":
+            self.files[event["file_name"]] = {
+                "file_name": event["file_name"],
+                "status": TaskStatus.PROCESSING,
+                "items_done": 0,
+                "items_total": event["items_total"],
+                "items_failed": 0
+            }
+
+        elif kind in ("item", "item_error"):
+            file_progress = self.files.get(event["file_name"])
+            if file_progress is not None:
+                file_progress["items_done"] = event["items_done"]
+                if kind == "item_error" or not event.get("generation_success", True):
+                    file_progress["items_failed"] += 1
+            if kind == "item_error":
+                self.failures.append({
+                    "file_name": event["file_name"],
+                    "item_name": event["item_name"],
+                    "error": event["error"]
+                })
+
+        elif kind == "file":
+            file_progress = self.files.setdefault(event["file_name"], {
+                "file_name": event["file_name"],
+                "items_done": 0,
+                "items_total": 0,
+                "items_failed": 0
+            })
+            file_progress["elapsed_seconds"] = event.get("elapsed_seconds")
+            if event.get("success"):
+                file_progress["status"] = TaskStatus.COMPLETED
+            else:
+                file_progress["status"] = TaskStatus.FAILED
+                file_progress["error"] = event.get("error")
+                self.failures.append({"file_name": event["file_name"], "item_name": None, "error": event.get("error")})
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimate the remaining time from the progress made so far."""
+        if not self.files_total:
+            return None
+
+        done = 0.0
+        for file_progress in self.files.values():
+            if file_progress["status"] in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                done += 1
+            elif file_progress["items_total"]:
+                done += file_progress["items_done"] / file_progress["items_total"]
+
+        fraction = done / self.files_total
+        if fraction <= 0:
+            return None
+        elapsed = time.time() - self.started_at
+        return round(elapsed * (1 - fraction) / fraction, 1)
+
+    def snapshot(self) -> dict:
+        """Build the progress record stored on the task."""
+        files = list(self.files.values())
+        return {
+            "files_total": self.files_total,
+            "files_done": len([f for f in files if f["status"] in (TaskStatus.COMPLETED, TaskStatus.FAILED)]),
+            "items_done": sum(f["items_done"] for f in files),
+            "items_total": sum(f["items_total"] for f in files),
+            "items_failed": sum(f["items_failed"] for f in files),
+            "files": files,
+            "failures": self.failures,
+            "elapsed_seconds": round(time.time() - self.started_at, 1),
+            "eta_seconds": self.eta_seconds(),
+            "recorded_at": time.time()
+        }
+
+
+class LeaseLostError(DocumentationAborted):
+    """Raised when another worker took over a task this worker was running."""
+
+
+async def run_project_documentation(task: dict, worker_id: str) -> dict:
+    """
+    Run a project documentation task under its lease.
+
+    Files checkpointed by an earlier attempt are served from stored
+    documentation; every newly finished file is checkpointed.
+
+    Args:
+        task: The claimed task
+        worker_id: The worker holding the lease
+
+    Returns:
+        Summary of the project documentation run
+    """
+    task_queue = get_task_queue()
+    task_id = task["task_id"]
+    payload = task["payload"]
+    options = ProjectDocumentationRequest(**payload["options"]) if payload.get("options") else None
+    progress = DocumentationProgress()
+    last_write = 0.0
+
+    async def on_event(event: dict):
+        nonlocal last_write
+        progress.handle(event)
+
+        if event.get("event") == "file" and event.get("success"):
+            saved = await task_queue.checkpoint_file(task_id, worker_id, event["file_id"], progress.snapshot())
+        elif event.get("event") in ("start", "file") or time.monotonic() - last_write >= TASK_PROGRESS_INTERVAL:
+            saved = await task_queue.update_progress(task_id, worker_id, progress.snapshot())
+        else:
+            return
+        last_write = time.monotonic()
+        if not saved:
+            raise LeaseLostError(f"Lease on task {task_id} was lost")
+
+    result = await document_project_functions(
+        payload["project_id"],
+        options,
+        get_db(),
+        on_event=on_event,
+        completed_file_ids=set(task.get("completed_file_ids", []))
+    )
+    await task_queue.update_progress(task_id, worker_id, progress.snapshot())
+    # Items are kept in the documentation collections; the task keeps the summary
+    return result.model_dump(exclude={"documented_files": {"__all__": {"documented_items"}}})
+
+# Handlers by task type
+TASK_HANDLERS = {
+    PROJECT_DOCUMENTATION_TASK: run_project_documentation
+}
+
+
+class TaskWorker:
+    """
+    Claims tasks from the durable queue and runs them.
+
+    Each claimed task is renewed with a heartbeat every third of its lease.
+    If the lease is lost (e.g. this process stalled and another worker took
+    the task over) the local run is cancelled. On shutdown, running tasks
+    are released so another process can resume them right away.
+    """
+
+    def __init__(self, concurrency: int = TASK_WORKERS, poll_interval: float = TASK_POLL_INTERVAL):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.concurrency = max(0, concurrency)
+        self.poll_interval = poll_interval
+        self.loops = []
+        self.wakeup: Optional[asyncio.Event] = None
+        self.running = {}  # task_id -> asyncio.Task
+        self.stopping = False
+
+    def start(self):
+        """Start the polling loops."""
+        self.stopping = False
+        self.wakeup = asyncio.Event()
+        self.loops = [asyncio.create_task(self._poll()) for _ in range(self.concurrency)]
+        logger.info(f"Task worker {self.worker_id} started with {self.concurrency} slots")
+
+    def notify(self):
+        """Wake the polling loops after a task was queued by this process."""
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def stop(self):
+        """Stop polling and release running tasks."""
+        self.stopping = True
+        for loop in self.loops:
+            loop.cancel()
+        await asyncio.gather(*self.loops, return_exceptions=True)
+        self.loops = []
+
+    async def _poll(self):
+        """Claim and run tasks until stopped."""
+        task_queue = get_task_queue()
+        while True:
+            try:
+                task = await task_queue.claim_task(self.worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to claim task: {str(e)}")
+                task = None
+
+            if task is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(task)
+
+    async def _heartbeat(self, task_id: str, job: asyncio.Task):
+        """Renew a task's lease while it runs; cancel the run if the lease is lost."""
+        while True:
+            await asyncio.sleep(TASK_LEASE_SECONDS / 3)
+            try:
+                if not await get_task_queue().heartbeat(task_id, self.worker_id):
+                    logger.warning(f"Lost lease on task {task_id}, stopping local run")
+                    job.cancel()
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat for task {task_id} failed: {str(e)}")
+
+    async def _run(self, task: dict):
+        """Run one claimed task and record its outcome."""
+        task_queue = get_task_queue()
+        task_id = task["task_id"]
+        handler = TASK_HANDLERS.get(task["task_type"])
+
+        if handler is None:
+            await task_queue.fail_task(task_id, self.worker_id, f"Unknown task type: {task['task_type']}", retryable=False)
+            return
+
+        logger.info(f"Running task {task_id} (attempt {task['attempts']}/{task['max_attempts']})")
+        # Generations of background tasks are labelled with the task type instead of a route
+        set_route(f"task:{task['task_type']}")
+        job = asyncio.create_task(handler(task, self.worker_id))
+        heartbeat = asyncio.create_task(self._heartbeat(task_id, job))
+        self.running[task_id] = job
+
+        try:
+            result = await asyncio.shield(job)
+            if not await task_queue.complete_task(task_id, self.worker_id, result):
+                # Another worker took the task over; its run records the outcome
+                logger.warning(f"Lost lease on task {task_id} before it was completed")
+                return
+            logger.info(f"Task {task_id} completed")
+        except asyncio.CancelledError:
+            if self.stopping:
+                # Shutting down: hand the task back, finished files stay checkpointed
+                job.cancel()
+                await asyncio.gather(job, return_exceptions=True)
+                await task_queue.release_task(task_id, self.worker_id)
+                logger.info(f"Task {task_id} released for another worker")
+                raise
+            logger.warning(f"Task {task_id} was taken over by another worker")
+        except LeaseLostError as e:
+            logger.warning(str(e))
+        except HTTPException as e:
+            # Client errors (missing project, nothing to document) will not improve by retrying
+            status = await task_queue.fail_task(task_id, self.worker_id, str(e.detail), retryable=e.status_code >= 500)
+            logger.warning(f"Task {task_id} failed ({status}): {e.detail}")
+        except Exception as e:
+            status = await task_queue.fail_task(task_id, self.worker_id, str(e))
+            logger.error(f"Task {task_id} failed ({status}): {str(e)}")
+        finally:
+            heartbeat.cancel()
+            self.running.pop(task_id, None)
+
+# Create a singleton worker for this process
+task_worker = TaskWorker()
+
+def get_task_worker() -> TaskWorker:
+    """Get this process's task worker"""
+    return task_worker
+
+
+async def start_project_documentation_task(
+    project_id: str,
+    options: Optional[ProjectDocumentationRequest],
+    current_user: dict,
+    db
+) -> dict:
+    """
+    Queue a project documentation task.
+
+    Args:
+        project_id: The project to document
+        options: Project documentation options
+        current_user: The user starting the task
+        db: Database instance
+
+    Returns:
+        Task submission info with the task ID to poll
+    """
+    if not ObjectId.is_valid(project_id):
+        raise HTTPException(status_code=400, detail="Invalid project ID")
+
+    project_doc = await db.projects.find_one({"_id": ObjectId(project_id)}, {"_id": 1})
+    if not project_doc:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    task = await get_task_queue().add_task(
+        PROJECT_DOCUMENTATION_TASK,
+        {"project_id": project_id, "options": options.model_dump() if options else None},
+        f"Document project {project_id}",
+        owner_id=str(current_user["_id"])
+    )
+    get_task_worker().notify()
+
+    return {
+        "task_id": task["task_id"],
+        "status": task["status"],
+        "message": f"Documentation queued for project {project_id}"
+    }
+
+
+async def get_task_status(task_id: str, current_user: dict) -> dict:
+    """
+    Get the status and progress of a background task.
+
+    Args:
+        task_id: The task to look up
+        current_user: The user asking; only the task owner can see it
+
+    Returns:
+        Task data dictionary
+    """
+    task = await get_task_queue().get_task(task_id)
+    if not task or (task.get("owner_id") and task["owner_id"] != str(current_user["_id"])):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    # Progress is recorded per event; age the timings to the time of this poll
+    progress = task.get("progress", {})
+    if task["status"] == TaskStatus.PROCESSING and progress.get("elapsed_seconds") is not None:
+        since_update = max(0.0, time.time() - progress.get("recorded_at", time.time()))
+        progress = {**progress, "elapsed_seconds": round(progress["elapsed_seconds"] + since_update, 1)}
+        if progress.get("eta_seconds") is not None:
+            progress["eta_seconds"] = round(max(0.0, progress["eta_seconds"] - since_update), 1)
+        return {**task, "progress": progress}
+    return task
@@ -192,6 +192,13 @@ async def remove(user_id: str, current_user, db=Depends(get_db)):
                     )
                     deleted_resources["documentation"] = doc_result.deleted_count
                     logger.info(f"Deleted {doc_result.deleted_count} documentation records")
+                    
+                    item_result = await db.documentation_items.delete_many(
+                        {"project_id": {"$in": project_ids}}, 
+                        session=session
+                    )
+                    deleted_resources["documentation_items"] = item_result.deleted_count
+                    logger.info(f"Deleted {item_result.deleted_count} documentation items")
                 
                 # 2. Delete all files
                 if project_ids:
@@ -233,6 +240,12 @@ async def remove(user_id: str, current_user, db=Depends(get_db)):
                     )
                     deleted_resources["documentation"] = doc_result.deleted_count
                     logger.info(f"Deleted {doc_result.deleted_count} documentation records")
+                    
+                    item_result = await db.documentation_items.delete_many(
+                        {"project_id": {"$in": project_ids}}
+                    )
+                    deleted_resources["documentation_items"] = item_result.deleted_count
+                    logger.info(f"Deleted {item_result.deleted_count} documentation items")
                 
                 # 2. Delete all files
                 if project_ids:
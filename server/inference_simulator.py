@@ -0,0 +1,394 @@
+"""
+Local stand-in for the Hugging Face inference endpoint.
+
+Speaks the same payload ({"inputs": code} or a list of codes) and response
+shapes ([{"generated_text": ...}]) as the real endpoint, so the API can be
+load-tested without it:
+
+    python inference_simulator.py --port 8001
+    HUGGINGFACE_ENDPOINT=http://localhost:8001 HUGGINGFACE_TOKEN=sim uvicorn app:app
+
+Latency, cold starts, 429 bursts and error rates are configurable through
+SIM_* environment variables, command line flags, or at runtime with
+PUT /_simulator/config. In "record" mode requests are forwarded to the real
+endpoint and the responses are saved to disk; "replay" mode serves them
+back deterministically.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+SIMULATOR_MODES = ("simulate", "record", "replay")
+
+
+class SimulatorConfig(BaseModel):
+    mode: str = Field(default=os.getenv("SIM_MODE", "simulate"), pattern="^(simulate|record|replay)$")
+    seed: Optional[int] = Field(default=int(os.getenv("SIM_SEED")) if os.getenv("SIM_SEED") else None)
+
+    # Latency of one request: base distribution plus a per-input cost for batches
+    latency_distribution: str = Field(
+        default=os.getenv("SIM_LATENCY_DISTRIBUTION", "lognormal"),
+        pattern="^(constant|uniform|normal|lognormal|exponential)$"
+    )
+    latency_mean_ms: float = Field(default=float(os.getenv("SIM_LATENCY_MEAN_MS", "800")), ge=0)
+    latency_stddev_ms: float = Field(default=float(os.getenv("SIM_LATENCY_STDDEV_MS", "300")), ge=0)
+    latency_min_ms: float = Field(default=float(os.getenv("SIM_LATENCY_MIN_MS", "50")), ge=0)
+    latency_max_ms: float = Field(default=float(os.getenv("SIM_LATENCY_MAX_MS", "30000")), ge=0)
+    batch_item_ms: float = Field(default=float(os.getenv("SIM_BATCH_ITEM_MS", "150")), ge=0)
+
+    # Cold starts: 503 "loading" after startup and again after an idle period (scale to zero)
+    cold_start_seconds: float = Field(default=float(os.getenv("SIM_COLD_START_SECONDS", "0")), ge=0)
+    idle_unload_seconds: float = Field(default=float(os.getenv("SIM_IDLE_UNLOAD_SECONDS", "0")), ge=0)  # 0 never unloads
+
+    # Rate limiting: a token bucket, plus periodic windows where every request gets 429
+    rate_limit_rps: float = Field(default=float(os.getenv("SIM_RATE_LIMIT_RPS", "0")), ge=0)  # 0 disables
+    rate_limit_burst: int = Field(default=int(os.getenv("SIM_RATE_LIMIT_BURST", "10")), ge=1)
+    burst_429_every_seconds: float = Field(default=float(os.getenv("SIM_BURST_429_EVERY_SECONDS", "0")), ge=0)
+    burst_429_duration_seconds: float = Field(default=float(os.getenv("SIM_BURST_429_DURATION_SECONDS", "5")), ge=0)
+    retry_after_seconds: Optional[float] = Field(
+        default=float(os.getenv("SIM_RETRY_AFTER_SECONDS")) if os.getenv("SIM_RETRY_AFTER_SECONDS") else None
+    )
+
+    # Random failures
+    error_rate: float = Field(default=float(os.getenv("SIM_ERROR_RATE", "0")), ge=0, le=1)
+    error_status_codes: List[int] = Field(default=[500, 502, 504])
+    timeout_rate: float = Field(default=float(os.getenv("SIM_TIMEOUT_RATE", "0")), ge=0, le=1)
+    timeout_seconds: float = Field(default=float(os.getenv("SIM_TIMEOUT_SECONDS", "300")), ge=0)
+    empty_rate: float = Field(default=float(os.getenv("SIM_EMPTY_RATE", "0")), ge=0, le=1)
+
+    # Record/replay
+    recordings_dir: str = Field(default=os.getenv("SIM_RECORDINGS_DIR", os.path.join(".", "sim_recordings")))
+    upstream_endpoint: Optional[str] = Field(default=os.getenv("HUGGINGFACE_ENDPOINT"))
+    upstream_token: Optional[str] = Field(default=os.getenv("HUGGINGFACE_TOKEN"), exclude=True)
+    replay_latency: bool = Field(default=os.getenv("SIM_REPLAY_LATENCY", "false").lower() in ("1", "true", "yes"))
+    replay_miss: str = Field(default=os.getenv("SIM_REPLAY_MISS", "error"), pattern="^(error|simulate)$")
+
+
+def payload_key(payload: Any) -> str:
+    """Stable key of a request payload, used to name recordings."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def fake_generated_text(code: str) -> str:
+    """Deterministic, docstring-like text for a code snippet."""
+    match = re.search(r"^\s*(?:async\s+)?(def|class)\s+(\w+)\s*(?:\(([^)]*)\))?", code, re.MULTILINE)
+    if not match:
+        return "Process the given input."
+
+    kind, name, params = match.groups()
+    words = name.replace("_", " ").strip() or name
+    if kind == "class":
+        return f"Represents a {words}."
+
+    args = [
+        param.split(":")[0].split("=")[0].strip().lstrip("*")
+        for param in (params or "").split(",")
+    ]
+    args = [arg for arg in args if arg and arg not in ("self", "cls")]
+    lines = [f"{words[0].upper()}{words[1:]}."]
+    if args:
+        lines += ["", "Args:"] + [f"    {arg}: The {arg.replace('_', ' ')}." for arg in args]
+    if re.search(r"^\s+return\s+\S", code, re.MULTILINE):
+        lines += ["", "Returns:", "    The result."]
+    return "\n".join(lines)
+
+
+class InferenceSimulator:
+    """
+    Fault-injecting fake of the inference endpoint.
+
+    Every request goes through the same checks a real endpoint would apply,
+    in order: model loading (cold start), rate limiting, then random
+    failures and latency. Recorded responses bypass fault injection so a
+    replayed run is deterministic.
+    """
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.configure(config or SimulatorConfig())
+
+    def configure(self, config: SimulatorConfig):
+        """Apply a new configuration and restart the simulated model."""
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.started_at = time.monotonic()
+        self.loaded_at = self.started_at + config.cold_start_seconds
+        self.last_request_at = self.started_at
+        self.tokens = float(config.rate_limit_burst)
+        self.tokens_at = self.started_at
+        self.stats: Dict[str, int] = {}
+
+    def count(self, outcome: str):
+        self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    def latency(self, inputs: int = 1) -> float:
+        """Draw one request latency in seconds."""
+        config = self.config
+        mean, stddev = config.latency_mean_ms, config.latency_stddev_ms
+
+        if config.latency_distribution == "constant":
+            value = mean
+        elif config.latency_distribution == "uniform":
+            value = self.random.uniform(mean - stddev, mean + stddev)
+        elif config.latency_distribution == "normal":
+            value = self.random.gauss(mean, stddev)
+        elif config.latency_distribution == "exponential":
+            value = self.random.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            # Parameterized so the samples have the configured mean and standard deviation
+            if mean > 0:
+                sigma2 = math.log(1 + (stddev / mean) ** 2)
+                mu = math.log(mean) - sigma2 / 2
+                value = self.random.lognormvariate(mu, sigma2 ** 0.5)
+            else:
+                value = 0.0
+
+        value += config.batch_item_ms * max(0, inputs - 1)
+        return min(max(value, config.latency_min_ms), max(config.latency_min_ms, config.latency_max_ms)) / 1000
+
+    def loading_remaining(self, now: float) -> float:
+        """Seconds until the simulated model is loaded, 0 if it is ready."""
+        config = self.config
+        if config.idle_unload_seconds and now >= self.loaded_at and now - self.last_request_at > config.idle_unload_seconds:
+            # Scaled to zero while idle; the next request triggers a new cold start
+            self.loaded_at = now + config.cold_start_seconds
+        self.last_request_at = now
+        return max(0.0, self.loaded_at - now)
+
+    def rate_limited(self, now: float) -> bool:
+        """Apply the token bucket and the periodic 429 windows."""
+        config = self.config
+        if config.burst_429_every_seconds:
+            phase = (now - self.started_at) % config.burst_429_every_seconds
+            if phase >= config.burst_429_every_seconds - config.burst_429_duration_seconds:
+                return True
+
+        if config.rate_limit_rps:
+            self.tokens = min(config.rate_limit_burst, self.tokens + (now - self.tokens_at) * config.rate_limit_rps)
+            self.tokens_at = now
+            if self.tokens < 1:
+                return True
+            self.tokens -= 1
+        return False
+
+    def retry_headers(self) -> Dict[str, str]:
+        if self.config.retry_after_seconds is None:
+            return {}
+        return {"Retry-After": str(int(self.config.retry_after_seconds))}
+
+    async def simulate(self, payload: Dict[str, Any]) -> JSONResponse:
+        """Answer one request with the configured faults and latency."""
+        config = self.config
+        inputs = payload.get("inputs")
+        if not isinstance(inputs, (str, list)) or (isinstance(inputs, list) and not all(isinstance(i, str) for i in inputs)):
+            self.count("bad_request")
+            return JSONResponse(status_code=400, content={"error": "inputs must be a string or a list of strings"})
+
+        now = time.monotonic()
+        remaining = self.loading_remaining(now)
+        if remaining > 0:
+            self.count("loading")
+            return JSONResponse(status_code=503, content={
+                "error": "Model is currently loading",
+                "estimated_time": round(remaining, 1)
+            })
+
+        if self.rate_limited(now):
+            self.count("rate_limited")
+            return JSONResponse(status_code=429, content={"error": "Rate limit reached"}, headers=self.retry_headers())
+
+        if self.random.random() < config.timeout_rate:
+            # Hang past the client's read timeout
+            self.count("timeout")
+            await asyncio.sleep(config.timeout_seconds)
+            return JSONResponse(status_code=504, content={"error": "Gateway timeout"})
+
+        codes = inputs if isinstance(inputs, list) else [inputs]
+        await asyncio.sleep(self.latency(len(codes)))
+
+        if self.random.random() < config.error_rate:
+            self.count("error")
+            status_code = self.random.choice(config.error_status_codes)
+            return JSONResponse(status_code=status_code, content={"error": "Simulated server error"}, headers=self.retry_headers())
+
+        if self.random.random() < config.empty_rate:
+            self.count("empty")
+            return JSONResponse(content=[])
+
+        self.count("ok")
+        generations = [{"generated_text": fake_generated_text(code)} for code in codes]
+        if isinstance(inputs, list):
+            # Batched payloads get one generation list per input
+            return JSONResponse(content=[[generation] for generation in generations])
+        return JSONResponse(content=generations)
+
+    def recording_path(self, payload: Dict[str, Any]) -> Path:
+        return Path(self.config.recordings_dir) / f"{payload_key(payload)}.json"
+
+    async def record(self, payload: Dict[str, Any]) -> JSONResponse:
+        """Forward a request to the real endpoint and save its response."""
+        config = self.config
+        if not config.upstream_endpoint:
+            return JSONResponse(status_code=500, content={"error": "Record mode needs HUGGINGFACE_ENDPOINT"})
+
+        headers = {"Content-Type": "application/json"}
+        if config.upstream_token:
+            headers["Authorization"] = f"Bearer {config.upstream_token}"
+
+        started = time.perf_counter()
+        async with httpx.AsyncClient(timeout=config.timeout_seconds) as client:
+            response = await client.post(config.upstream_endpoint, json=payload, headers=headers)
+        latency = time.perf_counter() - started
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"error": response.text}
+
+        # Only final answers are worth replaying; loading and overload responses are transient
+        if response.status_code == 200:
+            path = self.recording_path(payload)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({
+                "payload": payload,
+                "status_code": response.status_code,
+                "body": body,
+                "latency_seconds": round(latency, 4)
+            }, indent=2), encoding="utf-8")
+            self.count("recorded")
+        else:
+            self.count(f"upstream_{response.status_code}")
+
+        retry_after = response.headers.get("Retry-After")
+        return JSONResponse(
+            status_code=response.status_code,
+            content=body,
+            headers={"Retry-After": retry_after} if retry_after else None
+        )
+
+    async def replay(self, payload: Dict[str, Any]) -> JSONResponse:
+        """Serve a recorded response for the payload."""
+        path = self.recording_path(payload)
+        if not path.exists():
+            if self.config.replay_miss == "simulate":
+                self.count("replay_miss")
+                return await self.simulate(payload)
+            self.count("replay_miss")
+            return JSONResponse(status_code=404, content={"error": f"No recording for payload {payload_key(payload)}"})
+
+        recording = json.loads(path.read_text(encoding="utf-8"))
+        if self.config.replay_latency:
+            await asyncio.sleep(recording.get("latency_seconds", 0))
+        self.count("replayed")
+        return JSONResponse(status_code=recording["status_code"], content=recording["body"])
+
+    async def handle(self, payload: Dict[str, Any]) -> JSONResponse:
+        if self.config.mode == "record":
+            return await self.record(payload)
+        if self.config.mode == "replay":
+            return await self.replay(payload)
+        return await self.simulate(payload)
+
+    def get_state(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "config": self.config.model_dump(),
+            "loaded": now >= self.loaded_at,
+            "uptime_seconds": round(now - self.started_at, 1),
+            "requests": self.stats
+        }
+
+
+def create_simulator_app(config: Optional[SimulatorConfig] = None) -> FastAPI:
+    """
+    Create the simulator app.
+
+    Args:
+        config: Initial configuration; read from SIM_* variables if omitted
+
+    Returns:
+        A FastAPI app serving the inference endpoint on POST /
+    """
+    simulator = InferenceSimulator(config)
+    sim_app = FastAPI(title="Inference Simulator")
+    sim_app.state.simulator = simulator
+
+    @sim_app.get("/_simulator/state")
+    async def get_simulator_state():
+        return simulator.get_state()
+
+    @sim_app.put("/_simulator/config")
+    async def update_simulator_config(config: SimulatorConfig):
+        # Restarts the simulated model, so a new cold start period begins
+        simulator.configure(config)
+        return simulator.get_state()
+
+    @sim_app.post("/")
+    @sim_app.post("/{path:path}")
+    async def generate(request: Request, path: str = ""):
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse(status_code=400, content={"error": "Body must be JSON"})
+        if not isinstance(payload, dict):
+            return JSONResponse(status_code=400, content={"error": "Body must be a JSON object"})
+        return await simulator.handle(payload)
+
+    return sim_app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description="Local stand-in for the Hugging Face inference endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SIM_PORT", "8001")))
+    parser.add_argument("--mode", choices=SIMULATOR_MODES, default=defaults.mode)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default=defaults.latency_distribution)
+    parser.add_argument("--latency-mean-ms", type=float, default=defaults.latency_mean_ms)
+    parser.add_argument("--latency-stddev-ms", type=float, default=defaults.latency_stddev_ms)
+    parser.add_argument("--cold-start-seconds", type=float, default=defaults.cold_start_seconds)
+    parser.add_argument("--idle-unload-seconds", type=float, default=defaults.idle_unload_seconds)
+    parser.add_argument("--rate-limit-rps", type=float, default=defaults.rate_limit_rps)
+    parser.add_argument("--burst-429-every-seconds", type=float, default=defaults.burst_429_every_seconds)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--timeout-rate", type=float, default=defaults.timeout_rate)
+    parser.add_argument("--recordings-dir", default=defaults.recordings_dir)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    overrides = {
+        key: value for key, value in vars(args).items()
+        if key not in ("host", "port")
+    }
+    uvicorn.run(
+        create_simulator_app(SimulatorConfig(**overrides)),
+        host=args.host,
+        port=args.port,
+        log_level="info"
+    )
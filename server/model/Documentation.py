@@ -15,11 +15,38 @@ class DocstringResponse(BaseModel):
     original_code: str
     generated_docstring: str
     success: bool
+    message: Optional[str] = None  # Why a fallback docstring was returned
+    draft: bool = False  # Local draft; the model result replaces it once generated
+
+class DocstringCacheStats(BaseModel):
+    memory_hits: int
+    db_hits: int
+    misses: int
+    stores: int
+    hit_rate: float
+    memory_entries: int
+    model_id: str
+
+class DocstringCacheInvalidationResponse(BaseModel):
+    model_id: str
+    deleted_count: int
+    success: bool
+
+class InferenceStatusResponse(BaseModel):
+    backend: Dict[str, Any]
+    scheduler: Dict[str, Any]
+    circuit_breaker: Dict[str, Any]
+    concurrency_limiter: Dict[str, Any]
+    hedging: Dict[str, Any]
 
 class FileDocumentationRequest(BaseModel):
     include_private: Optional[bool] = False
     include_examples: Optional[bool] = True
     include_type_hints: Optional[bool] = True
+    max_concurrency: Optional[int] = None  # Items generated in parallel (defaults to DOC_ITEM_CONCURRENCY)
+    regenerate: Optional[bool] = False  # Regenerate every item even if documentation exists
+    incremental: Optional[bool] = False  # Only regenerate new or changed items
+    drafts: Optional[bool] = False  # Store and stream local drafts before the model results
 
 class DocumentedItem(BaseModel):
     type: str  # "function", "class", "method"
@@ -33,11 +60,19 @@ class FileDocumentationResponse(BaseModel):
     total_items: int
     success: bool
     message: str
+    elapsed_seconds: Optional[float] = None  # Wall time spent on this file
+    regenerated_items: Optional[int] = None  # Incremental runs: items sent to the model
+    reused_items: Optional[int] = None  # Incremental runs: unchanged items kept as they were
+    removed_items: Optional[int] = None  # Incremental runs: stored items no longer in the file
 
 # Optional: For project-level documentation
 class ProjectDocumentationRequest(BaseModel):
     include_private: Optional[bool] = False
     file_filters: Optional[List[str]] = None  # Only document specific files
+    parallel: Optional[bool] = False  # Document files concurrently
+    max_concurrent_files: Optional[int] = None  # Defaults to DOC_FILE_CONCURRENCY
+    incremental: Optional[bool] = False  # Only regenerate items whose code changed
+    drafts: Optional[bool] = False  # Store and stream local drafts before the model results
 
 class ProjectDocumentationResponse(BaseModel):
     project_name: str
@@ -45,4 +80,5 @@ class ProjectDocumentationResponse(BaseModel):
     total_files: int
     total_items: int
     success: bool
-    message: str
\ No newline at end of file
+    message: str
+    makespan_seconds: Optional[float] = None  # Wall time of the whole run
\ No newline at end of file
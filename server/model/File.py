@@ -13,7 +13,9 @@ class FunctionInfo(BaseModel):
     args: List[str]
     docstring: str
     decorators: List[str]
-    code: Optional[str] = None
+    start_byte: Optional[int] = None  # Code range in the file content
+    end_byte: Optional[int] = None
+    code: Optional[str] = None  # Sliced from the content on request
     excluded: bool = False
     default_exclusion: bool = False
     inherited_exclusion: bool = False
@@ -25,7 +27,9 @@ class ClassInfo(BaseModel):
     methods: List[FunctionInfo]
     docstring: str
     bases: List[str]
-    code : Optional[str] = None
+    start_byte: Optional[int] = None  # Code range in the file content
+    end_byte: Optional[int] = None
+    code : Optional[str] = None  # Sliced from the content on request
     excluded: bool = False
     default_exclusion: bool = False
     inherited_exclusion: bool = False
@@ -236,6 +240,7 @@ class DocumentationItem(BaseModel):
     item_id: str = Field(default_factory=lambda: str(ObjectId()))  # Unique ID for this item
     item_type: str  # "function", "class", "method"
     item_name: str  # e.g., "calculate_sum", "Calculator", "Calculator.add"
+    item_key: Optional[str] = None  # Unique within the file, e.g. "method:Calculator.value:1" for a property setter
     original_code: str
     generated_docstring: str
     documented_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+
+class TaskSubmissionResponse(BaseModel):
+    task_id: str
+    status: str
+    message: str
+
+class TaskFileProgress(BaseModel):
+    file_name: str
+    status: str  # "processing", "completed", "failed"
+    items_done: int = 0
+    items_total: int = 0
+    items_failed: int = 0
+    elapsed_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+class TaskFailure(BaseModel):
+    file_name: str
+    item_name: Optional[str] = None  # None when the whole file failed
+    error: Optional[str] = None
+
+class TaskProgress(BaseModel):
+    files_total: int = 0
+    files_done: int = 0
+    items_done: int = 0
+    items_total: int = 0  # Items of the files started so far
+    items_failed: int = 0
+    files: List[TaskFileProgress] = []
+    failures: List[TaskFailure] = []
+    elapsed_seconds: Optional[float] = None
+    eta_seconds: Optional[float] = None
+
+class TaskStatusResponse(BaseModel):
+    task_id: str
+    task_type: str
+    status: str  # See utils.task_queue.TaskStatus
+    description: str
+    progress: TaskProgress
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    updated_at: datetime
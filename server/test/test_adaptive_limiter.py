@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from utils.adaptive_limiter import AdaptiveConcurrencyLimiter
+
+@pytest.mark.asyncio
+async def test_limit_grows_by_about_one_slot_per_round():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=10)
+    for _ in range(4):
+        await limiter.on_success(0.5)
+    assert 4.9 < limiter.limit < 5.1
+
+    for _ in range(200):
+        await limiter.on_success(0.5)
+    assert limiter.limit == 10
+
+def test_overload_halves_the_limit_down_to_the_minimum():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=3, max_limit=10)
+    limiter.on_overload()
+    assert limiter.limit == 4
+
+    limiter.last_decrease = 0.0
+    limiter.on_overload()
+    assert limiter.limit == 3
+
+def test_overloads_within_the_cooldown_decrease_once():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=10)
+    limiter.recent_latency = 60.0
+    for _ in range(5):
+        limiter.on_overload()
+    assert limiter.limit == 4
+    assert limiter.stats["decreases"] == 1
+
+    # Once a recent latency has passed, the next overload counts again
+    limiter.last_decrease -= 60.0
+    limiter.on_overload()
+    assert limiter.limit == 2
+
+@pytest.mark.asyncio
+async def test_latency_spike_decreases_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=10)
+    for _ in range(10):
+        await limiter.on_success(0.1)
+    limit = limiter.limit
+
+    await limiter.on_success(1.0)
+    assert limiter.limit == limit / 2
+
+@pytest.mark.asyncio
+async def test_large_inputs_are_not_latency_spikes():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=10)
+    for _ in range(10):
+        await limiter.on_success(0.1, tokens=50)
+    limit = limiter.limit
+
+    # Ten times the input, ten times the latency
+    await limiter.on_success(1.0, tokens=500)
+    assert limiter.limit > limit
+    assert limiter.stats["decreases"] == 0
+
+@pytest.mark.asyncio
+async def test_limit_recovers_after_a_lasting_latency_shift():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=10)
+    for _ in range(10):
+        await limiter.on_success(0.01)
+
+    # The endpoint settles at a much higher latency and stays there
+    for _ in range(100):
+        limiter.last_decrease = 0.0
+        await limiter.on_success(1.0)
+
+    assert limiter.stats["decreases"] < 10
+    assert limiter.limit > limiter.min_limit
+    assert limiter.baseline_latency > 1.0 / limiter.latency_spike_factor
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_when_the_limit_grows():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=4)
+    entered = []
+
+    async def hold(index: int, release: asyncio.Event):
+        async with limiter.acquire():
+            entered.append(index)
+            await release.wait()
+
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(i, release)) for i in range(2)]
+    await asyncio.sleep(0.01)
+    assert entered == [0]
+
+    await limiter.on_success(0.1)  # 1 -> 2
+    await asyncio.sleep(0.01)
+    assert entered == [0, 1]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.in_flight == 0
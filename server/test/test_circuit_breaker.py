@@ -0,0 +1,41 @@
+from utils.circuit_breaker import CircuitBreaker, CircuitState, compute_backoff, parse_retry_after
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow_request()  # The probe
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+def test_failed_probe_reopens_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+def test_backoff_is_bounded_and_honors_retry_after():
+    for attempt in range(10):
+        assert 0 <= compute_backoff(attempt, 1.0, 30.0) <= 30.0
+    assert compute_backoff(0, 1.0, 30.0, retry_after=12) == 12
+    assert compute_backoff(0, 1.0, 30.0, retry_after=120) == 30.0
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
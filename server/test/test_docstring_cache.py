@@ -0,0 +1,42 @@
+import textwrap
+import pytest
+from utils.docstring_cache import DocstringCache, hash_code, make_cache_key, normalize_code
+
+def test_normalize_code_ignores_formatting():
+    indented = "    def add(a, b):   \r\n\r\n        return a + b\r\n"
+    plain = "def add(a, b):\n    return a + b"
+    assert normalize_code(indented) == normalize_code(plain)
+
+def test_cache_key_depends_on_model():
+    code = "def add(a, b):\n    return a + b"
+    assert make_cache_key(code, "model-v1") == make_cache_key(textwrap.indent(code, "    "), "model-v1")
+    assert make_cache_key(code, "model-v1") != make_cache_key(code, "model-v2")
+
+def test_code_hash_detects_changes_only():
+    code = "def add(a, b):\n    return a + b"
+    assert hash_code(code) == hash_code(textwrap.indent(code, "    "))
+    assert hash_code(code) != hash_code(code.replace("a + b", "a - b"))
+
+@pytest.mark.asyncio
+async def test_memory_cache_hits_and_invalidation():
+    cache = DocstringCache(max_size=2)
+    await cache.set("def a(): pass", '"""A."""', model_id="m1")
+
+    assert await cache.get("def a(): pass", model_id="m1") == '"""A."""'
+    assert await cache.get("def a(): pass", model_id="m2") is None
+    assert cache.stats["memory_hits"] == 1
+    assert cache.stats["misses"] == 1
+
+    await cache.invalidate("m1")
+    assert await cache.get("def a(): pass", model_id="m1") is None
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest_entry():
+    cache = DocstringCache(max_size=2)
+    await cache.set("def a(): pass", '"""A."""', model_id="m1")
+    await cache.set("def b(): pass", '"""B."""', model_id="m1")
+    await cache.get("def a(): pass", model_id="m1")
+    await cache.set("def c(): pass", '"""C."""', model_id="m1")
+
+    assert await cache.get("def b(): pass", model_id="m1") is None
+    assert await cache.get("def a(): pass", model_id="m1") == '"""A."""'
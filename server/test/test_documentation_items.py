@@ -0,0 +1,165 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from model.Documentation import DocstringResponse, FileDocumentationRequest
+from utils.parser import CodeParserService
+import controller.DocumentationController as DocumentationController
+from controller.DocumentationController import (
+    collect_documentation_targets,
+    document_file_functions,
+    documentation_item_key,
+    load_documentation_items,
+    store_documentation_item,
+    summarize_documentation_items,
+)
+
+PROPERTY_SOURCE = (
+    "class Account:\n"
+    "    @property\n"
+    "    def balance(self):\n"
+    "        return self._balance\n"
+    "\n"
+    "    @balance.setter\n"
+    "    def balance(self, value):\n"
+    "        self._balance = value\n"
+)
+
+def make_item(name: str, item_type: str = "function", success: bool = True) -> dict:
+    return {
+        "item_type": item_type,
+        "item_name": name,
+        "item_key": documentation_item_key(item_type, name),
+        "original_code": f"def {name}(): pass",
+        "generated_docstring": f'"""{name}"""',
+        "generation_success": success,
+    }
+
+@pytest.mark.asyncio
+async def test_items_are_upserted_and_loaded_in_source_order(test_db):
+    file_id, project_id = ObjectId(), ObjectId()
+    await store_documentation_item(test_db, file_id, project_id, make_item("second"), 1)
+    await store_documentation_item(test_db, file_id, project_id, make_item("first"), 0)
+    # Regenerating an item replaces its document
+    await store_documentation_item(test_db, file_id, project_id, make_item("first", success=False), 0)
+
+    items = await load_documentation_items(test_db, file_id)
+    assert [item["item_name"] for item in items] == ["first", "second"]
+    assert items[0]["generation_success"] is False
+
+@pytest.mark.asyncio
+async def test_summary_is_aggregated_from_items(test_db):
+    file_id, project_id = ObjectId(), ObjectId()
+    await store_documentation_item(test_db, file_id, project_id, make_item("Parser", "class"), 0)
+    await store_documentation_item(test_db, file_id, project_id, make_item("Parser.parse", "method"), 1)
+    await store_documentation_item(test_db, file_id, project_id, make_item("helper", success=False), 2)
+
+    summary = await summarize_documentation_items(test_db, file_id, failed_count=1)
+    assert summary["total_items"] == 3
+    assert (summary["total_classes"], summary["total_methods"], summary["total_functions"]) == (1, 1, 1)
+    assert summary["success_rate"] == 0.5
+
+@pytest.mark.asyncio
+async def test_legacy_summaries_fall_back_to_embedded_items(test_db):
+    legacy_summary = {"file_id": ObjectId(), "documentation_items": [make_item("old")]}
+    items = await load_documentation_items(test_db, legacy_summary["file_id"], legacy_summary)
+    assert [item["item_name"] for item in items] == ["old"]
+
+@pytest.mark.asyncio
+async def test_property_getter_and_setter_are_stored_separately(test_db):
+    structure = CodeParserService().parse_code(PROPERTY_SOURCE)
+    targets, _ = collect_documentation_targets(structure, {}, FileDocumentationRequest())
+    methods = [target for target in targets if target["item_type"] == "method"]
+    assert [target["item_name"] for target in methods] == ["Account.balance", "Account.balance"]
+    assert len({target["item_key"] for target in targets}) == len(targets)
+
+    file_id, project_id = ObjectId(), ObjectId()
+    for target in methods:
+        item = {**make_item(target["item_name"], "method"), "item_key": target["item_key"], "line_number": target["node"]["line"]}
+        await store_documentation_item(test_db, file_id, project_id, item, target["index"])
+
+    items = await load_documentation_items(test_db, file_id)
+    assert [item["line_number"] for item in items] == [3, 7]
+
+@pytest.mark.asyncio
+async def test_incremental_run_reuses_items_sharing_a_name(test_db, monkeypatch):
+    generated = []
+
+    async def fake_generate(request, priority=None):
+        generated.append(request.code)
+        return DocstringResponse(original_code=request.code, generated_docstring=f'"""{len(generated)}"""', success=True)
+
+    monkeypatch.setattr(DocumentationController, "generate_docstring_for_code", fake_generate)
+    file_id = (await test_db.files.insert_one({
+        "project_id": ObjectId(),
+        "file_name": "account.py",
+        "content": PROPERTY_SOURCE,
+        "processed": True,
+        "structure": CodeParserService().parse_code(PROPERTY_SOURCE),
+    })).inserted_id
+
+    first = await document_file_functions(str(file_id), FileDocumentationRequest(), db=test_db)
+    assert len(first.documented_items) == 3
+    assert len(generated) == 3
+
+    second = await document_file_functions(str(file_id), FileDocumentationRequest(incremental=True), db=test_db)
+    assert len(generated) == 3
+    assert second.reused_items == 3
+    # Each stored item keeps its own docstring
+    assert [item.generated_docstring for item in second.documented_items] == [
+        item.generated_docstring for item in first.documented_items
+    ]
+
+@pytest.mark.asyncio
+async def test_methods_are_kept_when_their_class_fails(test_db, monkeypatch):
+    async def fake_generate(request, priority=None):
+        if request.code.startswith("class"):
+            raise RuntimeError("class too long")
+        return DocstringResponse(original_code=request.code, generated_docstring='"""Balance."""', success=True)
+
+    monkeypatch.setattr(DocumentationController, "generate_docstring_for_code", fake_generate)
+    file_id = (await test_db.files.insert_one({
+        "project_id": ObjectId(),
+        "file_name": "account.py",
+        "content": PROPERTY_SOURCE,
+        "processed": True,
+        "structure": CodeParserService().parse_code(PROPERTY_SOURCE),
+    })).inserted_id
+
+    response = await document_file_functions(str(file_id), FileDocumentationRequest(), db=test_db)
+
+    assert [(item.type, item.name) for item in response.documented_items] == [
+        ("method", "Account.balance"), ("method", "Account.balance")
+    ]
+    stored = await load_documentation_items(test_db, file_id)
+    assert [item["item_type"] for item in stored] == ["method", "method"]
+
+@pytest.mark.asyncio
+async def test_failed_regeneration_keeps_stored_documentation(test_db, monkeypatch):
+    endpoint_up = True
+
+    async def fake_generate(request, priority=None):
+        if not endpoint_up:
+            # Unavailable endpoints return a fallback, broken items raise
+            if request.code.startswith("class"):
+                raise RuntimeError("endpoint down")
+            return DocstringResponse(original_code=request.code, generated_docstring='"""Fallback."""', success=False)
+        return DocstringResponse(original_code=request.code, generated_docstring='"""Model."""', success=True)
+
+    monkeypatch.setattr(DocumentationController, "generate_docstring_for_code", fake_generate)
+    file_id = (await test_db.files.insert_one({
+        "project_id": ObjectId(),
+        "file_name": "account.py",
+        "content": PROPERTY_SOURCE,
+        "processed": True,
+        "structure": CodeParserService().parse_code(PROPERTY_SOURCE),
+    })).inserted_id
+    await document_file_functions(str(file_id), FileDocumentationRequest(), db=test_db)
+
+    endpoint_up = False
+    with pytest.raises(HTTPException) as error:
+        await document_file_functions(str(file_id), FileDocumentationRequest(regenerate=True), db=test_db)
+    assert error.value.status_code == 503
+
+    stored = await load_documentation_items(test_db, file_id)
+    assert len(stored) == 3
+    assert all(item["generated_docstring"] == '"""Model."""' for item in stored)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from httpx import AsyncClient
+import controller.DocumentationController as DocumentationController
+from controller.DocumentationController import stream_documentation
+from model.Documentation import DocstringResponse, DocumentedItem, FileDocumentationResponse
+from utils.parser import CodeParserService
+
+SOURCE = "def first(a):\n    return a\n\ndef second(b):\n    return b\n"
+
+def file_response(names) -> FileDocumentationResponse:
+    return FileDocumentationResponse(
+        file_name="a.py",
+        documented_items=[
+            DocumentedItem(type="function", name=name, original_code="", generated_docstring="") for name in names
+        ],
+        total_items=len(names),
+        success=True,
+        message="done"
+    )
+
+async def collect(events) -> list:
+    return [json.loads(line) async for line in events]
+
+@pytest.mark.asyncio
+async def test_items_stream_before_the_summary():
+    async def run(on_event):
+        await on_event({"event": "file_start", "items_total": 2})
+        for name in ("first", "second"):
+            await asyncio.sleep(0)
+            await on_event({"event": "item", "item": {"name": name}})
+        return file_response(["first", "second"])
+
+    events = await collect(await stream_documentation(run))
+
+    assert [event["event"] for event in events] == ["file_start", "item", "item", "summary"]
+    assert [event["item"]["name"] for event in events[1:3]] == ["first", "second"]
+    # Items already streamed are not repeated in the summary
+    assert events[-1]["total_items"] == 2
+    assert "documented_items" not in events[-1]
+
+@pytest.mark.asyncio
+async def test_sse_frames_are_named_after_their_events():
+    async def run(on_event):
+        await on_event({"event": "file_start", "items_total": 0})
+        return file_response([])
+
+    frames = [frame async for frame in await stream_documentation(run, "sse")]
+
+    assert frames[0].startswith("event: file_start\ndata: ")
+    assert frames[-1].startswith("event: summary\ndata: ")
+    assert all(frame.endswith("\n\n") for frame in frames)
+
+@pytest.mark.asyncio
+async def test_errors_before_the_first_event_are_raised():
+    async def run(on_event):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    with pytest.raises(HTTPException) as error:
+        await stream_documentation(run)
+    assert error.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_errors_after_the_first_event_end_the_stream():
+    async def run(on_event):
+        await on_event({"event": "file_start", "items_total": 1})
+        raise RuntimeError("endpoint down")
+
+    events = await collect(await stream_documentation(run))
+
+    assert [event["event"] for event in events] == ["file_start", "error"]
+    assert events[-1] == {"event": "error", "status_code": 500, "detail": "endpoint down"}
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_the_run():
+    cancelled = asyncio.Event()
+
+    async def run(on_event):
+        await on_event({"event": "file_start", "items_total": 100})
+        try:
+            for index in range(100):
+                await asyncio.sleep(0.01)
+                await on_event({"event": "item", "item": {"name": f"item_{index}"}})
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return file_response([])
+
+    events = await stream_documentation(run)
+    assert json.loads(await events.__anext__())["event"] == "file_start"
+    assert json.loads(await events.__anext__())["event"] == "item"
+
+    # The server closes the response iterator when the client goes away
+    await events.aclose()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+@pytest.mark.asyncio
+async def test_file_stream_endpoint_sends_items_then_summary(test_client: AsyncClient, test_db, monkeypatch):
+    from app import app
+    from utils.auth import get_current_user
+
+    async def fake_generate(request, priority=None):
+        return DocstringResponse(original_code=request.code, generated_docstring='"""Doc."""', success=True)
+
+    monkeypatch.setattr(DocumentationController, "generate_docstring_for_code", fake_generate)
+    app.dependency_overrides[get_current_user] = lambda: {"_id": ObjectId()}
+    file_id = (await test_db.files.insert_one({
+        "project_id": ObjectId(),
+        "file_name": "stream.py",
+        "content": SOURCE,
+        "processed": True,
+        "structure": CodeParserService().parse_code(SOURCE),
+    })).inserted_id
+
+    response = await test_client.post(f"/api/files/{file_id}/document/stream", json={})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["file_start", "item", "item", "summary"]
+    assert {event["item"]["name"] for event in events[1:3]} == {"first", "second"}
+    assert events[-1]["total_items"] == 2
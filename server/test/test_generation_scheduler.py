@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from utils.generation_scheduler import GenerationPriority, GenerationScheduler
+
+async def run(scheduler, order, name, priority, key=None):
+    async with scheduler.slot(priority, key):
+        order.append(name)
+        await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_interactive_overtakes_queued_bulk_work():
+    scheduler = GenerationScheduler(lambda: 2, interactive_reserved=1)
+    order = []
+
+    bulk = [asyncio.create_task(run(scheduler, order, f"project-{i}", GenerationPriority.PROJECT)) for i in range(5)]
+    await asyncio.sleep(0)
+    # One slot is reserved, so only one project item runs at a time
+    assert scheduler.in_flight == 1
+
+    await run(scheduler, order, "interactive", GenerationPriority.INTERACTIVE)
+    await asyncio.gather(*bulk)
+
+    assert order.index("interactive") == 1
+
+@pytest.mark.asyncio
+async def test_boost_lifts_queued_work():
+    scheduler = GenerationScheduler(lambda: 1, interactive_reserved=0)
+    order = []
+
+    tasks = [asyncio.create_task(run(scheduler, order, f"project-{i}", GenerationPriority.PROJECT, key=f"k{i}")) for i in range(4)]
+    await asyncio.sleep(0)
+    scheduler.boost("k3", GenerationPriority.INTERACTIVE)
+    await asyncio.gather(*tasks)
+
+    assert order[:2] == ["project-0", "project-3"]
+    assert scheduler.get_state()["admitted"]["interactive"]["admitted"] == 1
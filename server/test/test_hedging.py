@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from utils.hedging import RequestHedger
+
+def warmed_hedger(**kwargs) -> RequestHedger:
+    hedger = RequestHedger(enabled=True, min_delay=0.01, min_samples=5, **kwargs)
+    for _ in range(5):
+        hedger.record_latency(0.02)
+    return hedger
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled():
+    hedger = warmed_hedger(budget=1.0)
+    calls = []
+
+    async def send():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(10)
+            finally:
+                calls.append("cancelled")
+        return 200
+
+    result = await asyncio.wait_for(hedger.run(send, lambda status: status == 200), timeout=1)
+
+    assert result == 200
+    assert hedger.stats["hedged"] == 1
+    assert hedger.stats["hedge_wins"] == 1
+    await asyncio.sleep(0)
+    assert "cancelled" in calls
+
+@pytest.mark.asyncio
+async def test_failed_answer_does_not_win_while_other_request_runs():
+    hedger = warmed_hedger(budget=1.0)
+    answers = iter([0.05, 0.0])
+
+    async def send():
+        delay = next(answers)
+        await asyncio.sleep(delay)
+        return 200 if delay else 503
+
+    assert await hedger.run(send, lambda status: status == 200) == 200
+
+@pytest.mark.asyncio
+async def test_hedges_stay_within_budget():
+    hedger = warmed_hedger(budget=0.1, burst=1)
+
+    async def send():
+        await asyncio.sleep(0.03)
+        return 200
+
+    for _ in range(30):
+        await hedger.run(send, lambda status: status == 200)
+
+    assert hedger.stats["hedged"] <= 3
+    assert hedger.stats["over_budget"] > 0
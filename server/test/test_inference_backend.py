@@ -0,0 +1,218 @@
+import asyncio
+import httpx
+import pytest
+import utils.inference_backend as inference_backend
+from controller.DocumentationController import generate_with_backend
+from model.Documentation import DocstringRequest
+from utils.adaptive_limiter import AdaptiveConcurrencyLimiter
+from utils.circuit_breaker import CircuitBreaker
+from utils.hedging import RequestHedger
+from utils.inference_backend import (
+    HuggingFaceBackend,
+    InferenceBackend,
+    InferenceUnavailableError,
+    create_inference_backend,
+)
+from utils.inference_batcher import BatchItemResponse
+from utils.local_inference import LocalCPUBackend
+
+CODE = "def add(a, b):\n    return a + b"
+
+class ScriptedBackend(HuggingFaceBackend):
+    """HF backend whose endpoint answers from a script of responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def post(self, payload):
+        self.calls += 1
+        return self.responses.pop(0)
+
+@pytest.fixture
+def endpoint_guards(monkeypatch):
+    """Fresh breaker, limiter and hedger for the HF backend, without retry delays."""
+    guards = {
+        "breaker": CircuitBreaker(failure_threshold=3, recovery_timeout=60),
+        "limiter": AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8),
+        "hedger": RequestHedger(enabled=False),
+    }
+    monkeypatch.setattr(inference_backend, "get_circuit_breaker", lambda: guards["breaker"])
+    monkeypatch.setattr(inference_backend, "get_inference_limiter", lambda: guards["limiter"])
+    monkeypatch.setattr(inference_backend, "get_inference_hedger", lambda: guards["hedger"])
+    monkeypatch.setattr(inference_backend, "compute_backoff", lambda *args, **kwargs: 0)
+    return guards
+
+def test_backend_is_selected_by_name():
+    assert isinstance(create_inference_backend("huggingface"), HuggingFaceBackend)
+    assert isinstance(create_inference_backend("local"), LocalCPUBackend)
+    # Unknown names fall back to the remote endpoint
+    assert isinstance(create_inference_backend("gpu-cluster"), HuggingFaceBackend)
+
+@pytest.mark.asyncio
+async def test_overload_is_retried_and_shrinks_the_limit(endpoint_guards):
+    backend = ScriptedBackend(
+        BatchItemResponse(503, text="overloaded"),
+        BatchItemResponse(200, data=[{"generated_text": " Add two numbers. "}]),
+    )
+
+    assert await backend.generate(CODE) == "Add two numbers."
+    assert backend.calls == 2
+    assert endpoint_guards["limiter"].stats["decreases"] == 1
+    assert endpoint_guards["limiter"].in_flight == 0
+    assert endpoint_guards["breaker"].consecutive_failures == 0
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(endpoint_guards):
+    backend = ScriptedBackend(BatchItemResponse(400, text="bad request"))
+
+    with pytest.raises(InferenceUnavailableError):
+        await backend.generate(CODE)
+    assert backend.calls == 1
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast(endpoint_guards):
+    backend = ScriptedBackend(*(BatchItemResponse(500, text="down") for _ in range(3)))
+
+    with pytest.raises(InferenceUnavailableError, match="circuit open"):
+        await backend.generate(CODE)
+    # The third failure opened the circuit; no further requests were sent
+    assert backend.calls == 3
+
+@pytest.mark.asyncio
+async def test_hedge_is_skipped_without_a_free_slot(endpoint_guards):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    hedger = RequestHedger(enabled=True, budget=1.0, min_delay=0.01, min_samples=1)
+    hedger.record_latency(0.01)
+    endpoint_guards["limiter"], endpoint_guards["hedger"] = limiter, hedger
+
+    class SlowBackend(HuggingFaceBackend):
+        async def post(self, payload):
+            await asyncio.sleep(0.05)
+            return BatchItemResponse(200, data=[{"generated_text": "Add."}])
+
+    assert await SlowBackend().generate(CODE) == "Add."
+    assert hedger.stats["hedged"] == 0
+    assert hedger.stats["no_slot"] == 1
+    assert limiter.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_hedge_holds_its_own_slot(endpoint_guards):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+    hedger = RequestHedger(enabled=True, budget=1.0, min_delay=0.01, min_samples=1)
+    hedger.record_latency(0.01)
+    endpoint_guards["limiter"], endpoint_guards["hedger"] = limiter, hedger
+    in_flight = []
+
+    class SlowBackend(HuggingFaceBackend):
+        async def post(self, payload):
+            in_flight.append(limiter.in_flight)
+            await asyncio.sleep(0.05)
+            return BatchItemResponse(200, data=[{"generated_text": "Add."}])
+
+    assert await SlowBackend().generate(CODE) == "Add."
+    assert hedger.stats["hedged"] == 1
+    assert in_flight == [1, 2]
+    # The losing hedge releases its slot once its cancellation completes
+    await asyncio.sleep(0.01)
+    assert limiter.in_flight == 0
+
+class BatchEndpoint:
+    """Shared-client stand-in that answers every batch with the given status."""
+
+    def __init__(self, limiter, status_code=200):
+        self.limiter = limiter
+        self.status_code = status_code
+        self.batches = []
+        self.in_flight = []
+
+    async def post(self, payload):
+        self.batches.append(payload["inputs"])
+        self.in_flight.append(self.limiter.in_flight)
+        await asyncio.sleep(0.01)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, text="down")
+        return httpx.Response(200, json=[[{"generated_text": f"Doc {i}."}] for i in range(len(payload["inputs"]))])
+
+@pytest.fixture
+def batching(endpoint_guards, monkeypatch):
+    monkeypatch.setattr(inference_backend, "INFERENCE_BATCHING", True)
+    monkeypatch.setattr(inference_backend, "MAX_RETRIES", 1)
+
+@pytest.mark.asyncio
+async def test_batch_takes_one_limiter_slot_and_reports_once(endpoint_guards, batching, monkeypatch):
+    limiter = endpoint_guards["limiter"]
+    endpoint = BatchEndpoint(limiter)
+    monkeypatch.setattr(inference_backend, "get_inference_client", lambda: endpoint)
+    backend = HuggingFaceBackend()
+    try:
+        results = await asyncio.gather(*(backend.generate(f"def f{i}(): pass") for i in range(3)))
+    finally:
+        await backend.batcher.close()
+
+    assert results == ["Doc 0.", "Doc 1.", "Doc 2."]
+    assert len(endpoint.batches) == 1
+    assert endpoint.in_flight == [1]
+    assert limiter.in_flight == 0
+    # One round of growth for the one endpoint call, not one per item
+    assert 4.2 < limiter.limit < 4.3
+    assert backend.capacity() == int(limiter.limit) * backend.batcher.max_size
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_one_breaker_failure(endpoint_guards, batching, monkeypatch):
+    endpoint = BatchEndpoint(endpoint_guards["limiter"], status_code=503)
+    monkeypatch.setattr(inference_backend, "get_inference_client", lambda: endpoint)
+    backend = HuggingFaceBackend()
+    try:
+        results = await asyncio.gather(
+            *(backend.generate(f"def f{i}(): pass") for i in range(3)), return_exceptions=True
+        )
+    finally:
+        await backend.batcher.close()
+
+    assert all(isinstance(result, InferenceUnavailableError) for result in results)
+    assert len(endpoint.batches) == 1
+    assert endpoint_guards["breaker"].consecutive_failures == 1
+    assert endpoint_guards["limiter"].stats["decreases"] == 1
+
+@pytest.mark.asyncio
+async def test_unavailable_backend_falls_back_to_a_template_docstring():
+    class DownBackend(InferenceBackend):
+        name = "down"
+
+        async def generate(self, code):
+            raise InferenceUnavailableError("endpoint down")
+
+    response = await generate_with_backend(DocstringRequest(code=CODE), DownBackend())
+
+    assert response.success is False
+    assert "endpoint down" in response.message
+    assert response.generated_docstring
+
+@pytest.mark.asyncio
+async def test_local_backend_without_a_model_falls_back(tmp_path):
+    backend = LocalCPUBackend(model_path=str(tmp_path / "missing"))
+    assert backend.configuration_error()
+
+    with pytest.raises(InferenceUnavailableError):
+        await backend.generate(CODE)
+
+    response = await generate_with_backend(DocstringRequest(code=CODE), backend)
+    assert response.success is False
+    await backend.close()
+
+@pytest.mark.asyncio
+async def test_local_backend_batches_and_rejects_empty_output():
+    backend = LocalCPUBackend()
+    backend.model = object()  # Loaded
+
+    async def run_batch(codes):
+        return ["Add two numbers." if "add" in code else "  " for code in codes]
+
+    backend.batcher.send_batch = run_batch
+    try:
+        assert await backend.generate(CODE) == "Add two numbers."
+        with pytest.raises(InferenceUnavailableError, match="no text"):
+            await backend.generate("def noop(): pass")
+    finally:
+        await backend.close()
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from utils.inference_batcher import InferenceBatcher
+
+class RecordingSender:
+    """send_batch stand-in that records each batch and echoes its inputs."""
+
+    def __init__(self, error: Exception = None, delay: float = 0):
+        self.batches = []
+        self.error = error
+        self.delay = delay
+
+    async def __call__(self, codes):
+        self.batches.append(list(codes))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [f"doc:{code}" for code in codes]
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_when_the_window_expires():
+    sender = RecordingSender()
+    batcher = InferenceBatcher(sender, window_ms=30, max_size=10)
+    try:
+        first = asyncio.create_task(batcher.submit("a"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(batcher.submit("b"))
+
+        assert await asyncio.gather(first, second) == ["doc:a", "doc:b"]
+        assert sender.batches == [["a", "b"]]
+
+        # A request after the window closed starts a new batch
+        assert await batcher.submit("c") == "doc:c"
+        assert sender.batches == [["a", "b"], ["c"]]
+    finally:
+        await batcher.close()
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_before_the_window_expires():
+    sender = RecordingSender()
+    batcher = InferenceBatcher(sender, window_ms=10_000, max_size=3)
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(code) for code in "abc")), timeout=1)
+        assert results == ["doc:a", "doc:b", "doc:c"]
+        assert sender.batches == [["a", "b", "c"]]
+    finally:
+        await batcher.close()
+
+@pytest.mark.asyncio
+async def test_item_over_the_token_budget_starts_the_next_batch():
+    sender = RecordingSender()
+    # 40 characters is about 10 tokens
+    batcher = InferenceBatcher(sender, window_ms=20, max_size=10, max_tokens=25)
+    codes = ["x" * 40, "y" * 40, "z" * 40]
+    try:
+        results = await asyncio.gather(*(batcher.submit(code) for code in codes))
+        assert results == [f"doc:{code}" for code in codes]
+        assert sender.batches == [codes[:2], codes[2:]]
+    finally:
+        await batcher.close()
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    sender = RecordingSender(error=RuntimeError("endpoint down"))
+    batcher = InferenceBatcher(sender, window_ms=20, max_size=10)
+    try:
+        results = await asyncio.gather(*(batcher.submit(code) for code in "abc"), return_exceptions=True)
+        assert len(sender.batches) == 1
+        assert all(isinstance(result, RuntimeError) and str(result) == "endpoint down" for result in results)
+    finally:
+        await batcher.close()
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_are_dropped_before_dispatch():
+    sender = RecordingSender(delay=0.05)
+    batcher = InferenceBatcher(sender, window_ms=10, max_size=10, max_concurrent_batches=1)
+    try:
+        # The first batch occupies the only worker while the others queue up
+        first = asyncio.create_task(batcher.submit("a"))
+        await asyncio.sleep(0.02)
+        kept = asyncio.create_task(batcher.submit("b"))
+        gave_up = asyncio.create_task(batcher.submit("c"))
+        await asyncio.sleep(0)
+        gave_up.cancel()
+
+        assert await first == "doc:a"
+        assert await kept == "doc:b"
+        assert sender.batches == [["a"], ["b"]]
+    finally:
+        await batcher.close()
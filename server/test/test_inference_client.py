@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI
+from utils.inference_client import get_inference_client
+
+
+@pytest.mark.asyncio
+async def test_start_and_close_are_idempotent():
+    inference_client = get_inference_client()
+    try:
+        client = await inference_client.start()
+        assert await inference_client.start() is client
+    finally:
+        await inference_client.close()
+        await inference_client.close()
+
+    assert client.is_closed
+    assert inference_client.client is None
+
+    # A closed client is replaced on the next start
+    try:
+        assert await inference_client.start() is not client
+    finally:
+        await inference_client.close()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_creates_one_shared_client(monkeypatch):
+    import app as app_module
+
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(app_module.db, "connect_to_database", noop)
+    monkeypatch.setattr(app_module.db, "close_database_connection", noop)
+    monkeypatch.setattr(app_module.task_worker, "start", lambda: None)
+    monkeypatch.setattr(app_module.task_worker, "stop", noop)
+    inference_client = get_inference_client()
+
+    async with app_module.app_lifespan(FastAPI()):
+        client = inference_client.client
+        assert client is not None
+        # Every generation path gets the client created at startup
+        assert await inference_client.start() is client
+        assert await get_inference_client().start() is client
+
+    assert client.is_closed
+    assert inference_client.client is None
@@ -0,0 +1,48 @@
+import json
+import httpx
+import pytest
+from httpx import AsyncClient
+from inference_simulator import SimulatorConfig, create_simulator_app, payload_key
+from utils.inference_backend import extract_generated_text, is_model_loading
+
+def simulator_client(**config) -> AsyncClient:
+    sim_app = create_simulator_app(SimulatorConfig(latency_distribution="constant", latency_mean_ms=0, latency_min_ms=0, seed=1, **config))
+    return AsyncClient(transport=httpx.ASGITransport(app=sim_app), base_url="http://simulator")
+
+@pytest.mark.asyncio
+async def test_simulator_speaks_the_endpoint_shapes():
+    async with simulator_client() as client:
+        single = await client.post("/", json={"inputs": "def add(a, b):\n    return a + b"})
+        batch = await client.post("/", json={"inputs": ["def a(): pass", "class B: pass"]})
+
+    assert single.status_code == 200
+    assert not is_model_loading(single.json())
+    assert "Args:" in extract_generated_text(single.json())
+    assert [len(item) for item in batch.json()] == [1, 1]
+
+@pytest.mark.asyncio
+async def test_simulator_cold_start_and_rate_limit():
+    async with simulator_client(cold_start_seconds=60) as client:
+        loading = await client.post("/", json={"inputs": "def f(): pass"})
+    assert loading.status_code == 503
+    assert loading.json()["estimated_time"] > 0
+
+    async with simulator_client(rate_limit_rps=0.001, rate_limit_burst=2, retry_after_seconds=3) as client:
+        statuses = [(await client.post("/", json={"inputs": "def f(): pass"})).status_code for _ in range(3)]
+        limited = await client.post("/", json={"inputs": "def f(): pass"})
+    assert statuses == [200, 200, 429]
+    assert limited.headers["Retry-After"] == "3"
+
+@pytest.mark.asyncio
+async def test_simulator_replays_recordings(tmp_path):
+    payload = {"inputs": "def f(): pass"}
+    recording = {"payload": payload, "status_code": 200, "body": [{"generated_text": "Recorded."}], "latency_seconds": 0.5}
+    (tmp_path / f"{payload_key(payload)}.json").write_text(json.dumps(recording))
+
+    async with simulator_client(mode="replay", recordings_dir=str(tmp_path), error_rate=1.0) as client:
+        replayed = await client.post("/", json=payload)
+        missing = await client.post("/", json={"inputs": "def g(): pass"})
+
+    # Recordings bypass fault injection
+    assert replayed.json() == [{"generated_text": "Recorded."}]
+    assert missing.status_code == 404
@@ -0,0 +1,38 @@
+from utils.local_docstring import LocalDocstringGenerator, split_name
+
+generator = LocalDocstringGenerator()
+
+def test_function_gets_google_style_sections():
+    code = '''    async def get_task_status(self, task_id: str, *extra, limit: int = 10) -> dict:
+        if not task_id:
+            raise ValueError("task_id is required")
+        return {"task_id": task_id}'''
+
+    docstring = generator.generate(code)
+
+    assert docstring.startswith('"""Get the task status.')
+    assert "    task_id (str): The task id." in docstring
+    assert "    *extra: Additional positional arguments." in docstring
+    assert "    limit (int): The limit. Defaults to 10." in docstring
+    assert "self" not in docstring
+    assert "Returns:\n    dict: The task status." in docstring
+    assert "Raises:\n    ValueError: If an argument has an invalid value." in docstring
+
+def test_predicates_generators_and_classes():
+    assert "bool: True if the condition holds" in generator.generate("def is_valid(x):\n    return x > 0")
+    assert "Yields:" in generator.generate("def iter_rows(path):\n    for row in open(path):\n        yield row")
+
+    docstring = generator.generate('''class TaskQueue(BaseQueue):
+    def __init__(self, name: str = "tasks"):
+        self.name = name
+        self._cache = {}''')
+    assert docstring.startswith('"""Task queue.')
+    assert "Extends BaseQueue." in docstring
+    assert "Args:\n    name (str): The name. Defaults to 'tasks'." in docstring
+    assert "Attributes:\n    name: The name." in docstring
+    assert "_cache" not in docstring
+
+def test_unparsable_code_still_gets_a_summary():
+    assert generator.generate("def broken(a, b:\n    return") == '"""Handle broken."""'
+    assert generator.generate("x = 1") == '"""Code documentation."""'
+    assert split_name("HTTPClientError") == ["http", "client", "error"]
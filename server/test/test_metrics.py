@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from utils.metrics import MetricsMiddleware, MongoMetricsListener, count_cache_lookup, set_item_type
+
+def sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+@pytest.mark.asyncio
+async def test_requests_are_timed_by_route_template():
+    metrics_app = FastAPI()
+    metrics_app.add_middleware(MetricsMiddleware)
+
+    @metrics_app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        # Work started by the request carries its route label
+        set_item_type("function")
+        count_cache_lookup("miss")
+        return {"item_id": item_id}
+
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    cache_labels = {"route": "/items/{item_id}", "item_type": "function", "result": "miss"}
+    before = sample("docgen_http_request_duration_seconds_count", labels)
+    cache_before = sample("docgen_docstring_cache_lookups_total", cache_labels)
+
+    async with AsyncClient(transport=httpx.ASGITransport(app=metrics_app), base_url="http://test") as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+
+    assert sample("docgen_http_request_duration_seconds_count", labels) == before + 2
+    assert sample("docgen_docstring_cache_lookups_total", cache_labels) == cache_before + 2
+
+def test_mongo_listener_records_command_latency():
+    listener = MongoMetricsListener()
+    labels = {"command": "find", "collection": "files", "outcome": "success"}
+    before = sample("docgen_mongo_command_duration_seconds_count", labels)
+
+    listener.started(SimpleNamespace(command_name="find", command={"find": "files"}, connection_id=("db", 27017), request_id=7))
+    listener.succeeded(SimpleNamespace(command_name="find", connection_id=("db", 27017), request_id=7, duration_micros=1500))
+
+    assert sample("docgen_mongo_command_duration_seconds_count", labels) == before + 1
+    assert listener.collections == {}
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import utils.parse_cache as parse_cache_module
+from utils.parse_cache import ParseCache, make_parse_key
+from utils.parse_pool import ParsePool
+
+
+class CountingPool(ParsePool):
+    """Parses in a thread and counts the parses."""
+
+    def __init__(self):
+        super().__init__(workers=0)
+        self.calls = 0
+
+    async def parse(self, source, file_name):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return await super().parse(source, file_name)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = CountingPool()
+    monkeypatch.setattr(parse_cache_module, "get_parse_pool", lambda: pool)
+    monkeypatch.setattr(parse_cache_module, "get_db", lambda: None)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_identical_contents_are_parsed_once(pool):
+    cache = ParseCache()
+    code = "def helper():\n    return 1\n"
+
+    structures = await asyncio.gather(
+        cache.parse(code, "a.py"),
+        cache.parse(code, "b.py"),
+    )
+    again = await cache.parse(code, "c.py")
+
+    assert pool.calls == 1
+    assert [s["file_name"] for s in structures + [again]] == ["a.py", "b.py", "c.py"]
+    assert again["functions"][0]["name"] == "helper"
+    assert cache.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_callers_get_their_own_copy(pool):
+    cache = ParseCache()
+    code = "def f():\n    pass\n"
+
+    first = await cache.parse(code, "a.py")
+    first["functions"].clear()
+    second = await cache.parse(code, "a.py")
+
+    assert second["functions"][0]["name"] == "f"
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used(pool):
+    cache = ParseCache(max_size=2)
+
+    await cache.parse("a = 1\n", "a.py")
+    await cache.parse("b = 1\n", "b.py")
+    await cache.parse("a = 1\n", "a.py")
+    await cache.parse("c = 1\n", "c.py")
+
+    assert list(cache.entries) == [make_parse_key("a = 1\n"), make_parse_key("c = 1\n")]
+
+
+def test_key_depends_on_parser_version(monkeypatch):
+    key = make_parse_key("x = 1\n")
+    monkeypatch.setattr(parse_cache_module, "PARSER_VERSION", "test")
+
+    assert make_parse_key("x = 1\n") != key
@@ -0,0 +1,61 @@
+import pytest
+
+from utils.parse_pool import ParseLimitError, ParsePool, resource
+
+
+@pytest.mark.asyncio
+async def test_parses_in_worker_process():
+    pool = ParsePool(workers=1, timeout=30)
+    try:
+        structure = await pool.parse(b"class A:\n    def run(self):\n        pass\n", "a.py")
+    finally:
+        pool.close()
+
+    assert structure["file_name"] == "a.py"
+    assert structure["classes"][0]["methods"][0]["name"] == "run"
+
+
+@pytest.mark.asyncio
+async def test_parse_errors_are_returned_not_raised():
+    pool = ParsePool(workers=1, timeout=30)
+    try:
+        structure = await pool.parse("def f(:\n", "broken.py")
+    finally:
+        pool.close()
+
+    assert "syntax error" in structure["error"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_parse_limit_error():
+    pool = ParsePool(workers=1, timeout=0.001)
+    try:
+        with pytest.raises(ParseLimitError):
+            await pool.parse("def f():\n    return 1\n" * 1000, "slow.py")
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(resource is None, reason="resource limits need a POSIX system")
+async def test_memory_limit_raises_parse_limit_error():
+    pool = ParsePool(workers=1, timeout=30, memory_limit_mb=300)
+    try:
+        with pytest.raises(ParseLimitError):
+            await pool.parse("x = " + "+".join(["1"] * 3_000_000) + "\n", "huge.py")
+
+        # The worker is still usable afterwards
+        structure = await pool.parse("def g():\n    pass\n", "g.py")
+        assert structure["functions"][0]["name"] == "g"
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_without_workers_parses_in_a_thread():
+    pool = ParsePool(workers=0)
+
+    structure = await pool.parse("def f():\n    pass\n", "f.py")
+
+    assert structure["functions"][0]["name"] == "f"
+    assert pool.pool is None
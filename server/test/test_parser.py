@@ -0,0 +1,135 @@
+import ast
+
+from utils.parser import CodeParserService, SourceSlicer
+
+
+SOURCE = '''import functools
+
+
+@functools.lru_cache(maxsize=None)
+def fib(n):  # keep this comment
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+
+class Greeter(object):
+    """Says hello."""
+
+    def greet(self, name="wörld"):
+        message = (
+            "héllo, "
+            + name
+        )
+        return message
+
+    @property
+    def loud(self): return "HÉLLO"
+'''
+
+
+def code_of(source, item):
+    return SourceSlicer(source).slice(item["start_byte"], item["end_byte"])
+
+
+def test_function_code_is_sliced_verbatim():
+    result = CodeParserService().parse_code(SOURCE)
+
+    fib = result["functions"][0]
+    assert fib["line"] == 5
+    assert fib["end_line"] == 8
+    assert code_of(SOURCE, fib) == (
+        "@functools.lru_cache(maxsize=None)\n"
+        "def fib(n):  # keep this comment\n"
+        "    if n < 2:\n"
+        "        return n\n"
+        "    return fib(n - 1) + fib(n - 2)"
+    )
+
+
+def test_methods_are_dedented_and_keep_formatting():
+    result = CodeParserService().parse_code(SOURCE)
+
+    greeter = result["classes"][0]
+    assert greeter["line"] == 11
+    assert greeter["end_line"] == 22
+    assert code_of(SOURCE, greeter).startswith('class Greeter(object):\n    """Says hello."""')
+    assert code_of(SOURCE, greeter).endswith('def loud(self): return "HÉLLO"')
+
+    greet, loud = greeter["methods"]
+    assert code_of(SOURCE, greet) == (
+        'def greet(self, name="wörld"):\n'
+        "    message = (\n"
+        '        "héllo, "\n'
+        "        + name\n"
+        "    )\n"
+        "    return message"
+    )
+    assert greet["end_line"] == 19
+    assert code_of(SOURCE, loud) == '@property\ndef loud(self): return "HÉLLO"'
+
+
+def test_multiline_strings_at_column_zero_keep_methods_valid():
+    source = (
+        "class Query:\n"
+        "    def sql(self):\n"
+        "        return \"\"\"\n"
+        "SELECT *\n"
+        "  FROM users\n"
+        "\"\"\"\n"
+    )
+    result = CodeParserService().parse_code(source)
+
+    code = code_of(source, result["classes"][0]["methods"][0])
+    assert code == (
+        "def sql(self):\n"
+        '    return """\n'
+        "SELECT *\n"
+        "  FROM users\n"
+        '"""'
+    )
+    # The snippet parses on its own and the string is unchanged
+    ast.parse(code)
+
+
+def test_structure_stores_ranges_not_code():
+    result = CodeParserService().parse_code(SOURCE)
+
+    items = result["functions"] + result["classes"] + result["classes"][0]["methods"]
+    assert all("code" not in item for item in items)
+    fib = result["functions"][0]
+    assert SOURCE.encode("utf-8")[fib["start_byte"]:fib["end_byte"]].startswith(b"@functools")
+
+
+def test_windows_line_endings():
+    source = "def f():\r\n    return 1\r\n\r\ndef g():\r    return 'é'\r"
+    result = CodeParserService().parse_code(source)
+
+    # Ranges point into the content as stored, line endings included
+    f, g = result["functions"]
+    assert code_of(source, f) == "def f():\n    return 1"
+    assert g["line"] == 4
+    assert code_of(source, g) == "def g():\n    return 'é'"
+
+
+def test_parse_source_decodes_bytes():
+    parser = CodeParserService()
+
+    utf8 = parser.parse_source('def héllo():\n    return "wörld"\n'.encode("utf-8"), "a.py")
+    assert utf8["file_name"] == "a.py"
+    assert utf8["functions"][0]["name"] == "héllo"
+
+    bom = parser.parse_source(b'\xef\xbb\xbfdef f():\r\n    return 1\r\n', "b.py")
+    assert bom["functions"][0]["line"] == 1
+    assert code_of("def f():\r\n    return 1\r\n", bom["functions"][0]) == "def f():\n    return 1"
+
+    latin1 = parser.parse_source('# -*- coding: latin-1 -*-\ndef f():\n    return "é"\n'.encode("latin-1"), "c.py")
+    assert code_of('# -*- coding: latin-1 -*-\ndef f():\n    return "é"\n', latin1["functions"][0]) == 'def f():\n    return "é"'
+
+
+def test_parse_source_reports_errors():
+    parser = CodeParserService()
+
+    assert parser.parse_source(b"   \n", "empty.py")["error"] == "File is empty"
+    assert "Could not decode" in parser.parse_source(b"x = '\xff'\n", "bad.py")["error"]
+    assert parser.parse_source("def f(:\n", "broken.py")["error_line"] == 1
@@ -0,0 +1,46 @@
+import ast
+
+from benchmarks.parser_benchmark import CASES, compare, measure, nested_classes_module
+from utils.ast_enhancer import ASTEnhancedDocGenerator
+
+
+def test_synthetic_modules_are_valid_python():
+    for name in ("small", "nested_classes"):
+        ast.parse(CASES[name]())
+    assert "class Level0_49" in nested_classes_module(depth=50, breadth=1)
+
+
+def test_measure_reports_every_metric():
+    result = measure(lambda: {"items": list(range(100))}, repeat=2)
+
+    assert set(result) == {"seconds", "peak_kib", "output_bytes"}
+    assert result["output_bytes"] == len('{"items": [' + ", ".join(map(str, range(100))) + "]}")
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"cases": {"small": {
+        "parse_code": {"seconds": 1.0, "peak_kib": 100.0, "output_bytes": 1000},
+        "ast_to_dict": {"seconds": 0.001, "peak_kib": 10.0, "output_bytes": 50},
+    }}}
+    results = {"cases": {"small": {
+        "source_bytes": 123,
+        "parse_code": {"seconds": 1.2, "peak_kib": 200.0, "output_bytes": 1000},
+        "ast_to_dict": {"seconds": 0.005, "peak_kib": 10.0, "output_bytes": 50},  # Below the noise floor
+    }}}
+
+    assert compare(results, baseline, time_tolerance=0.5, size_tolerance=0.1, min_seconds=0.01) == [
+        "small/parse_code peak_kib: 100.0 -> 200.0 (+100%)",
+    ]
+    assert compare(results, baseline, time_tolerance=0.1, size_tolerance=0.1, min_seconds=0.01) == [
+        "small/parse_code seconds: 1.0 -> 1.2 (+20%)",
+        "small/parse_code peak_kib: 100.0 -> 200.0 (+100%)",
+    ]
+
+
+def test_ast_enhancer_keeps_node_type_of_except_handlers():
+    enhancer = ASTEnhancedDocGenerator()
+    tree = ast.parse("def f():\n    try:\n        return g()\n    except ValueError:\n        raise KeyError()\n")
+
+    ast_data = {"type": "Module", "body": enhancer.ast_to_dict(tree)}
+
+    assert "ExceptHandler" in enhancer.flatten_ast_data(ast_data)
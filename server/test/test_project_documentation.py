@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+import controller.DocumentationController as DocumentationController
+import utils.inference_backend as inference_backend
+from controller.DocumentationController import document_project_functions
+from model.Documentation import ProjectDocumentationRequest
+from utils.inference_backend import InferenceBackend
+from utils.parser import CodeParserService
+
+FILES = 4
+FUNCTIONS_PER_FILE = 4
+MAX_IN_FLIGHT = 3
+
+
+class Gauge:
+    """Counts concurrent entries and remembers the peak."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        self.current -= 1
+
+
+class TrackingBackend(InferenceBackend):
+    """Backend that records how many generations were in flight at once."""
+    name = "tracking"
+    model_id = "tracking:parallel-project"
+
+    def __init__(self):
+        self.in_flight = Gauge()
+
+    async def generate(self, code: str) -> str:
+        self.in_flight.enter()
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.in_flight.leave()
+        return "Step."
+
+
+async def make_project(test_db) -> str:
+    project_id = (await test_db.projects.insert_one({"name": "parallel"})).inserted_id
+    for file_index in range(FILES):
+        source = "".join(
+            f"def f{file_index}_{i}(value):\n    return value + {i}\n\n" for i in range(FUNCTIONS_PER_FILE)
+        )
+        await test_db.files.insert_one({
+            "project_id": project_id,
+            "file_name": f"steps_{file_index}.py",
+            "content": source,
+            "processed": True,
+            "structure": CodeParserService().parse_code(source),
+        })
+    return str(project_id)
+
+
+@pytest.mark.asyncio
+async def test_parallel_files_share_the_global_in_flight_limit(test_db, monkeypatch):
+    backend = TrackingBackend()
+    monkeypatch.setattr(inference_backend, "inference_backend", backend)
+    monkeypatch.setattr(inference_backend, "INFERENCE_MAX_IN_FLIGHT", MAX_IN_FLIGHT)
+    files = Gauge()
+    document_file = DocumentationController.document_file_functions
+
+    async def tracked_document_file(*args, **kwargs):
+        files.enter()
+        try:
+            return await document_file(*args, **kwargs)
+        finally:
+            files.leave()
+
+    monkeypatch.setattr(DocumentationController, "document_file_functions", tracked_document_file)
+    project_id = await make_project(test_db)
+
+    response = await document_project_functions(
+        project_id, ProjectDocumentationRequest(parallel=True, max_concurrent_files=2), test_db
+    )
+
+    assert response.total_files == FILES
+    # Files overlapped, but never more than the file semaphore allows
+    assert files.peak == 2
+    assert 1 < backend.in_flight.peak <= MAX_IN_FLIGHT
+    assert all(file.elapsed_seconds > 0 for file in response.documented_files)
+    # Overlapping files finish sooner than running them one after another
+    assert 0 < response.makespan_seconds < sum(file.elapsed_seconds for file in response.documented_files)
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from utils.single_flight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "docstring"
+
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    assert results == ["docstring"] * 5
+    assert calls == 1
+    assert flights.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_failure_propagates_to_all_waiters():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("endpoint down")
+
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flights.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_do_not_leak_entries():
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(10)
+
+    first = asyncio.create_task(flights.do("key", work))
+    second = asyncio.create_task(flights.do("key", work))
+    await started.wait()
+
+    # Cancelling one waiter keeps the shared call alive for the other
+    first.cancel()
+    await asyncio.sleep(0)
+    assert flights.in_flight() == 1
+
+    second.cancel()
+    await asyncio.gather(first, second, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert flights.in_flight() == 0
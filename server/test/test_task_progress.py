@@ -0,0 +1,30 @@
+from controller.TaskController import DocumentationProgress
+from utils.task_queue import TaskStatus
+
+def test_progress_counts_items_and_failures():
+    progress = DocumentationProgress()
+
+    progress.handle({"event": "start", "project_name": "P", "files_total": 2})
+    progress.handle({"event": "file_start", "file_name": "a.py", "items_total": 2})
+    progress.handle({"event": "item", "file_name": "a.py", "generation_success": True, "items_done": 1, "items_total": 2})
+    progress.handle({"event": "item_error", "file_name": "a.py", "item_name": "f", "error": "boom", "items_done": 2, "items_total": 2})
+    progress.handle({"event": "file", "file_name": "a.py", "success": True, "total_items": 1, "elapsed_seconds": 0.1})
+
+    snapshot = progress.snapshot()
+    assert snapshot["files_done"] == 1
+    assert snapshot["items_done"] == 2
+    assert snapshot["items_failed"] == 1
+    assert snapshot["failures"] == [{"file_name": "a.py", "item_name": "f", "error": "boom"}]
+    assert snapshot["files"][0]["status"] == TaskStatus.COMPLETED
+    assert snapshot["eta_seconds"] is not None
+
+def test_failed_file_is_reported():
+    progress = DocumentationProgress()
+
+    progress.handle({"event": "start", "project_name": "P", "files_total": 1})
+    progress.handle({"event": "file", "file_name": "b.py", "success": False, "error": "File structure not available"})
+
+    snapshot = progress.snapshot()
+    assert snapshot["files_done"] == 1
+    assert snapshot["files"][0]["status"] == TaskStatus.FAILED
+    assert snapshot["failures"][0]["item_name"] is None
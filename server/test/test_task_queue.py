@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from utils.task_queue import TaskQueue, TaskStatus
+
+@pytest.fixture
+def queue(test_db):
+    task_queue = TaskQueue()
+    task_queue._collection = lambda: test_db.tasks
+    return task_queue
+
+@pytest.mark.asyncio
+async def test_claim_is_exclusive(queue, test_db):
+    await test_db.tasks.delete_many({})
+    task = await queue.add_task("project_documentation", {"project_id": "p"}, "Document project p")
+
+    claims = await asyncio.gather(queue.claim_task("worker-a"), queue.claim_task("worker-b"))
+
+    claimed = [claim for claim in claims if claim is not None]
+    assert len(claimed) == 1
+    assert claimed[0]["task_id"] == task["task_id"]
+    assert claimed[0]["attempts"] == 1
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed_with_checkpoints(queue, test_db):
+    await test_db.tasks.delete_many({})
+    task = await queue.add_task("project_documentation", {"project_id": "p"}, "Document project p")
+
+    await queue.claim_task("worker-a", lease_seconds=0.05)
+    assert await queue.checkpoint_file(task["task_id"], "worker-a", "file-1", {"files_done": 1})
+    await asyncio.sleep(0.1)
+
+    resumed = await queue.claim_task("worker-b")
+    assert resumed["attempts"] == 2
+    assert resumed["completed_file_ids"] == ["file-1"]
+    # The first worker lost its lease
+    assert not await queue.heartbeat(task["task_id"], "worker-a")
+
+@pytest.mark.asyncio
+async def test_failures_are_dead_lettered_after_max_attempts(queue, test_db, monkeypatch):
+    await test_db.tasks.delete_many({})
+    monkeypatch.setattr("utils.task_queue.TASK_RETRY_DELAY", 0)
+    task = await queue.add_task("project_documentation", {}, "Document project", max_attempts=2)
+
+    await queue.claim_task("worker-a")
+    assert await queue.fail_task(task["task_id"], "worker-a", "endpoint down") == TaskStatus.PENDING
+
+    await queue.claim_task("worker-a")
+    assert await queue.fail_task(task["task_id"], "worker-a", "endpoint down") == TaskStatus.DEAD_LETTER
+    assert await queue.claim_task("worker-a") is None
@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from bson import ObjectId
+import controller.DocumentationController as DocumentationController
+import controller.TaskController as TaskController
+from controller.TaskController import LeaseLostError, TaskWorker, run_project_documentation
+from model.Documentation import DocstringResponse
+from utils.parser import CodeParserService
+
+SOURCE = "".join(f"def step_{i}(value):\n    return value + {i}\n\n" for i in range(4))
+
+
+class FakeTaskQueue:
+    """Records lease calls; the lease is lost once `lease_calls` writes were made."""
+
+    def __init__(self, lease_calls: int):
+        self.lease_calls = lease_calls
+        self.calls = []
+
+    def _renew(self, name: str) -> bool:
+        self.calls.append(name)
+        return len(self.calls) <= self.lease_calls
+
+    async def update_progress(self, task_id, worker_id, progress):
+        return self._renew("update_progress")
+
+    async def checkpoint_file(self, task_id, worker_id, file_id, progress):
+        return self._renew("checkpoint_file")
+
+    async def heartbeat(self, task_id, worker_id):
+        return self._renew("heartbeat")
+
+    async def complete_task(self, task_id, worker_id, result=None):
+        return self._renew("complete_task")
+
+    async def fail_task(self, task_id, worker_id, error, retryable=True):
+        self.calls.append("fail_task")
+        return "pending"
+
+
+async def make_project(test_db, files: int = 1) -> str:
+    project_id = (await test_db.projects.insert_one({"name": "lease"})).inserted_id
+    for i in range(files):
+        await test_db.files.insert_one({
+            "project_id": project_id,
+            "file_name": f"steps_{i}.py",
+            "content": SOURCE,
+            "processed": True,
+            "structure": CodeParserService().parse_code(SOURCE),
+        })
+    return str(project_id)
+
+
+def make_task(project_id: str) -> dict:
+    return {
+        "task_id": "task-1",
+        "task_type": TaskController.PROJECT_DOCUMENTATION_TASK,
+        "payload": {"project_id": project_id},
+        "attempts": 1,
+        "max_attempts": 3,
+    }
+
+
+@pytest.fixture
+def generated(test_db, monkeypatch):
+    calls = []
+
+    async def fake_generate(request, priority=None):
+        calls.append(request.code)
+        await asyncio.sleep(0.01)
+        return DocstringResponse(original_code=request.code, generated_docstring='"""Step."""', success=True)
+
+    monkeypatch.setattr(DocumentationController, "generate_docstring_for_code", fake_generate)
+    monkeypatch.setattr(TaskController, "get_db", lambda: test_db)
+    monkeypatch.setattr(TaskController, "TASK_PROGRESS_INTERVAL", 0)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_lease_lost_midway_through_a_file_stops_the_run(test_db, generated, monkeypatch):
+    # "start" and "file_start" renew the lease, the first item event loses it
+    queue = FakeTaskQueue(lease_calls=2)
+    monkeypatch.setattr(TaskController, "get_task_queue", lambda: queue)
+    project_id = await make_project(test_db, files=2)
+
+    with pytest.raises(LeaseLostError):
+        await run_project_documentation(make_task(project_id), "worker-a")
+
+    # Neither the lost file nor the next one was finished or checkpointed
+    assert "checkpoint_file" not in queue.calls
+    assert len(generated) == 4
+    assert not await test_db.file_documentation.find_one({"project_id": ObjectId(project_id)})
+
+
+@pytest.mark.asyncio
+async def test_lease_lost_at_checkpoint_is_not_recorded_as_a_failure(test_db, generated, monkeypatch):
+    queue = FakeTaskQueue(lease_calls=0)
+    monkeypatch.setattr(TaskController, "get_task_queue", lambda: queue)
+    monkeypatch.setattr(TaskController, "TASK_PROGRESS_INTERVAL", 60)
+    # Only the checkpoint of the finished file writes to the task
+    queue.update_progress = lambda *args: asyncio.sleep(0, True)
+    project_id = await make_project(test_db, files=2)
+
+    await TaskWorker(concurrency=0)._run(make_task(project_id))
+
+    assert queue.calls == ["checkpoint_file"]
+    # The second file was cancelled before it finished
+    assert await test_db.file_documentation.count_documents({"project_id": ObjectId(project_id)}) == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_lost_on_heartbeat_cancels_the_run(test_db, generated, monkeypatch):
+    queue = FakeTaskQueue(lease_calls=0)
+    monkeypatch.setattr(TaskController, "get_task_queue", lambda: queue)
+    monkeypatch.setattr(TaskController, "TASK_LEASE_SECONDS", 0.03)
+    queue.update_progress = lambda *args: asyncio.sleep(0, True)
+
+    async def slow_generate(request, priority=None):
+        generated.append(request.code)
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(DocumentationController, "generate_docstring_for_code", slow_generate)
+    project_id = await make_project(test_db)
+
+    await asyncio.wait_for(TaskWorker(concurrency=0)._run(make_task(project_id)), timeout=2)
+
+    assert queue.calls == ["heartbeat"]
+    assert not await test_db.documentation_items.find_one({"project_id": ObjectId(project_id)})
+
+
+@pytest.mark.asyncio
+async def test_lease_lost_at_completion_is_not_logged_as_completed(test_db, generated, monkeypatch, caplog):
+    queue = FakeTaskQueue(lease_calls=0)
+    monkeypatch.setattr(TaskController, "get_task_queue", lambda: queue)
+    # Progress and checkpoint writes keep the lease; only completion finds it lost
+    queue.update_progress = lambda *args: asyncio.sleep(0, True)
+    queue.checkpoint_file = lambda *args: asyncio.sleep(0, True)
+    project_id = await make_project(test_db)
+
+    with caplog.at_level("INFO", logger=TaskController.__name__):
+        await TaskWorker(concurrency=0)._run(make_task(project_id))
+
+    assert queue.calls == ["complete_task"]
+    messages = [record.getMessage() for record in caplog.records]
+    assert "Lost lease on task task-1 before it was completed" in messages
+    assert "Task task-1 completed" not in messages
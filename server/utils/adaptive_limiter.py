@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.inference_client import INFERENCE_MAX_IN_FLIGHT
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# AIMD limiter configuration
+LIMITER_INITIAL_LIMIT = float(os.getenv("INFERENCE_LIMITER_INITIAL", "4"))
+LIMITER_MIN_LIMIT = float(os.getenv("INFERENCE_LIMITER_MIN", "1"))
+LIMITER_MAX_LIMIT = float(os.getenv("INFERENCE_LIMITER_MAX", str(INFERENCE_MAX_IN_FLIGHT)))
+LIMITER_BACKOFF_FACTOR = float(os.getenv("INFERENCE_LIMITER_BACKOFF", "0.5"))
+LIMITER_LATENCY_SPIKE_FACTOR = float(os.getenv("INFERENCE_LIMITER_SPIKE_FACTOR", "3.0"))
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limiter.
+
+    Every healthy response raises the limit by 1/limit, so it grows by about
+    one slot per round of requests. An overload signal (429, 503, a timeout
+    or a latency spike well above the smoothed baseline) multiplies the
+    limit by backoff_factor, at most once per recent latency so a single
+    burst of errors does not collapse it to the minimum.
+
+    The baseline is latency per input token when sizes are given, so large
+    snippets are not mistaken for spikes. Spikes still move the baseline,
+    more slowly, so a lasting shift in endpoint latency becomes the new
+    normal instead of pinning the limit at its minimum.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = LIMITER_INITIAL_LIMIT,
+        min_limit: float = LIMITER_MIN_LIMIT,
+        max_limit: float = LIMITER_MAX_LIMIT,
+        backoff_factor: float = LIMITER_BACKOFF_FACTOR,
+        latency_spike_factor: float = LIMITER_LATENCY_SPIKE_FACTOR,
+        smoothing: float = 0.1,
+        spike_smoothing: float = 0.05,
+    ):
+        self.min_limit = max(1.0, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.backoff_factor = backoff_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.smoothing = smoothing
+        self.spike_smoothing = spike_smoothing
+        self.in_flight = 0
+        self.baseline_latency = None  # Seconds per input token (or per request without sizes)
+        self.recent_latency = None  # Seconds per request, for the decrease cooldown
+        self.last_decrease = 0.0
+        self.condition = None
+        self.stats = {"increases": 0, "decreases": 0}
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Create the condition lazily so it binds to the running loop."""
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        return self.condition
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Wait for a free slot under the current limit and hold it."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def try_reserve(self) -> Optional[Callable[[], None]]:
+        """
+        Take a free slot without waiting, for optional work such as a hedged request.
+
+        Returns:
+            A callback that releases the slot (safe to call more than once), or None if no slot is free
+        """
+        if self.in_flight >= int(self.limit):
+            return None
+        self.in_flight += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.in_flight -= 1
+            asyncio.get_running_loop().create_task(self._notify())
+
+        return release
+
+    async def _notify(self):
+        """Wake waiters after the limit grew or a reserved slot was released."""
+        condition = self._get_condition()
+        async with condition:
+            condition.notify_all()
+
+    async def on_success(self, latency: float, tokens: Optional[int] = None):
+        """
+        Record a healthy response.
+
+        Args:
+            latency: Seconds the request took
+            tokens: Size of the request's input, to compare latencies per token
+        """
+        if self.recent_latency is None:
+            self.recent_latency = latency
+        else:
+            self.recent_latency += self.smoothing * (latency - self.recent_latency)
+
+        sample = latency / max(1, tokens or 1)
+        if self.baseline_latency is None:
+            self.baseline_latency = sample
+        elif sample > self.baseline_latency * self.latency_spike_factor:
+            logger.info(f"Inference latency spike ({sample:.4f}s vs {self.baseline_latency:.4f}s baseline per token)")
+            self.baseline_latency += self.spike_smoothing * (sample - self.baseline_latency)
+            self.on_overload()
+            return
+        else:
+            self.baseline_latency += self.smoothing * (sample - self.baseline_latency)
+
+        if self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.stats["increases"] += 1
+            await self._notify()
+
+    def on_overload(self):
+        """Record an overload signal (429, 503, timeout or latency spike)."""
+        now = time.monotonic()
+        cooldown = self.recent_latency or 1.0
+        if now - self.last_decrease < cooldown:
+            return
+
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+        self.last_decrease = now
+        self.stats["decreases"] += 1
+        logger.warning(f"Inference concurrency limit reduced from {previous:.1f} to {self.limit:.1f}")
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get the current limit and load for observability."""
+        return {
+            "limit": int(self.limit),
+            "raw_limit": round(self.limit, 3),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "baseline_latency": round(self.baseline_latency, 6) if self.baseline_latency is not None else None,
+            "recent_latency": round(self.recent_latency, 4) if self.recent_latency is not None else None,
+            **self.stats,
+        }
+
+# Create a singleton limiter for the inference endpoint
+inference_limiter = AdaptiveConcurrencyLimiter()
+
+def get_inference_limiter() -> AdaptiveConcurrencyLimiter:
+    """Get the inference endpoint concurrency limiter"""
+    return inference_limiter
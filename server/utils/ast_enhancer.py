@@ -52,7 +52,8 @@ class ASTEnhancedDocGenerator:
             for field, value in ast.iter_fields(node):
                 processed_value = self.ast_to_dict(value)
                 if processed_value is not None:
-                    result[field] = processed_value
+                    # ExceptHandler has a "type" field; don't let it replace the node type
+                    result['exc_type' if field == 'type' else field] = processed_value
             
             return result
             
@@ -0,0 +1,170 @@
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Circuit breaker configuration
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("INFERENCE_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RECOVERY_TIMEOUT = float(os.getenv("INFERENCE_BREAKER_RECOVERY_TIMEOUT", "30"))
+
+class CircuitState:
+    """Circuit breaker state constants"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Shared endpoint-health state machine.
+
+    Closed: requests flow and consecutive failures are counted.
+    Open: after failure_threshold consecutive failures every request fails
+    fast until recovery_timeout has passed.
+    Half-open: a single probe request is let through; its outcome closes the
+    circuit again or re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = BREAKER_RECOVERY_TIMEOUT,
+        name: str = "inference",
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = None
+        self.open_count = 0
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a request may be sent to the endpoint.
+
+        Returns:
+            True if the request may proceed (possibly as the half-open probe)
+        """
+        now = time.monotonic()
+
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if now - self.opened_at < self.recovery_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.probe_started_at = now
+            logger.info(f"Circuit '{self.name}' half-open, sending probe request")
+            return True
+
+        # Half-open: only one probe at a time, but never wait forever on a lost probe
+        if self.probe_started_at is not None and now - self.probe_started_at < self.recovery_timeout:
+            return False
+        self.probe_started_at = now
+        return True
+
+    def record_success(self):
+        """Record a healthy response; closes the circuit."""
+        if self.state != CircuitState.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed, endpoint recovered")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.probe_started_at = None
+
+    def record_failure(self):
+        """Record a failed request; may open the circuit."""
+        self.consecutive_failures += 1
+
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                logger.warning(
+                    f"Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures"
+                )
+                self.open_count += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+    def seconds_until_retry(self) -> float:
+        """Seconds left before an open circuit lets a probe through."""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get the current breaker state for observability."""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+            "seconds_until_retry": round(self.seconds_until_retry(), 3),
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Either a number of seconds or an HTTP date
+
+    Returns:
+        Delay in seconds, or None if missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def compute_backoff(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    retry_after: Optional[float] = None,
+) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based attempt number that just failed
+        base_delay: Delay scale for the first retry
+        max_delay: Upper bound for any delay
+        retry_after: Server-provided hint that takes precedence when larger
+
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return min(delay, max_delay)
+
+# Create a singleton breaker for the inference endpoint
+inference_breaker = CircuitBreaker()
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the inference endpoint circuit breaker"""
+    return inference_breaker
@@ -5,6 +5,8 @@ import os
 from dotenv import load_dotenv
 import logging
 
+from utils.metrics import MongoMetricsListener
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -42,7 +44,8 @@ class Database:
                 self.client = AsyncIOMotorClient(
                     MONGO_URI,
                     retryWrites=True,
-                    w="majority"  # Important for transactions
+                    w="majority",  # Important for transactions
+                    event_listeners=[MongoMetricsListener()]  # Command latency metrics
                 )
                 self.db = self.client[DB_NAME]
                 
@@ -124,6 +127,10 @@ class Database:
         """Setup all required collections and indexes"""
         try:
             await self.setup_users_collection()
+            await self.setup_docstring_cache_collection()
+            await self.setup_tasks_collection()
+            await self.setup_documentation_items_collection()
+            await self.setup_parse_cache_collection()
             # Add other collection setup methods as needed
         except Exception as e:
             logger.error(f"Error setting up collections: {e}")
@@ -142,6 +149,54 @@ class Database:
             logger.error(f"Error setting up users collection: {e}")
             raise e
 
+    async def setup_docstring_cache_collection(self):
+        """Setup docstring cache collection and its indexes"""
+        try:
+            await self.db.docstring_cache.create_index("key", unique=True)
+            await self.db.docstring_cache.create_index("model_id")
+            logger.info("Docstring cache collection setup completed.")
+        except Exception as e:
+            logger.error(f"Error setting up docstring cache collection: {e}")
+            raise e
+
+    async def setup_tasks_collection(self):
+        """Setup background tasks collection and its indexes"""
+        try:
+            # Claim query: runnable pending tasks and expired leases, oldest first
+            await self.db.tasks.create_index([("status", 1), ("available_at", 1), ("created_at", 1)])
+            await self.db.tasks.create_index([("status", 1), ("lease_expires_at", 1)])
+            await self.db.tasks.create_index("owner_id")
+            # Finished tasks are removed once their expires_at date has passed
+            await self.db.tasks.create_index("expires_at", expireAfterSeconds=0)
+            logger.info("Tasks collection setup completed.")
+        except Exception as e:
+            logger.error(f"Error setting up tasks collection: {e}")
+            raise e
+
+    async def setup_documentation_items_collection(self):
+        """Setup per-item documentation collection and its indexes"""
+        try:
+            # One document per documented item, upserted as it completes
+            await self.db.documentation_items.create_index(
+                [("file_id", 1), ("item_key", 1)], unique=True
+            )
+            await self.db.documentation_items.create_index([("file_id", 1), ("position", 1)])
+            await self.db.documentation_items.create_index("project_id")
+            logger.info("Documentation items collection setup completed.")
+        except Exception as e:
+            logger.error(f"Error setting up documentation items collection: {e}")
+            raise e
+
+    async def setup_parse_cache_collection(self):
+        """Setup parsed structure cache collection and its indexes"""
+        try:
+            await self.db.parse_cache.create_index("key", unique=True)
+            await self.db.parse_cache.create_index("parser_version")
+            logger.info("Parse cache collection setup completed.")
+        except Exception as e:
+            logger.error(f"Error setting up parse cache collection: {e}")
+            raise e
+
     async def close_database_connection(self):
         """Close the database connection"""
         if self.client:
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import textwrap
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.db import get_db
+from utils.metrics import count_cache_lookup
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Cache configuration
+DOCSTRING_CACHE_SIZE = int(os.getenv("DOCSTRING_CACHE_SIZE", "5000"))  # In-process LRU entries
+DOCSTRING_CACHE_ENABLED = os.getenv("DOCSTRING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Identifies the model (and version) behind the endpoint; change it to start a fresh cache
+INFERENCE_MODEL_ID = os.getenv("INFERENCE_MODEL_ID") or os.getenv("HUGGINGFACE_ENDPOINT") or "huggingface"
+
+
+def normalize_code(code: str) -> str:
+    """
+    Normalize code so formatting-only differences map to the same cache key.
+
+    Removes common indentation, trailing whitespace and blank lines, and
+    unifies line endings.
+    """
+    code = code.replace("\r\n", "\n").replace("\r", "\n").expandtabs(4)
+    lines = [line.rstrip() for line in textwrap.dedent(code).split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def hash_code(code: str) -> str:
+    """Hash normalized code, independent of the model (used to detect changed items)."""
+    return hashlib.sha256(normalize_code(code).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(code: str, model_id: Optional[str] = None) -> str:
+    """Build the content-addressed cache key for a code snippet and model."""
+    model_id = model_id or INFERENCE_MODEL_ID
+    digest = hashlib.sha256()
+    digest.update(model_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_code(code).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DocstringCache:
+    """
+    Two-level docstring cache: an in-process LRU in front of the
+    "docstring_cache" MongoDB collection.
+
+    Entries are keyed by a hash of the normalized code and the model
+    identifier, so a new model version never serves stale docstrings.
+    """
+
+    def __init__(self, max_size: int = DOCSTRING_CACHE_SIZE):
+        """Initialize an empty cache"""
+        self.max_size = max_size
+        self.entries = OrderedDict()  # key -> (model_id, docstring)
+        self.stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "stores": 0,
+        }
+
+    def _collection(self):
+        """Get the backing collection, or None when the database is not connected."""
+        database = get_db()
+        return database.docstring_cache if database is not None else None
+
+    def _remember(self, key: str, model_id: str, docstring: str):
+        """Insert an entry in the LRU, evicting the least recently used one."""
+        self.entries[key] = (model_id, docstring)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def get(self, code: str, model_id: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached docstring.
+
+        Args:
+            code: The code snippet
+            model_id: Model identifier (defaults to INFERENCE_MODEL_ID)
+
+        Returns:
+            The cached docstring or None on a miss
+        """
+        if not DOCSTRING_CACHE_ENABLED:
+            return None
+
+        model_id = model_id or INFERENCE_MODEL_ID
+        key = make_cache_key(code, model_id)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            count_cache_lookup("memory_hit")
+            return entry[1]
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = await collection.find_one({"key": key}, {"docstring": 1})
+                if doc:
+                    self._remember(key, model_id, doc["docstring"])
+                    self.stats["db_hits"] += 1
+                    count_cache_lookup("db_hit")
+                    return doc["docstring"]
+            except Exception as e:
+                logger.warning(f"Docstring cache lookup failed: {str(e)}")
+
+        self.stats["misses"] += 1
+        count_cache_lookup("miss")
+        return None
+
+    async def set(self, code: str, docstring: str, model_id: Optional[str] = None):
+        """Store a generated docstring in both cache levels."""
+        if not DOCSTRING_CACHE_ENABLED:
+            return
+
+        model_id = model_id or INFERENCE_MODEL_ID
+        key = make_cache_key(code, model_id)
+        self._remember(key, model_id, docstring)
+        self.stats["stores"] += 1
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                await collection.update_one(
+                    {"key": key},
+                    {
+                        "$set": {"docstring": docstring, "model_id": model_id},
+                        "$setOnInsert": {"created_at": datetime.now(timezone.utc)},
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Docstring cache store failed: {str(e)}")
+
+    async def invalidate(self, model_id: Optional[str] = None) -> int:
+        """
+        Drop every cached docstring produced by a model.
+
+        Args:
+            model_id: Model identifier (defaults to INFERENCE_MODEL_ID)
+
+        Returns:
+            Number of persistent entries removed
+        """
+        model_id = model_id or INFERENCE_MODEL_ID
+
+        for key in [key for key, (entry_model, _) in self.entries.items() if entry_model == model_id]:
+            del self.entries[key]
+
+        deleted = 0
+        collection = self._collection()
+        if collection is not None:
+            result = await collection.delete_many({"model_id": model_id})
+            deleted = result.deleted_count
+
+        logger.info(f"Invalidated docstring cache for model {model_id} ({deleted} stored entries)")
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current LRU size."""
+        lookups = self.stats["memory_hits"] + self.stats["db_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["db_hits"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.entries),
+            "model_id": INFERENCE_MODEL_ID,
+        }
+
+# Create a singleton cache
+docstring_cache = DocstringCache()
+
+def get_docstring_cache() -> DocstringCache:
+    """Get the global docstring cache instance"""
+    return docstring_cache
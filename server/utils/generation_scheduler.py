@@ -0,0 +1,167 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.inference_backend import get_inference_backend
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Scheduler configuration
+SCHEDULER_INTERACTIVE_RESERVED = int(os.getenv("SCHEDULER_INTERACTIVE_RESERVED", "1"))  # Slots only interactive calls may use
+
+class GenerationPriority:
+    """Generation priority classes (lower runs first)"""
+    INTERACTIVE = 0  # Single snippets from POST /docs/generate
+    FILE = 1  # Documenting one file
+    PROJECT = 2  # Bulk project runs and background tasks
+    SPECULATIVE = 3  # Work nobody is waiting for yet
+
+    NAMES = {INTERACTIVE: "interactive", FILE: "file", PROJECT: "project", SPECULATIVE: "speculative"}
+
+
+class GenerationScheduler:
+    """
+    Central admission point for docstring generation.
+
+    Every generation waits for a slot; free slots go to the waiter with the
+    best priority, FIFO within a class. The backend's current capacity (for
+    the HF endpoint, the adaptive concurrency limit) sets the number of
+    slots, so bulk work never queues ahead of interactive calls further
+    down the stack. A few slots are reserved for interactive calls, which
+    bounds their queueing latency to one in-flight generation even while
+    project runs saturate the backend.
+
+    Waiters registered under a key can be boosted when a higher-priority
+    caller starts waiting on the same work (see SingleFlight followers).
+    """
+
+    def __init__(
+        self,
+        capacity: Callable[[], int],
+        interactive_reserved: int = SCHEDULER_INTERACTIVE_RESERVED,
+    ):
+        self.capacity = capacity
+        self.interactive_reserved = max(0, interactive_reserved)
+        self.in_flight = 0
+        self.queue = []  # Heap of [priority, seq, future, key, active]
+        self.waiting = {}  # key -> heap entry
+        self.counter = itertools.count()
+        self.stats = {
+            name: {"admitted": 0, "max_wait": 0.0}
+            for name in GenerationPriority.NAMES.values()
+        }
+
+    def _limit_for(self, priority: int) -> int:
+        """Slots a priority class may fill."""
+        capacity = max(1, self.capacity())
+        if priority == GenerationPriority.INTERACTIVE:
+            return capacity
+        # Keep at least one slot for bulk work so it always makes progress
+        return max(1, capacity - self.interactive_reserved)
+
+    def _dispatch(self):
+        """Hand free slots to the best waiters."""
+        while self.queue:
+            entry = self.queue[0]
+            priority, _, future, _, active = entry
+            if future.done() or not active:
+                heapq.heappop(self.queue)
+                self._forget(entry)
+                continue
+            if self.in_flight >= self._limit_for(priority):
+                return
+            heapq.heappop(self.queue)
+            self._forget(entry)
+            self.in_flight += 1
+            future.set_result(priority)
+
+    def _forget(self, entry: list):
+        key = entry[3]
+        if key is not None and self.waiting.get(key) is entry:
+            del self.waiting[key]
+
+    @asynccontextmanager
+    async def slot(self, priority: int = GenerationPriority.INTERACTIVE, key: Optional[str] = None):
+        """
+        Wait for a generation slot and hold it.
+
+        Args:
+            priority: A GenerationPriority class
+            key: Optional work key, so the waiter can be boosted later
+        """
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self.counter), future, key, True]
+        heapq.heappush(self.queue, entry)
+        if key is not None:
+            self.waiting[key] = entry
+        self._dispatch()
+
+        try:
+            granted_priority = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as we were cancelled; give it back
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+
+        wait = time.perf_counter() - started
+        stats = self.stats[GenerationPriority.NAMES.get(granted_priority, "speculative")]
+        stats["admitted"] += 1
+        stats["max_wait"] = max(stats["max_wait"], round(wait, 4))
+
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def boost(self, key: str, priority: int):
+        """
+        Raise the priority of queued work, e.g. when an interactive caller joins it.
+
+        Args:
+            key: The work key given to slot()
+            priority: The new priority, applied only if it is better
+        """
+        entry = self.waiting.get(key)
+        if entry is None or entry[0] <= priority or entry[2].done():
+            return
+        # Re-queue under the better priority; the old heap entry is skipped lazily
+        new_entry = [priority, next(self.counter), entry[2], key, True]
+        entry[4] = False
+        self.waiting[key] = new_entry
+        heapq.heappush(self.queue, new_entry)
+        self._dispatch()
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get queue depth per priority and admission stats for observability."""
+        queued = {name: 0 for name in GenerationPriority.NAMES.values()}
+        for priority, _, future, _, active in self.queue:
+            if active and not future.done():
+                queued[GenerationPriority.NAMES.get(priority, "speculative")] += 1
+        return {
+            "capacity": self.capacity(),
+            "in_flight": self.in_flight,
+            "interactive_reserved": self.interactive_reserved,
+            "queued": queued,
+            "admitted": self.stats,
+        }
+
+# Create a singleton scheduler sized by the active backend's capacity
+generation_scheduler = GenerationScheduler(lambda: get_inference_backend().capacity())
+
+def get_generation_scheduler() -> GenerationScheduler:
+    """Get the shared generation scheduler"""
+    return generation_scheduler
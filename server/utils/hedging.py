@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from utils.metrics import count_hedge
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# Hedging configuration
+INFERENCE_HEDGING = os.getenv("INFERENCE_HEDGING", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("INFERENCE_HEDGE_PERCENTILE", "95"))  # Hedge once this latency percentile has passed
+HEDGE_BUDGET = float(os.getenv("INFERENCE_HEDGE_BUDGET", "0.05"))  # Hedges as a fraction of requests
+HEDGE_BUDGET_BURST = float(os.getenv("INFERENCE_HEDGE_BUDGET_BURST", "5"))  # Unused budget kept for bursts
+HEDGE_MIN_DELAY = float(os.getenv("INFERENCE_HEDGE_MIN_DELAY", "0.2"))  # Never hedge faster than this
+HEDGE_WINDOW = int(os.getenv("INFERENCE_HEDGE_WINDOW", "200"))  # Recent latencies the percentile is taken over
+HEDGE_MIN_SAMPLES = 20  # Latencies needed before the percentile is trusted
+
+
+class RequestHedger:
+    """
+    Hedges slow requests with a duplicate.
+
+    When a request has not answered after the configured percentile of
+    recent latencies, an identical request is sent; the first successful
+    answer wins and the other one is cancelled. A failed answer does not
+    win while the other request is still running.
+
+    Hedges are paid from a budget: every request adds `budget` tokens (up
+    to `burst`) and a hedge costs one, so hedges stay below that fraction
+    of traffic even when the whole endpoint slows down. A caller can also
+    require a free concurrency slot per hedge; without one the hedge is
+    skipped rather than sent past the limit.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = INFERENCE_HEDGING,
+        percentile: float = HEDGE_PERCENTILE,
+        budget: float = HEDGE_BUDGET,
+        burst: float = HEDGE_BUDGET_BURST,
+        min_delay: float = HEDGE_MIN_DELAY,
+        window: int = HEDGE_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+    ):
+        self.enabled = enabled
+        self.percentile = min(100.0, max(0.0, percentile))
+        self.budget = max(0.0, budget)
+        self.burst = max(1.0, burst)
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=max(1, window))
+        self.tokens = 0.0
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0, "no_slot": 0}
+
+    def record_latency(self, latency: float):
+        """Record the latency of a successful request."""
+        self.latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Time to wait before hedging, or None while there is too little data."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(self.percentile / 100 * (len(ordered) - 1))))
+        return max(self.min_delay, ordered[index])
+
+    def _take_token(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.stats["over_budget"] += 1
+        return False
+
+    def _reserve_hedge(self, reserve: Optional[Callable[[], Optional[Callable[[], None]]]]) -> Optional[Callable[[], None]]:
+        """Get a slot and a budget token for a hedge; returns the slot's release callback, or None to skip it."""
+        release = reserve() if reserve is not None else (lambda: None)
+        if release is None:
+            self.stats["no_slot"] += 1
+            return None
+        if not self._take_token():
+            release()
+            return None
+        return release
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable[T]],
+        is_success: Callable[[T], bool],
+        reserve: Optional[Callable[[], Optional[Callable[[], None]]]] = None,
+    ) -> T:
+        """
+        Send a request, hedging it if it is slow.
+
+        Args:
+            send: Starts one request (called once more for the hedge)
+            is_success: Whether an answer can win
+            reserve: Takes a concurrency slot for the hedge without waiting,
+                returning its release callback, or None when no slot is free
+
+        Returns:
+            The winning answer, or the last answer if none succeeded
+        """
+        self.stats["requests"] += 1
+        self.tokens = min(self.burst, self.tokens + self.budget)
+        started = time.perf_counter()
+
+        delay = self.hedge_delay() if self.enabled else None
+        if delay is None:
+            result = await send()
+            if is_success(result):
+                self.record_latency(time.perf_counter() - started)
+            return result
+
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        result = None
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            release = self._reserve_hedge(reserve) if not done else None
+            if release is not None:
+                self.stats["hedged"] += 1
+                count_hedge("sent")
+                logger.info(f"Hedging request after {delay:.2f}s")
+                hedge = asyncio.ensure_future(send())
+                # Runs even if the hedge is cancelled before it started
+                hedge.add_done_callback(lambda _: release())
+                pending.add(hedge)
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result = task.result()
+                    if is_success(result):
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                            count_hedge("won")
+                        self.record_latency(time.perf_counter() - started)
+                        return result
+        finally:
+            # Cancel the loser (or both, if the caller was cancelled)
+            for task in pending:
+                task.cancel()
+
+        if result is None and error is not None:
+            raise error
+        return result
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get hedging configuration and counters for observability."""
+        delay = self.hedge_delay()
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "budget": self.budget,
+            "hedge_delay": round(delay, 3) if delay is not None else None,
+            "samples": len(self.latencies),
+            **self.stats,
+        }
+
+# Create a singleton hedger for the inference endpoint
+inference_hedger = RequestHedger()
+
+def get_inference_hedger() -> RequestHedger:
+    """Get the shared inference request hedger"""
+    return inference_hedger
@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from utils.adaptive_limiter import get_inference_limiter
+from utils.circuit_breaker import compute_backoff, get_circuit_breaker, parse_retry_after
+from utils.docstring_cache import INFERENCE_MODEL_ID
+from utils.hedging import get_inference_hedger
+from utils.inference_batcher import INFERENCE_BATCHING, BatchItemResponse, InferenceBatcher, estimate_tokens
+from utils.inference_client import HUGGINGFACE_ENDPOINT, HUGGINGFACE_TOKEN, INFERENCE_MAX_IN_FLIGHT, get_inference_client
+from utils.metrics import count_retry, observe_inference_attempt
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Which backend generates docstrings: "huggingface" (remote endpoint) or "local" (in-process CPU model)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "huggingface").lower()
+
+# Retry configuration: exponential backoff with full jitter, honoring Retry-After
+MAX_RETRIES = 8
+INITIAL_RETRY_DELAY = 1.0  # Scale of the first retry delay
+MAX_RETRY_DELAY = 30.0  # Upper bound for a single delay
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+OVERLOAD_STATUS_CODES = {429, 503}  # Shrink the adaptive concurrency limit
+# Connect/read timeouts live on the shared client (see utils/inference_client.py)
+
+
+class InferenceUnavailableError(Exception):
+    """Raised when a backend cannot produce a docstring; callers fall back."""
+
+
+class InferenceBackend:
+    """
+    Interface for docstring generation backends.
+
+    A backend turns a code snippet into the model's raw generated text.
+    Cleaning, caching and fallbacks are handled by the caller so every
+    backend behaves the same from the API's point of view.
+    """
+    name = "base"
+    model_id = "base"
+
+    def configuration_error(self) -> Optional[str]:
+        """Describe missing configuration, or None if the backend is usable."""
+        return None
+
+    async def start(self):
+        """Acquire resources (clients, models, worker pools)."""
+
+    async def close(self):
+        """Release resources acquired in start()."""
+
+    async def generate(self, code: str) -> str:
+        """
+        Generate raw docstring text for a code snippet.
+
+        Args:
+            code: The code snippet
+
+        Returns:
+            Raw generated text
+
+        Raises:
+            InferenceUnavailableError: If no text could be generated
+        """
+        raise NotImplementedError
+
+    def capacity(self) -> int:
+        """Number of generations the backend can usefully run at once."""
+        return INFERENCE_MAX_IN_FLIGHT
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get backend-specific state for observability."""
+        return {"backend": self.name, "model_id": self.model_id}
+
+
+def extract_generated_text(result) -> str:
+    """Extract generated text from an HF response body."""
+    if isinstance(result, list) and len(result) > 0:
+        first = result[0]
+        return (first.get("generated_text", str(first)) if isinstance(first, dict) else str(first)).strip()
+    elif isinstance(result, dict):
+        return result.get("generated_text", str(result)).strip()
+    return str(result).strip()
+
+def is_model_loading(result) -> bool:
+    """Check whether an HF response body means the model is still loading."""
+    if not result or (isinstance(result, list) and len(result) == 0):
+        return True
+    return isinstance(result, dict) and bool(result.get("error")) and "loading" in str(result.get("error")).lower()
+
+
+class HuggingFaceBackend(InferenceBackend):
+    """
+    Remote Hugging Face inference endpoint.
+
+    Requests go through the shared pooled client (optionally micro-batched),
+    the adaptive concurrency limiter and the endpoint circuit breaker, and
+    are retried with jittered exponential backoff. A micro-batch is one
+    endpoint call: it holds a single limiter slot and reports one outcome
+    to the limiter and the breaker, whatever the number of items in it.
+    """
+    name = "huggingface"
+    model_id = INFERENCE_MODEL_ID
+
+    def __init__(self):
+        self.batcher = InferenceBatcher(self.send_batch)
+
+    def configuration_error(self) -> Optional[str]:
+        if not HUGGINGFACE_ENDPOINT or not HUGGINGFACE_TOKEN:
+            return "HuggingFace configuration not found"
+        return None
+
+    async def start(self):
+        await get_inference_client().start()
+
+    async def close(self):
+        await self.batcher.close()
+        await get_inference_client().close()
+
+    def capacity(self) -> int:
+        # Follow the adaptive limit so queued work waits in priority order, not in the limiter
+        limit = int(get_inference_limiter().limit)
+        if INFERENCE_BATCHING:
+            # Each limiter slot carries a whole batch
+            return limit * self.batcher.max_size
+        return limit
+
+    async def post(self, payload: dict):
+        """Send one generation request, through the micro-batcher when batching is enabled."""
+        if INFERENCE_BATCHING:
+            return await self.batcher.submit(payload["inputs"])
+        # Shared, pooled client created in app_lifespan
+        return await get_inference_client().post(payload)
+
+    async def record_outcome(self, healthy: bool, latency: float = 0.0, tokens: int = 1, overload: bool = False):
+        """
+        Report one endpoint call to the circuit breaker and the adaptive limiter.
+
+        Args:
+            healthy: Whether the endpoint answered normally
+            latency: Seconds the call took (healthy calls only)
+            tokens: Estimated input tokens of the call (healthy calls only)
+            overload: Whether the failure signals overload and should shrink the limit
+        """
+        if healthy:
+            get_circuit_breaker().record_success()
+            await get_inference_limiter().on_success(latency, tokens)
+            return
+        get_circuit_breaker().record_failure()
+        if overload:
+            get_inference_limiter().on_overload()
+
+    async def send_batch(self, codes: List[str]) -> List[BatchItemResponse]:
+        """
+        Send a list-valued "inputs" payload to the inference endpoint.
+
+        The batch holds one limiter slot and reports its outcome once. A
+        successful response is split into one BatchItemResponse per input; a
+        failed or still-loading one is repeated for every input so each
+        caller applies the usual status-code handling and retries.
+        """
+        tokens = sum(estimate_tokens(code) for code in codes)
+        try:
+            async with get_inference_limiter().acquire():
+                started = time.perf_counter()
+                response = await get_inference_client().post({"inputs": codes})
+            latency = time.perf_counter() - started
+        except httpx.TimeoutException:
+            await self.record_outcome(False, overload=True)
+            raise
+        except Exception:
+            await self.record_outcome(False)
+            raise
+
+        if response.status_code != 200:
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                await self.record_outcome(False, overload=response.status_code in OVERLOAD_STATUS_CODES)
+            return [
+                BatchItemResponse(response.status_code, text=response.text, headers=dict(response.headers))
+                for _ in codes
+            ]
+
+        result = response.json()
+        if is_model_loading(result):
+            await self.record_outcome(False)
+            return [BatchItemResponse(200, data=result, text=str(result)) for _ in codes]
+        if not isinstance(result, list):
+            await self.record_outcome(False)
+            raise ValueError(f"Unexpected batch response type: {type(result).__name__}")
+
+        await self.record_outcome(True, latency, tokens)
+        # Each element is either a list of generations or a single generation
+        return [
+            BatchItemResponse(200, data=item if isinstance(item, list) else [item], text=str(item))
+            for item in result
+        ]
+
+    async def generate(self, code: str) -> str:
+        """Call the HF endpoint for one snippet, retrying with backoff while the endpoint is healthy."""
+        breaker = get_circuit_breaker()
+        limiter = get_inference_limiter()
+        hedger = get_inference_hedger()
+
+        # Simplified payload - let handler.py handle hyperparameters
+        payload = {
+            "inputs": code
+        }
+
+        async def record(healthy: bool, latency: float = 0.0, overload: bool = False):
+            # A batch reports once for all of its items (see send_batch)
+            if not INFERENCE_BATCHING:
+                await self.record_outcome(healthy, latency, estimate_tokens(code), overload)
+
+        last_error = None
+
+        for attempt in range(MAX_RETRIES):
+            # Fail fast while the endpoint is known to be down
+            if not breaker.allow_request():
+                logger.warning(f"Inference circuit open (retry in {breaker.seconds_until_retry():.1f}s)")
+                raise InferenceUnavailableError("HuggingFace endpoint unavailable (circuit open)")
+
+            retry_after = None
+            retry_reason = "error"
+            try:
+                logger.info(f"HuggingFace request attempt {attempt + 1}/{MAX_RETRIES}")
+
+                started = time.perf_counter()
+                if INFERENCE_BATCHING:
+                    # The batch takes the limiter slot for all of its items
+                    response = await self.post(payload)
+                else:
+                    # Adaptive concurrency limit around the endpoint call; slow calls may be
+                    # hedged, but only in a slot of their own
+                    async with limiter.acquire():
+                        response = await hedger.run(
+                            lambda: self.post(payload),
+                            lambda answer: answer.status_code == 200,
+                            reserve=limiter.try_reserve
+                        )
+                latency = time.perf_counter() - started
+                observe_inference_attempt(self.name, str(response.status_code), latency)
+
+                # Handle different response scenarios
+                if response.status_code == 200:
+                    result = response.json()
+
+                    if is_model_loading(result):
+                        logger.warning(f"Model loading detected (attempt {attempt + 1})")
+                        last_error = "Model is loading"
+                        retry_reason = "loading"
+                        if isinstance(result, dict) and result.get("estimated_time"):
+                            retry_after = float(result["estimated_time"])
+                        await record(False)
+                    else:
+                        # The endpoint answered, so it is healthy even if the text is empty
+                        await record(True, latency)
+                        generated_text = extract_generated_text(result)
+
+                        if generated_text:
+                            logger.info(f"✅ Successfully generated docstring after {attempt + 1} attempts")
+                            return generated_text
+
+                        logger.warning(f"No generated text in response (attempt {attempt + 1})")
+                        last_error = "No generated text"
+                        retry_reason = "empty"
+
+                elif response.status_code in RETRYABLE_STATUS_CODES:
+                    # Rate limits, loading models and server errors
+                    error_text = response.text
+                    logger.warning(f"HuggingFace API error (attempt {attempt + 1}): {response.status_code} - {error_text}")
+                    last_error = f"{response.status_code} - {error_text}"
+                    retry_reason = str(response.status_code)
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    await record(False, overload=response.status_code in OVERLOAD_STATUS_CODES)
+
+                else:
+                    # Client errors will not improve by retrying
+                    error_text = response.text
+                    logger.error(f"HuggingFace API error: {response.status_code} - {error_text}")
+                    last_error = f"{response.status_code} - {error_text}"
+                    break
+
+            except httpx.TimeoutException:
+                logger.warning(f"Request timeout (attempt {attempt + 1})")
+                last_error = "Request timeout"
+                retry_reason = "timeout"
+                await record(False, overload=True)
+
+            except httpx.RequestError as e:
+                logger.error(f"Request error (attempt {attempt + 1}): {str(e)}")
+                last_error = str(e)
+                retry_reason = "request_error"
+                await record(False)
+
+            except Exception as e:
+                logger.error(f"Unexpected error (attempt {attempt + 1}): {str(e)}")
+                last_error = str(e)
+                await record(False)
+
+            if attempt < MAX_RETRIES - 1:
+                delay = compute_backoff(attempt, INITIAL_RETRY_DELAY, MAX_RETRY_DELAY, retry_after)
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                count_retry(self.name, retry_reason)
+                await asyncio.sleep(delay)
+
+        # If we get here, all retries failed
+        logger.error(f"❌ HuggingFace generation failed. Last error: {last_error}")
+        raise InferenceUnavailableError(f"HuggingFace model unavailable ({last_error})")
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            **super().get_state(),
+            "batching": INFERENCE_BATCHING,
+        }
+
+
+def create_inference_backend(name: str = INFERENCE_BACKEND) -> InferenceBackend:
+    """
+    Create the backend selected by name.
+
+    Args:
+        name: "huggingface" or "local"
+
+    Returns:
+        An InferenceBackend instance
+    """
+    if name == "local":
+        # Imported lazily: the local backend pulls in torch/transformers
+        from utils.local_inference import LocalCPUBackend
+        return LocalCPUBackend()
+    if name != "huggingface":
+        logger.warning(f"Unknown INFERENCE_BACKEND '{name}', using huggingface")
+    return HuggingFaceBackend()
+
+# Create the configured backend once
+inference_backend = create_inference_backend()
+
+def get_inference_backend() -> InferenceBackend:
+    """Get the configured inference backend instance"""
+    return inference_backend
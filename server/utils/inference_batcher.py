@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Micro-batching configuration
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "false").lower() in ("1", "true", "yes")
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "25"))
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "16"))
+INFERENCE_BATCH_MAX_TOKENS = int(os.getenv("INFERENCE_BATCH_MAX_TOKENS", "8192"))
+
+
+def estimate_tokens(code: str) -> int:
+    """Roughly estimate the number of model tokens in a code snippet."""
+    return max(1, len(code) // 4)
+
+
+class BatchItemResponse:
+    """
+    One caller's share of a batched inference response.
+
+    Mirrors the parts of httpx.Response that generate_docstring_for_code
+    reads (status_code, text, headers, json()) so batched and single
+    requests go through the same response handling.
+    """
+
+    def __init__(self, status_code: int, data: Any = None, text: str = "", headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self._data = data
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self) -> Any:
+        return self._data
+
+
+class InferenceBatcher:
+    """
+    Collects concurrent generation requests into multi-input batches.
+
+    The first request opens a batch window; requests arriving within the
+    window are added until the window closes, the batch reaches max_size
+    items or the estimated token budget is spent. The batch is handed to
+    send_batch and each result is fanned back out to its waiting caller.
+
+    With max_concurrent_batches set, a new batch is only formed once a
+    previous one finished, so requests queued behind busy workers are
+    picked up together as one larger batch.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[str]], Awaitable[List[Any]]],
+        window_ms: float = INFERENCE_BATCH_WINDOW_MS,
+        max_size: int = INFERENCE_BATCH_MAX_SIZE,
+        max_tokens: int = INFERENCE_BATCH_MAX_TOKENS,
+        max_concurrent_batches: Optional[int] = None,
+    ):
+        self.send_batch = send_batch
+        self.window = window_ms / 1000.0
+        self.max_size = max(1, max_size)
+        self.max_tokens = max(1, max_tokens)
+        self.max_concurrent_batches = max_concurrent_batches
+        self.batch_slots: Optional[asyncio.Semaphore] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.collector: Optional[asyncio.Task] = None
+        self.dispatches = set()
+        self.carry = None  # Item that did not fit in the previous batch
+        self.stats = {"batches": 0, "items": 0}
+
+    async def submit(self, code: str) -> Any:
+        """
+        Queue a code snippet and wait for its result.
+
+        Args:
+            code: The code snippet to generate a docstring for
+
+        Returns:
+            This snippet's entry of the batch result
+        """
+        if self.collector is None or self.collector.done():
+            self.queue = asyncio.Queue()
+            if self.max_concurrent_batches:
+                self.batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self.collector = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((code, future))
+        return await future
+
+    async def _next_batch(self) -> List[tuple]:
+        """Wait for the first item, then fill the batch until a limit is hit."""
+        first = self.carry or await self.queue.get()
+        self.carry = None
+        batch = [first]
+        tokens = estimate_tokens(first[0])
+        deadline = asyncio.get_running_loop().time() + self.window
+
+        while len(batch) < self.max_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+
+            item_tokens = estimate_tokens(item[0])
+            if tokens + item_tokens > self.max_tokens:
+                # Token budget spent; start the next batch with this item
+                self.carry = item
+                break
+            batch.append(item)
+            tokens += item_tokens
+
+        return batch
+
+    async def _collect(self):
+        """Form batches forever, dispatching each without blocking the next."""
+        while True:
+            batch = await self._next_batch()
+            # Drop callers that gave up while waiting in the queue
+            batch = [(code, future) for code, future in batch if not future.done()]
+            if not batch:
+                continue
+            if self.batch_slots is not None:
+                await self.batch_slots.acquire()
+                # Requests that queued up while waiting for a worker join this batch
+                batch = self._top_up(batch)
+            task = asyncio.create_task(self._dispatch(batch))
+            self.dispatches.add(task)
+            task.add_done_callback(self.dispatches.discard)
+
+    def _top_up(self, batch: List[tuple]) -> List[tuple]:
+        """Add already-queued requests to a batch without waiting."""
+        tokens = sum(estimate_tokens(code) for code, _ in batch)
+        while len(batch) < self.max_size and self.carry is None and not self.queue.empty():
+            item = self.queue.get_nowait()
+            item_tokens = estimate_tokens(item[0])
+            if tokens + item_tokens > self.max_tokens:
+                self.carry = item
+                break
+            if not item[1].done():
+                batch.append(item)
+                tokens += item_tokens
+        return batch
+
+    async def _dispatch(self, batch: List[tuple]):
+        """Send a batch, then free its worker slot."""
+        try:
+            await self._send(batch)
+        finally:
+            if self.batch_slots is not None:
+                self.batch_slots.release()
+
+    async def _send(self, batch: List[tuple]):
+        """Send one batch and resolve every caller's future."""
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        logger.debug(f"Dispatching inference batch of {len(batch)} items")
+
+        try:
+            results = await self.send_batch([code for code, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Stop collecting and cancel in-flight batches."""
+        tasks = list(self.dispatches)
+        if self.collector is not None:
+            tasks.append(self.collector)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.collector = None
+        self.dispatches.clear()
+
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Inference client configuration
+HUGGINGFACE_ENDPOINT = os.getenv("HUGGINGFACE_ENDPOINT")
+HUGGINGFACE_TOKEN = os.getenv("HUGGINGFACE_TOKEN")
+
+INFERENCE_MAX_CONNECTIONS = int(os.getenv("INFERENCE_MAX_CONNECTIONS", "100"))
+INFERENCE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("INFERENCE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+INFERENCE_KEEPALIVE_EXPIRY = float(os.getenv("INFERENCE_KEEPALIVE_EXPIRY", "60"))
+INFERENCE_CONNECT_TIMEOUT = float(os.getenv("INFERENCE_CONNECT_TIMEOUT", "10"))
+INFERENCE_READ_TIMEOUT = float(os.getenv("INFERENCE_READ_TIMEOUT", "180"))  # Cold starts can take minutes
+INFERENCE_WRITE_TIMEOUT = float(os.getenv("INFERENCE_WRITE_TIMEOUT", "30"))
+INFERENCE_POOL_TIMEOUT = float(os.getenv("INFERENCE_POOL_TIMEOUT", "30"))
+# Global cap on in-flight inference requests shared by every file and project run
+INFERENCE_MAX_IN_FLIGHT = int(os.getenv("INFERENCE_MAX_IN_FLIGHT", "16"))
+INFERENCE_HTTP2 = os.getenv("INFERENCE_HTTP2", "true").lower() in ("1", "true", "yes")
+
+# HTTP/2 needs the optional "h2" package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class InferenceClient:
+    """
+    App-lifetime HTTP client for the Hugging Face inference endpoint.
+
+    A single pooled httpx.AsyncClient is shared by every generation path so
+    connections are kept alive (and multiplexed over HTTP/2 when available)
+    instead of paying a new TCP+TLS handshake for every docstring.
+    """
+    client: httpx.AsyncClient = None
+    in_flight: asyncio.Semaphore = None
+
+    # Implement as a singleton to ensure one instance
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(InferenceClient, cls).__new__(cls)
+            cls._instance.client = None
+            cls._instance.in_flight = asyncio.Semaphore(max(1, INFERENCE_MAX_IN_FLIGHT))
+        return cls._instance
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the pooled client from the configured limits and timeouts."""
+        use_http2 = INFERENCE_HTTP2 and HTTP2_AVAILABLE
+        if INFERENCE_HTTP2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=INFERENCE_MAX_CONNECTIONS,
+            max_keepalive_connections=INFERENCE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=INFERENCE_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            connect=INFERENCE_CONNECT_TIMEOUT,
+            read=INFERENCE_READ_TIMEOUT,
+            write=INFERENCE_WRITE_TIMEOUT,
+            pool=INFERENCE_POOL_TIMEOUT,
+        )
+        headers = {"Content-Type": "application/json"}
+        if HUGGINGFACE_TOKEN:
+            headers["Authorization"] = f"Bearer {HUGGINGFACE_TOKEN}"
+
+        logger.info(
+            f"Creating inference client (http2={use_http2}, max_connections={INFERENCE_MAX_CONNECTIONS}, "
+            f"max_keepalive={INFERENCE_MAX_KEEPALIVE_CONNECTIONS})"
+        )
+        return httpx.AsyncClient(
+            http2=use_http2,
+            limits=limits,
+            timeout=timeout,
+            headers=headers,
+        )
+
+    async def start(self) -> httpx.AsyncClient:
+        """Create the shared client if it does not exist yet."""
+        if self.client is None or self.client.is_closed:
+            self.client = self._build_client()
+        return self.client
+
+    async def post(self, payload: Dict[str, Any], url: Optional[str] = None) -> httpx.Response:
+        """
+        Send a JSON payload to the inference endpoint over the shared client.
+
+        At most INFERENCE_MAX_IN_FLIGHT requests are sent at once across the
+        whole app; additional callers wait for a free slot.
+
+        Args:
+            payload: JSON body to send
+            url: Optional override of the configured endpoint
+
+        Returns:
+            The raw httpx response
+        """
+        client = await self.start()
+        async with self.in_flight:
+            return await client.post(url or HUGGINGFACE_ENDPOINT, json=payload)
+
+    async def close(self):
+        """Close the shared client and release pooled connections."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Inference client closed")
+
+# Create a singleton instance
+inference_client = InferenceClient()
+
+def get_inference_client() -> InferenceClient:
+    """Get the shared inference client instance"""
+    return inference_client
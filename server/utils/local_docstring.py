@@ -0,0 +1,361 @@
+import ast
+import logging
+import re
+import textwrap
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+# Leading name words that already read as an imperative summary ("load config" -> "Load config.")
+VERBS = {
+    "add", "apply", "build", "calculate", "call", "check", "clean", "clear", "close", "collect",
+    "compute", "connect", "convert", "copy", "count", "create", "decode", "delete", "detect",
+    "dispatch", "download", "emit", "encode", "ensure", "extract", "fetch", "filter", "find",
+    "format", "generate", "handle", "init", "initialize", "insert", "invalidate", "iterate",
+    "list", "load", "log", "make", "merge", "normalize", "open", "parse", "post", "prepare",
+    "process", "read", "record", "refresh", "register", "release", "reload", "remove", "render",
+    "replace", "reset", "resolve", "retry", "run", "save", "schedule", "search", "send",
+    "serialize", "set", "setup", "sort", "split", "start", "stop", "store", "stream", "submit",
+    "sync", "update", "upload", "validate", "verify", "wait", "write",
+}
+# Leading words of predicates ("is_valid" -> "Check whether valid.")
+PREDICATES = {"is", "has", "can", "should", "contains", "exists", "allows", "supports"}
+
+RAISE_DESCRIPTIONS = {
+    "ValueError": "If an argument has an invalid value.",
+    "TypeError": "If an argument has the wrong type.",
+    "KeyError": "If a required key is missing.",
+    "IndexError": "If an index is out of range.",
+    "FileNotFoundError": "If the file does not exist.",
+    "PermissionError": "If access is denied.",
+    "TimeoutError": "If the operation times out.",
+    "NotImplementedError": "If a subclass does not implement this method.",
+    "HTTPException": "If the request cannot be completed.",
+    "RuntimeError": "If the operation cannot be completed in the current state.",
+}
+
+DUNDER_SUMMARIES = {
+    "__init__": "Initialize the instance.",
+    "__repr__": "Return the developer representation of the instance.",
+    "__str__": "Return the string representation of the instance.",
+    "__len__": "Return the number of items.",
+    "__iter__": "Iterate over the items.",
+    "__eq__": "Check whether this instance equals another.",
+    "__hash__": "Return the hash of the instance.",
+    "__call__": "Call the instance.",
+    "__enter__": "Enter the runtime context.",
+    "__exit__": "Exit the runtime context.",
+    "__aenter__": "Enter the asynchronous runtime context.",
+    "__aexit__": "Exit the asynchronous runtime context.",
+    "__getitem__": "Get an item by key.",
+    "__setitem__": "Set an item by key.",
+    "__contains__": "Check whether an item is contained.",
+}
+
+
+def split_name(name: str) -> List[str]:
+    """Split a snake_case or CamelCase identifier into lowercase words."""
+    words = []
+    for part in name.strip("_").split("_"):
+        words.extend(re.findall(r"[A-Z]+(?=[A-Z][a-z]|\d|\b)|[A-Z]?[a-z]+|[A-Z]+|\d+", part))
+    return [word.lower() for word in words if word]
+
+
+def phrase(words: List[str]) -> str:
+    return " ".join(words)
+
+
+class LocalDocstringGenerator:
+    """
+    Builds Google-style docstring skeletons from the AST, without a model.
+
+    Uses the same structural signals the model's preprocessing keeps
+    (see ASTEnhancedDocGenerator.flatten_ast_data): names, arguments,
+    decorators, bases, return and raise statements and calls. Used as the
+    fallback when the model is unavailable and as an instant draft that a
+    model result replaces later.
+    """
+
+    def __init__(self, include_types: bool = True):
+        self.include_types = include_types
+
+    def generate(self, code: str) -> str:
+        """
+        Generate a docstring for the first function or class in a snippet.
+
+        Args:
+            code: Source of a function, method or class
+
+        Returns:
+            The docstring including its triple quotes
+        """
+        node = self._parse(code)
+        if node is None:
+            return '"""Code documentation."""'
+        if isinstance(node, ast.ClassDef):
+            lines = self._class_lines(node)
+        else:
+            lines = self._function_lines(node)
+        return self._format(lines)
+
+    def _parse(self, code: str) -> Optional[Union[FunctionNode, ast.ClassDef]]:
+        """Parse a snippet (methods arrive indented) and return its first definition."""
+        try:
+            tree = ast.parse(textwrap.dedent(code))
+        except SyntaxError:
+            # Truncated or invalid snippets: document the signature, or at least the name
+            signature = re.search(r"^\s*((?:async\s+)?def\s+\w+\s*\(.*?\)[^:]*:|class\s+\w+[^:]*:)", code, re.MULTILINE | re.DOTALL)
+            name = re.search(r"^\s*(?:async\s+)?(def|class)\s+(\w+)", code, re.MULTILINE)
+            candidates = []
+            if signature:
+                candidates.append(signature.group(1).strip() + " ...")
+            if name:
+                candidates.append(f"{name.group(1)} {name.group(2)}{'()' if name.group(1) == 'def' else ''}: ...")
+            tree = None
+            for candidate in candidates:
+                try:
+                    tree = ast.parse(candidate)
+                    break
+                except SyntaxError:
+                    continue
+            if tree is None:
+                return None
+
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                return node
+        return None
+
+    @staticmethod
+    def _format(lines: List[str]) -> str:
+        while lines and not lines[-1]:
+            lines.pop()
+        if len(lines) == 1:
+            return f'"""{lines[0]}"""'
+        return '"""' + "\n".join(lines) + '\n"""'
+
+    def _annotation(self, node: Optional[ast.AST]) -> Optional[str]:
+        if node is None or not self.include_types:
+            return None
+        try:
+            return ast.unparse(node)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _decorator_names(node: Union[FunctionNode, ast.ClassDef]) -> List[str]:
+        names = []
+        for decorator in node.decorator_list:
+            target = decorator.func if isinstance(decorator, ast.Call) else decorator
+            try:
+                names.append(ast.unparse(target).split(".")[-1])
+            except Exception:
+                continue
+        return names
+
+    @staticmethod
+    def _own_nodes(node: ast.AST):
+        """Walk a definition's body without descending into nested functions and classes."""
+        queue = deque(ast.iter_child_nodes(node))
+        while queue:
+            child = queue.popleft()
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                continue
+            yield child
+            queue.extend(ast.iter_child_nodes(child))
+
+    def _signals(self, node: FunctionNode) -> Dict[str, object]:
+        """Collect return, yield, raise and call signals from a function body."""
+        returns_value = False
+        returns_bool = True
+        yields = False
+        raises = []
+        calls = []
+
+        for child in self._own_nodes(node):
+            if isinstance(child, ast.Return) and child.value is not None:
+                returns_value = True
+                if not (isinstance(child.value, ast.Constant) and isinstance(child.value.value, bool)) \
+                        and not isinstance(child.value, (ast.Compare, ast.BoolOp)) \
+                        and not (isinstance(child.value, ast.UnaryOp) and isinstance(child.value.op, ast.Not)):
+                    returns_bool = False
+            elif isinstance(child, (ast.Yield, ast.YieldFrom)):
+                yields = True
+            elif isinstance(child, ast.Raise) and child.exc is not None:
+                exc = child.exc.func if isinstance(child.exc, ast.Call) else child.exc
+                if isinstance(exc, (ast.Name, ast.Attribute)):
+                    name = ast.unparse(exc).split(".")[-1]
+                    if name not in raises and name[:1].isupper():
+                        raises.append(name)
+            elif isinstance(child, ast.Call):
+                if isinstance(child.func, ast.Name):
+                    calls.append(child.func.id)
+                elif isinstance(child.func, ast.Attribute):
+                    calls.append(child.func.attr)
+
+        return {
+            "returns_value": returns_value,
+            "returns_bool": returns_value and returns_bool,
+            "yields": yields,
+            "raises": raises,
+            "calls": calls,
+        }
+
+    def _summary(self, node: FunctionNode, decorators: List[str], signals: Dict[str, object]) -> str:
+        name = node.name
+        if name in DUNDER_SUMMARIES:
+            return DUNDER_SUMMARIES[name]
+
+        words = split_name(name)
+        if not words:
+            return "Run the operation."
+
+        if "property" in decorators or "cached_property" in decorators:
+            return f"The {phrase(words)}."
+        if words[0] in PREDICATES:
+            rest = phrase(words[1:]) or "the condition holds"
+            return f"Check whether {rest}."
+        if words[0] == "get" and len(words) > 1:
+            return f"Get the {phrase(words[1:])}."
+        if words[0] in ("iter", "iterate") and len(words) > 1:
+            return f"Iterate over {phrase(words[1:])}."
+        if words[0] == "to" and len(words) > 1:
+            return f"Convert to {phrase(words[1:])}."
+        if words[0] == "on" and len(words) > 1:
+            return f"Handle the {phrase(words[1:])} event."
+        if words[0] in VERBS:
+            return f"{words[0].capitalize()} {phrase(words[1:])}.".replace(" .", ".")
+        if signals["yields"]:
+            return f"Iterate over {phrase(words)}."
+        if "super" in signals["calls"] and len(signals["calls"]) == 1:
+            return f"Extend the inherited {phrase(words)}."
+        if signals["returns_value"]:
+            return f"Compute the {phrase(words)}."
+        return f"Handle {phrase(words)}."
+
+    def _arguments(self, args: ast.arguments, skip_first: bool) -> List[str]:
+        """Document positional, *args, keyword-only and **kwargs arguments."""
+        positional = list(args.posonlyargs) + list(args.args)
+        defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+        entries = list(zip(positional, defaults))
+        if skip_first and entries:
+            entries = entries[1:]
+        entries += list(zip(args.kwonlyargs, args.kw_defaults))
+
+        lines = []
+        for arg, default in entries:
+            lines.append(self._argument_line(arg.arg, arg.annotation, default))
+        if args.vararg:
+            lines.insert(len(lines) - len(args.kwonlyargs), self._argument_line(
+                f"*{args.vararg.arg}", args.vararg.annotation, None, "Additional positional arguments."))
+        if args.kwarg:
+            lines.append(self._argument_line(
+                f"**{args.kwarg.arg}", args.kwarg.annotation, None, "Additional keyword arguments."))
+        return lines
+
+    def _argument_line(self, name: str, annotation: Optional[ast.AST], default: Optional[ast.AST],
+                       description: Optional[str] = None) -> str:
+        annotation_text = self._annotation(annotation)
+        label = f"{name} ({annotation_text})" if annotation_text else name
+        description = description or f"The {phrase(split_name(name)) or name}."
+        if default is not None:
+            try:
+                description += f" Defaults to {ast.unparse(default)}."
+            except Exception:
+                pass
+        return f"    {label}: {description}"
+
+    def _function_lines(self, node: FunctionNode) -> List[str]:
+        decorators = self._decorator_names(node)
+        signals = self._signals(node)
+        is_method = bool(node.args.args) and node.args.args[0].arg in ("self", "cls") and "staticmethod" not in decorators
+
+        lines = [self._summary(node, decorators, signals)]
+        if "abstractmethod" in decorators:
+            lines += ["", "Subclasses must implement this method."]
+
+        arg_lines = self._arguments(node.args, skip_first=is_method)
+        if arg_lines:
+            lines += ["", "Args:"] + arg_lines
+
+        return_type = self._annotation(node.returns)
+        if signals["yields"]:
+            lines += ["", "Yields:", f"    {return_type + ': ' if return_type else ''}The next item."]
+        elif signals["returns_value"] and return_type != "None" and node.name != "__init__" \
+                and "property" not in decorators and "cached_property" not in decorators:
+            if signals["returns_bool"] and not return_type:
+                return_type = "bool" if self.include_types else None
+            description = "True if the condition holds, False otherwise." if signals["returns_bool"] \
+                else f"The {phrase(split_name(node.name)[1:] or split_name(node.name)) or 'result'}."
+            lines += ["", "Returns:", f"    {return_type + ': ' if return_type else ''}{description}"]
+
+        if signals["raises"]:
+            lines += ["", "Raises:"] + [
+                f"    {name}: {RAISE_DESCRIPTIONS.get(name, 'If the operation fails.')}"
+                for name in signals["raises"]
+            ]
+        return lines
+
+    def _class_lines(self, node: ast.ClassDef) -> List[str]:
+        decorators = self._decorator_names(node)
+        bases = []
+        for base in node.bases:
+            try:
+                bases.append(ast.unparse(base))
+            except Exception:
+                continue
+        words = split_name(node.name)
+        base_names = [base.split(".")[-1] for base in bases]
+
+        if any(base.endswith(("Error", "Exception")) for base in base_names):
+            summary = f"Raised for {phrase(words)} conditions."
+        elif "BaseModel" in base_names:
+            summary = f"Schema of the {phrase(words)}."
+        elif any(base.endswith("Enum") for base in base_names):
+            summary = f"Enumeration of {phrase(words)} values."
+        elif "ABC" in base_names:
+            summary = f"Abstract base for {phrase(words)} implementations."
+        else:
+            summary = f"{phrase(words).capitalize() or node.name}."
+        lines = [summary]
+
+        if bases and not any(base in ("object", "ABC", "BaseModel") for base in base_names):
+            lines += ["", f"Extends {', '.join(bases)}."]
+
+        # Dataclasses and models document their fields, other classes their constructor
+        attributes = []
+        if "dataclass" in decorators or "BaseModel" in base_names:
+            for statement in node.body:
+                if isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+                    attributes.append(self._argument_line(statement.target.id, statement.annotation, None))
+        else:
+            init = next((
+                statement for statement in node.body
+                if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)) and statement.name == "__init__"
+            ), None)
+            if init is not None:
+                arg_lines = self._arguments(init.args, skip_first=True)
+                if arg_lines:
+                    lines += ["", "Args:"] + arg_lines
+                seen = set()
+                for child in self._own_nodes(init):
+                    targets = child.targets if isinstance(child, ast.Assign) else [child.target] if isinstance(child, ast.AnnAssign) else []
+                    for target in targets:
+                        if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) \
+                                and target.value.id == "self" and not target.attr.startswith("_") and target.attr not in seen:
+                            seen.add(target.attr)
+                            attributes.append(f"    {target.attr}: The {phrase(split_name(target.attr))}.")
+
+        if attributes:
+            lines += ["", "Attributes:"] + attributes
+        return lines
+
+# Create a singleton instance
+local_docstring_generator = LocalDocstringGenerator()
+
+def get_local_docstring_generator():
+    """Get the local docstring generator instance"""
+    return local_docstring_generator
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from utils.inference_backend import InferenceBackend, InferenceUnavailableError
+from utils.inference_batcher import InferenceBatcher
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Local CPU inference configuration
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", os.path.join(".", "nlp_models", "codet5-docstring"))
+LOCAL_INFERENCE_RUNTIME = os.getenv("LOCAL_INFERENCE_RUNTIME", "torch").lower()  # "torch" or "onnx"
+LOCAL_INFERENCE_WORKERS = int(os.getenv("LOCAL_INFERENCE_WORKERS", "2"))
+LOCAL_INFERENCE_THREADS = int(os.getenv("LOCAL_INFERENCE_THREADS", "0"))  # 0 keeps the runtime default
+LOCAL_BATCH_WINDOW_MS = float(os.getenv("LOCAL_BATCH_WINDOW_MS", "10"))
+LOCAL_BATCH_MAX_SIZE = int(os.getenv("LOCAL_BATCH_MAX_SIZE", "8"))
+LOCAL_BATCH_MAX_TOKENS = int(os.getenv("LOCAL_BATCH_MAX_TOKENS", "4096"))
+LOCAL_MAX_INPUT_TOKENS = int(os.getenv("LOCAL_MAX_INPUT_TOKENS", "512"))
+LOCAL_MAX_NEW_TOKENS = int(os.getenv("LOCAL_MAX_NEW_TOKENS", "128"))
+LOCAL_NUM_BEAMS = int(os.getenv("LOCAL_NUM_BEAMS", "1"))
+
+
+class LocalCPUBackend(InferenceBackend):
+    """
+    In-process CodeT5-style seq2seq model running on the CPU.
+
+    Requests are dynamically batched: while all workers are busy, incoming
+    snippets queue up and are taken together as the next batch. Generation
+    runs on a bounded thread pool (torch and ONNX Runtime release the GIL),
+    so the event loop never blocks on the model.
+    """
+    name = "local"
+
+    def __init__(self, model_path: str = LOCAL_MODEL_PATH, runtime: str = LOCAL_INFERENCE_RUNTIME):
+        self.model_path = model_path
+        self.runtime = runtime
+        self.model_id = f"local:{os.path.basename(os.path.normpath(model_path))}:{runtime}"
+        self.model = None
+        self.tokenizer = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.load_lock: Optional[asyncio.Lock] = None
+        self.batcher = InferenceBatcher(
+            self._run_batch,
+            window_ms=LOCAL_BATCH_WINDOW_MS,
+            max_size=LOCAL_BATCH_MAX_SIZE,
+            max_tokens=LOCAL_BATCH_MAX_TOKENS,
+            max_concurrent_batches=max(1, LOCAL_INFERENCE_WORKERS),
+        )
+
+    def configuration_error(self) -> Optional[str]:
+        if not os.path.isdir(self.model_path):
+            return f"Local model not found at {self.model_path}"
+        return None
+
+    def _load_model(self):
+        """Load the tokenizer and model (runs on a worker thread)."""
+        from transformers import AutoTokenizer
+
+        if LOCAL_INFERENCE_THREADS > 0:
+            import torch
+            torch.set_num_threads(LOCAL_INFERENCE_THREADS)
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+
+        if self.runtime == "onnx":
+            # Requires "optimum[onnxruntime]"; exports on the fly if no ONNX files exist
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            model = ORTModelForSeq2SeqLM.from_pretrained(self.model_path, export=not any(
+                name.endswith(".onnx") for name in os.listdir(self.model_path)
+            ))
+        else:
+            from transformers import AutoModelForSeq2SeqLM
+            model = AutoModelForSeq2SeqLM.from_pretrained(self.model_path)
+            model.eval()
+
+        return tokenizer, model
+
+    async def start(self):
+        """Create the worker pool and load the model once."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=max(1, LOCAL_INFERENCE_WORKERS),
+                thread_name_prefix="local-inference"
+            )
+        if self.load_lock is None:
+            self.load_lock = asyncio.Lock()
+
+        async with self.load_lock:
+            if self.model is not None:
+                return
+            error = self.configuration_error()
+            if error:
+                raise InferenceUnavailableError(error)
+
+            logger.info(f"Loading local model from {self.model_path} ({self.runtime})")
+            loop = asyncio.get_running_loop()
+            self.tokenizer, self.model = await loop.run_in_executor(self.executor, self._load_model)
+            logger.info("Local model loaded")
+
+    async def close(self):
+        """Stop batching and shut the worker pool down."""
+        await self.batcher.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _generate_batch_sync(self, codes: List[str]) -> List[str]:
+        """Run one padded batch through the model (runs on a worker thread)."""
+        inputs = self.tokenizer(
+            codes,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=LOCAL_MAX_INPUT_TOKENS,
+        )
+
+        if self.runtime == "onnx":
+            outputs = self.model.generate(**inputs, max_new_tokens=LOCAL_MAX_NEW_TOKENS, num_beams=LOCAL_NUM_BEAMS)
+        else:
+            import torch
+            with torch.inference_mode():
+                outputs = self.model.generate(**inputs, max_new_tokens=LOCAL_MAX_NEW_TOKENS, num_beams=LOCAL_NUM_BEAMS)
+
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    async def _run_batch(self, codes: List[str]) -> List[str]:
+        """Hand a batch to the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._generate_batch_sync, codes)
+
+    def capacity(self) -> int:
+        # Enough queued work to fill a batch for every worker
+        return max(1, LOCAL_INFERENCE_WORKERS) * LOCAL_BATCH_MAX_SIZE
+
+    async def generate(self, code: str) -> str:
+        """Generate raw docstring text with the local model."""
+        try:
+            if self.model is None:
+                await self.start()
+            generated_text = (await self.batcher.submit(code)).strip()
+        except InferenceUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Local inference failed: {str(e)}")
+            raise InferenceUnavailableError(f"Local model failed ({str(e)})")
+
+        if not generated_text:
+            raise InferenceUnavailableError("Local model returned no text")
+        return generated_text
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            **super().get_state(),
+            "runtime": self.runtime,
+            "loaded": self.model is not None,
+            "workers": LOCAL_INFERENCE_WORKERS,
+            "batches": self.batcher.stats["batches"],
+            "batched_items": self.batcher.stats["items"],
+        }
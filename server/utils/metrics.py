@@ -0,0 +1,205 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds: generations take seconds, database commands milliseconds
+INFERENCE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, 300)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+
+INFERENCE_LATENCY = Histogram(
+    "docgen_inference_latency_seconds",
+    "Time to generate one docstring, including retries",
+    ["backend", "route", "item_type", "outcome"],
+    buckets=INFERENCE_BUCKETS,
+)
+INFERENCE_ATTEMPT_LATENCY = Histogram(
+    "docgen_inference_attempt_latency_seconds",
+    "Latency of single requests to the inference endpoint",
+    ["backend", "status"],
+    buckets=INFERENCE_BUCKETS,
+)
+REQUEST_LATENCY = Histogram(
+    "docgen_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+MONGO_LATENCY = Histogram(
+    "docgen_mongo_command_duration_seconds",
+    "MongoDB command latency",
+    ["command", "collection", "outcome"],
+    buckets=MONGO_BUCKETS,
+)
+INFERENCE_RETRIES = Counter(
+    "docgen_inference_retries_total",
+    "Inference attempts that were retried",
+    ["backend", "route", "item_type", "reason"],
+)
+FALLBACKS = Counter(
+    "docgen_fallback_docstrings_total",
+    "Docstrings served from the fallback generator",
+    ["backend", "route", "item_type"],
+)
+CACHE_LOOKUPS = Counter(
+    "docgen_docstring_cache_lookups_total",
+    "Docstring cache lookups by result (memory_hit, db_hit, miss)",
+    ["route", "item_type", "result"],
+)
+HEDGES = Counter(
+    "docgen_inference_hedges_total",
+    "Duplicate requests sent for slow inference calls, and how many of them won",
+    ["outcome"],
+)
+GENERATIONS_IN_FLIGHT = Gauge(
+    "docgen_generations_in_flight",
+    "Generations currently running on the backend",
+    ["backend", "route", "item_type"],
+)
+GENERATIONS_QUEUED = Gauge(
+    "docgen_generations_queued",
+    "Generations waiting for a scheduler slot",
+    ["priority"],
+)
+TASKS_QUEUED = Gauge(
+    "docgen_tasks",
+    "Background tasks by status",
+    ["status"],
+)
+
+# Labels of the work the current asyncio task is doing
+current_route: ContextVar[str] = ContextVar("metrics_route", default="none")
+current_item_type: ContextVar[str] = ContextVar("metrics_item_type", default="snippet")
+
+
+def set_route(route: str):
+    """Label metrics recorded by the current task (and tasks it starts) with a route."""
+    current_route.set(route)
+
+def set_item_type(item_type: str):
+    """Label metrics recorded by the current task (and tasks it starts) with an item type."""
+    current_item_type.set(item_type)
+
+def observe_inference(backend: str, outcome: str, seconds: float):
+    INFERENCE_LATENCY.labels(backend, current_route.get(), current_item_type.get(), outcome).observe(seconds)
+
+def observe_inference_attempt(backend: str, status: str, seconds: float):
+    INFERENCE_ATTEMPT_LATENCY.labels(backend, status).observe(seconds)
+
+def count_retry(backend: str, reason: str):
+    INFERENCE_RETRIES.labels(backend, current_route.get(), current_item_type.get(), reason).inc()
+
+def count_fallback(backend: str):
+    FALLBACKS.labels(backend, current_route.get(), current_item_type.get()).inc()
+
+def count_hedge(outcome: str):
+    HEDGES.labels(outcome).inc()
+
+def count_cache_lookup(result: str):
+    CACHE_LOOKUPS.labels(current_route.get(), current_item_type.get(), result).inc()
+
+@contextmanager
+def track_generation(backend: str):
+    """Count a generation as in flight while the block runs."""
+    gauge = GENERATIONS_IN_FLIGHT.labels(backend, current_route.get(), current_item_type.get())
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """
+    Records the latency of every MongoDB command.
+
+    Registered on the Motor client; the driver calls it from its own
+    threads, so the route context of the caller is not available here.
+    """
+
+    def __init__(self):
+        self.collections = {}  # (connection, request_id) -> collection of commands in flight
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        collection = event.command.get(event.command_name)
+        self.collections[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ""
+
+    def _observe(self, event, outcome: str):
+        collection = self.collections.pop((event.connection_id, event.request_id), "")
+        MONGO_LATENCY.labels(event.command_name, collection, outcome).observe(event.duration_micros / 1_000_000)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._observe(event, "success")
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._observe(event, "failure")
+
+
+def route_template(app, scope) -> str:
+    """Find the route template (e.g. /api/files/{file_id}) so paths with IDs share a label."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template.
+
+    Streaming responses are timed until their last chunk is sent. The
+    route is also put into the metrics context, so generations started
+    by the request are labelled with it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope["app"], scope)
+        token = current_route.set(route)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(scope["method"], route, str(status["code"])).observe(time.perf_counter() - started)
+            current_route.reset(token)
+
+
+def render_metrics(queued_tasks: Optional[dict] = None, queued_generations: Optional[dict] = None):
+    """
+    Render all metrics in the Prometheus text format.
+
+    Args:
+        queued_tasks: Task counts by status, sampled at scrape time
+        queued_generations: Scheduler queue depth by priority name
+
+    Returns:
+        Tuple of (body, content type)
+    """
+    for status, count in (queued_tasks or {}).items():
+        TASKS_QUEUED.labels(status).set(count)
+    for priority, count in (queued_generations or {}).items():
+        GENERATIONS_QUEUED.labels(priority).set(count)
+    return generate_latest(), CONTENT_TYPE_LATEST
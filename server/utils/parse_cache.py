@@ -0,0 +1,137 @@
+import copy
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from utils.db import get_db
+from utils.parse_pool import get_parse_pool
+from utils.parser import PARSER_VERSION
+from utils.single_flight import SingleFlight
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Cache configuration
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "1000"))  # In-process LRU entries
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def make_parse_key(code: str) -> str:
+    """Build the cache key for a file's contents and the current parser version."""
+    digest = hashlib.sha256()
+    digest.update(PARSER_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Two-level cache of parsed file structures: an in-process LRU in front of
+    the "parse_cache" MongoDB collection.
+
+    Entries are keyed by a hash of the exact file contents and PARSER_VERSION,
+    so the same __init__.py or vendored module is parsed once across files
+    and projects. Concurrent parses of identical contents (e.g. copies inside
+    one ZIP) share a single parse. Only the file name differs between copies;
+    it is filled in per caller.
+    """
+
+    def __init__(self, max_size: int = PARSE_CACHE_SIZE):
+        """Initialize an empty cache"""
+        self.max_size = max_size
+        self.entries = OrderedDict()  # key -> structure
+        self.flights = SingleFlight()
+        self.stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+        }
+
+    def _collection(self):
+        """Get the backing collection, or None when the database is not connected."""
+        database = get_db()
+        return database.parse_cache if database is not None else None
+
+    def _remember(self, key: str, structure: Dict[str, Any]):
+        """Insert an entry in the LRU, evicting the least recently used one."""
+        self.entries[key] = structure
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def _lookup_or_parse(self, key: str, code: str, file_name: str) -> Dict[str, Any]:
+        """Find a structure in either cache level, parsing and storing it on a miss."""
+        structure = self.entries.get(key)
+        if structure is not None:
+            self.entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return structure
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = await collection.find_one({"key": key}, {"structure": 1})
+                if doc:
+                    self._remember(key, doc["structure"])
+                    self.stats["db_hits"] += 1
+                    return doc["structure"]
+            except Exception as e:
+                logger.warning(f"Parse cache lookup failed: {str(e)}")
+
+        self.stats["misses"] += 1
+        structure = await get_parse_pool().parse(code, file_name)
+        self._remember(key, structure)
+
+        if collection is not None:
+            try:
+                await collection.update_one(
+                    {"key": key},
+                    {
+                        "$set": {"structure": structure, "parser_version": PARSER_VERSION},
+                        "$setOnInsert": {"created_at": datetime.now(timezone.utc)},
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Parse cache store failed: {str(e)}")
+        return structure
+
+    async def parse(self, code: str, file_name: str) -> Dict[str, Any]:
+        """
+        Get the structure of a file, parsing it only if these contents were never seen.
+
+        Args:
+            code: File contents
+            file_name: Name of the file, reported in the structure
+
+        Returns:
+            Dictionary containing the file structure with classes and functions
+
+        Raises:
+            ParseLimitError: If parsing timed out or hit a resource limit (not cached)
+        """
+        if not PARSE_CACHE_ENABLED:
+            return await get_parse_pool().parse(code, file_name)
+
+        key = make_parse_key(code)
+        structure = await self.flights.do(key, lambda: self._lookup_or_parse(key, code, file_name))
+
+        # Callers own their copy; cached structures are shared
+        structure = copy.deepcopy(structure)
+        structure["file_name"] = file_name
+        return structure
+
+# Create a singleton cache
+parse_cache = ParseCache()
+
+def get_parse_cache() -> ParseCache:
+    """Get the global parse cache instance"""
+    return parse_cache
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict, Optional, Union
+
+from dotenv import load_dotenv
+
+from utils.parser import CodeParserService
+
+try:
+    import resource  # POSIX only; limits are skipped elsewhere
+except ImportError:
+    resource = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Parse pool configuration
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 parses in a thread instead
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", "20"))  # Seconds to wait for one file
+PARSE_CPU_LIMIT = int(os.getenv("PARSE_CPU_LIMIT", "10"))  # CPU seconds one file may use before its worker is killed
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "1024"))  # Address space of a worker
+
+
+class ParseLimitError(Exception):
+    """Raised when a file could not be parsed within the time, CPU or memory limits"""
+    pass
+
+
+def _init_worker(memory_limit_mb: int):
+    """Cap the address space of a parse worker."""
+    if resource is None or memory_limit_mb <= 0:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = memory_limit_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _parse_in_worker(source: Union[bytes, str], file_name: str, cpu_limit: int) -> Dict[str, Any]:
+    """
+    Parse one file inside a worker process.
+
+    The CPU limit is cumulative per process, so it is raised to the CPU time
+    used so far plus this file's allowance. Going over it sends SIGXCPU,
+    which kills the worker even in the middle of ast.parse; the pool then
+    starts a replacement.
+    """
+    if resource is None or cpu_limit <= 0:
+        return CodeParserService().parse_source(source, file_name)
+
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    limit = int(usage.ru_utime + usage.ru_stime) + cpu_limit
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        return CodeParserService().parse_source(source, file_name)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+class ParsePool:
+    """
+    Parses files in worker processes so large modules never block the event loop.
+
+    Workers are spawned rather than forked, so they do not inherit the
+    server's memory (e.g. a loaded local model) and the memory limit applies
+    to parsing alone. A worker killed by its CPU limit is replaced by the
+    pool; its result never arrives and the caller gets a ParseLimitError
+    once the timeout passes. Only as many files as there are workers are
+    submitted at once, so the timeout does not include queueing.
+    """
+
+    def __init__(
+        self,
+        workers: int = PARSE_WORKERS,
+        timeout: float = PARSE_TIMEOUT,
+        cpu_limit: int = PARSE_CPU_LIMIT,
+        memory_limit_mb: int = PARSE_MEMORY_LIMIT_MB,
+    ):
+        self.workers = max(0, workers)
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.pool = None
+        self.slots: Optional[asyncio.Semaphore] = None
+
+    def _get_pool(self):
+        """Start the worker processes on first use."""
+        if self.pool is None:
+            context = multiprocessing.get_context("spawn")
+            self.pool = context.Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.memory_limit_mb,),
+            )
+            self.slots = asyncio.Semaphore(self.workers)
+            logger.info(f"Started {self.workers} parse workers")
+        return self.pool
+
+    async def parse(self, source: Union[bytes, str], file_name: str) -> Dict[str, Any]:
+        """
+        Parse a file's contents without blocking the event loop.
+
+        Args:
+            source: File contents as bytes or str
+            file_name: Name of the file, reported in the structure
+
+        Returns:
+            Dictionary containing the file structure with classes and functions
+
+        Raises:
+            ParseLimitError: If parsing timed out or hit the CPU or memory limit
+        """
+        if self.workers == 0:
+            return await asyncio.to_thread(CodeParserService().parse_source, source, file_name)
+
+        pool = self._get_pool()
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            result = loop.create_future()
+
+            def resolve(value):
+                if not result.done():
+                    result.set_result(value)
+
+            def reject(error):
+                if not result.done():
+                    result.set_exception(error)
+
+            # Callbacks run on the pool's result thread
+            pool.apply_async(
+                _parse_in_worker,
+                (source, file_name, self.cpu_limit),
+                callback=lambda value: loop.call_soon_threadsafe(resolve, value),
+                error_callback=lambda error: loop.call_soon_threadsafe(reject, error),
+            )
+            try:
+                return await asyncio.wait_for(result, self.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Parsing {file_name} timed out after {self.timeout}s")
+                raise ParseLimitError(f"Parsing timed out after {self.timeout}s")
+            except MemoryError:
+                logger.warning(f"Parsing {file_name} exceeded the {self.memory_limit_mb}MB memory limit")
+                raise ParseLimitError(f"Parsing exceeded the {self.memory_limit_mb}MB memory limit")
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            self.slots = None
+
+# Create a singleton parse pool
+parse_pool = ParsePool()
+
+def get_parse_pool() -> ParsePool:
+    """Get the shared parse pool"""
+    return parse_pool
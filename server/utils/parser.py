@@ -1,10 +1,89 @@
 import ast
 import os
 import inspect
-import textwrap
-from typing import Dict, List, Any, Optional
+import re
+import tokenize
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, Any, Optional, Tuple, Union
 import traceback
-import astor
+
+# Bump whenever the structure produced for the same code changes; cached structures are keyed by it
+PARSER_VERSION = "2"
+
+
+def decode_source(source: Union[bytes, str]) -> str:
+    """
+    Decode Python source the way the interpreter does.
+    
+    A UTF-8 BOM or a PEP 263 coding cookie selects the encoding, otherwise
+    UTF-8 is used. Strings are returned unchanged.
+    
+    Raises:
+        UnicodeDecodeError: If the bytes are not valid in the detected encoding
+        SyntaxError: If the coding cookie names an unknown encoding, or the
+            first lines are not valid in the detected one
+    """
+    if isinstance(source, str):
+        return source
+    encoding, _ = tokenize.detect_encoding(BytesIO(source).readline)
+    return source.decode(encoding)
+
+
+def strip_bom(code: str) -> str:
+    """Drop a leading BOM, which ast.parse rejects; structure offsets are counted without it."""
+    return code[1:] if code.startswith('\ufeff') else code
+
+
+class SourceSlicer:
+    """
+    Maps AST nodes to byte ranges of the original code and slices them back out.
+    
+    AST positions are line numbers plus UTF-8 byte columns, so the code is
+    kept as bytes with a table of line start offsets (lines end with LF,
+    CRLF or CR, as for the parser). Structures store the ranges
+    instead of the code itself; slicing a range is a constant-time lookup.
+    """
+    
+    LINE_BREAK = re.compile(rb'\r\n|\r|\n')
+    
+    def __init__(self, code: str):
+        self.source = strip_bom(code).encode('utf-8')
+        self.line_offsets = [0] + [match.end() for match in self.LINE_BREAK.finditer(self.source)]
+    
+    def span(self, node: ast.AST) -> Tuple[int, int]:
+        """
+        Get the byte range of a node, from the start of the line of its first
+        decorator to its last character.
+        """
+        first_line = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+        start = self.line_offsets[first_line - 1]
+        end = self.line_offsets[node.end_lineno - 1] + node.end_col_offset
+        return start, end
+    
+    def slice(self, start: int, end: int) -> str:
+        """
+        Get the code in a byte range, dedented and with LF line endings.
+        
+        Ranges start at the beginning of a line, so the first line's
+        indentation is the definition's own column offset. Only that much is
+        removed from each line: lines indented less (such as the contents of
+        a multi-line string at column 0) are kept as they are, so the code
+        still parses on its own.
+        """
+        code = self.source[start:end].decode('utf-8')
+        lines = code.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        indent = lines[0][:len(lines[0]) - len(lines[0].lstrip(' \t'))]
+        return '\n'.join(
+            '' if not line.strip() else line[len(indent):] if line.startswith(indent) else line
+            for line in lines
+        )
+
+
+@lru_cache(maxsize=16)
+def get_source_slicer(content: str) -> SourceSlicer:
+    """Get a slicer for a file's content, reused while the same file is sliced item by item."""
+    return SourceSlicer(content)
 
 
 class CodeParserService:
@@ -28,35 +107,60 @@ class CodeParserService:
                 "classes": [],
                 "functions": []
             }
+        
+        with open(file_path, 'rb') as file:
+            return self.parse_source(file.read(), os.path.basename(file_path))
+    
+    def parse_source(self, source: Union[bytes, str], file_name: str) -> Dict[str, Any]:
+        """
+        Parse the contents of a Python file held in memory.
+        
+        Args:
+            source: File contents; bytes are decoded like the interpreter would
+                (BOM or coding cookie, UTF-8 otherwise)
+            file_name: Name of the file, reported in the structure
             
+        Returns:
+            Dictionary containing the file structure with classes and functions;
+            items locate their code by byte range (see SourceSlicer)
+        """
+        try:
+            code = strip_bom(decode_source(source))
+        except (UnicodeDecodeError, SyntaxError) as e:
+            return {
+                "file_name": file_name,
+                "error": f"Could not decode file: {str(e)}",
+                "classes": [],
+                "functions": []
+            }
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                code = file.read()
-                self.file_lines = code.splitlines()
-                
             # Check if file is empty
             if not code.strip():
                 return {
-                    "file_name": os.path.basename(file_path),
+                    "file_name": file_name,
                     "error": "File is empty",
                     "classes": [],
                     "functions": []
                 }
                 
             tree = ast.parse(code)
-            return self._analyze_ast(tree, os.path.basename(file_path))
+            return self._analyze_ast(tree, file_name, SourceSlicer(code))
         except SyntaxError as e:
             return {
-                "file_name": os.path.basename(file_path),
+                "file_name": file_name,
                 "error": f"Python syntax error: {str(e)}",
                 "error_line": e.lineno,
                 "error_offset": e.offset,
                 "classes": [],
                 "functions": []
             }
+        except MemoryError:
+            # Running out of memory says nothing about the file; let the caller decide
+            raise
         except Exception as e:
             return {
-                "file_name": os.path.basename(file_path),
+                "file_name": file_name,
                 "error": f"Failed to parse file: {str(e)}",
                 "error_details": traceback.format_exc(),
                 "classes": [],
@@ -74,8 +178,6 @@ class CodeParserService:
             Dictionary containing the code structure with classes and functions
         """
         try:
-            self.file_lines = code.splitlines()
-                
             # Check if code is empty
             if not code.strip():
                 return {
@@ -84,9 +186,10 @@ class CodeParserService:
                     "classes": [],
                     "functions": []
                 }
-                    
+            
+            code = strip_bom(code)
             tree = ast.parse(code)
-            return self._analyze_ast(tree, "code_snippet")
+            return self._analyze_ast(tree, "code_snippet", SourceSlicer(code))
         except SyntaxError as e:
             return {
                 "file_name": "code_snippet",
@@ -105,13 +208,14 @@ class CodeParserService:
                 "functions": []
             }
     
-    def _analyze_ast(self, tree: ast.AST, file_name: str) -> Dict[str, Any]:
+    def _analyze_ast(self, tree: ast.AST, file_name: str, slicer: SourceSlicer) -> Dict[str, Any]:
         """
         Analyze the AST and extract classes and functions.
         
         Args:
             tree: The AST tree
             file_name: Name of the file
+            slicer: Slicer over the code the tree was parsed from
             
         Returns:
             Dictionary with extracted information
@@ -125,66 +229,52 @@ class CodeParserService:
         for node in ast.iter_child_nodes(tree):
             # Extract classes
             if isinstance(node, ast.ClassDef):
-                class_info = self._extract_class_info(node)
+                class_info = self._extract_class_info(node, slicer)
                 result["classes"].append(class_info)
             
             # Extract top-level functions
             elif isinstance(node, ast.FunctionDef):
-                func_info = self._extract_function_info(node)
+                func_info = self._extract_function_info(node, slicer)
                 result["functions"].append(func_info)
         
         return result
     
-    def _extract_class_info(self, node: ast.ClassDef) -> Dict[str, Any]:
+    def _extract_class_info(self, node: ast.ClassDef, slicer: SourceSlicer) -> Dict[str, Any]:
         """Extract information from a class definition."""
+        start_byte, end_byte = slicer.span(node)
         class_info = {
             "name": node.name,
             "line": node.lineno,
-            "end_line": self._get_end_line(node),
+            "end_line": node.end_lineno,
             "methods": [],
             "docstring": ast.get_docstring(node) or "",
             "bases": [self._get_name(base) for base in node.bases],
-            "code": self._extract_code(node)  # Extract the class code
+            "start_byte": start_byte,  # Code range in the file content
+            "end_byte": end_byte
         }
         
         # Extract methods and class variables
         for item in node.body:
             if isinstance(item, ast.FunctionDef):
-                method_info = self._extract_function_info(item)
+                method_info = self._extract_function_info(item, slicer)
                 class_info["methods"].append(method_info)
         
         return class_info
     
-    def _extract_function_info(self, node: ast.FunctionDef) -> Dict[str, Any]:
+    def _extract_function_info(self, node: ast.FunctionDef, slicer: SourceSlicer) -> Dict[str, Any]:
         """Extract information from a function definition."""
+        start_byte, end_byte = slicer.span(node)
         return {
             "name": node.name,
             "line": node.lineno,
-            "end_line": self._get_end_line(node),
+            "end_line": node.end_lineno,
             "args": self._extract_args(node.args),
             "docstring": ast.get_docstring(node) or "",
             "decorators": [self._get_name(d) for d in node.decorator_list],
-            "code": self._extract_code(node)  # Extract the function code
+            "start_byte": start_byte,  # Code range in the file content
+            "end_byte": end_byte
         }
     
-    def _extract_code(self, node: ast.AST) -> str:
-        """Extract the source code from a node."""
-        try:
-            # Method 1: Use astor to convert AST back to source
-            return astor.to_source(node)
-        except Exception:
-            try:
-                # Method 2: Extract from original file lines
-                start_line = node.lineno - 1  # Convert to 0-indexed
-                end_line = self._get_end_line(node)
-                
-                if hasattr(self, 'file_lines') and len(self.file_lines) >= end_line:
-                    code_lines = self.file_lines[start_line:end_line]
-                    return '\n'.join(code_lines)
-                return "# Code extraction failed"
-            except Exception as e:
-                return f"# Code extraction error: {str(e)}"
-    
     def _extract_args(self, args: ast.arguments) -> List[str]:
         """Extract function arguments."""
         arg_list = []
@@ -207,11 +297,6 @@ class CodeParserService:
             
         return arg_list
     
-    def _get_end_line(self, node: ast.AST) -> int:
-        """Get the end line of a node."""
-        return max(getattr(node, 'lineno', 0), 
-                  max([self._get_end_line(child) for child in ast.iter_child_nodes(node)], default=0))
-    
     def _get_name(self, node: ast.AST) -> str:
         """Extract the name from a node."""
         if isinstance(node, ast.Name):
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent calls.
+
+    The first caller for a key starts the work as a shared task; callers
+    arriving while it is in flight await the same task instead of starting
+    their own. Results and exceptions are delivered to every waiter. The
+    shared task is cancelled only when all of its waiters are cancelled, and
+    the registry entry is removed as soon as the task finishes.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self.calls: Dict[Hashable, Dict[str, Any]] = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key among concurrent callers.
+
+        Args:
+            key: Identity of the call (e.g. a code hash)
+            fn: Zero-argument coroutine function doing the actual work
+
+        Returns:
+            The shared result of fn
+        """
+        call = self.calls.get(key)
+        if call is None:
+            task = asyncio.create_task(fn())
+            call = {"task": task, "waiters": 0}
+            self.calls[key] = call
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["followers"] += 1
+            logger.debug(f"Joining in-flight call for {key}")
+
+        call["waiters"] += 1
+        try:
+            # Shield so one waiter's cancellation does not cancel the others
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                call["task"].cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        """Remove a finished call from the registry."""
+        call = self.calls.get(key)
+        if call is not None and call["task"] is task:
+            del self.calls[key]
+        # Retrieve the exception so unobserved failures are not logged as warnings
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self.calls)
@@ -1,127 +1,375 @@
 import logging
-from typing import Dict, Any, Optional
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
 from functools import lru_cache
-import time
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+
+from utils.db import get_db
 
 logger = logging.getLogger(__name__)
 
+load_dotenv()
+
+# Durable task queue configuration
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "60"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_RETRY_DELAY = float(os.getenv("TASK_RETRY_DELAY", "5"))  # Doubles with every attempt
+TASK_RETENTION_SECONDS = int(os.getenv("TASK_RETENTION_SECONDS", "3600"))  # TTL of finished tasks
+
 class TaskStatus:
     """Task status constants"""
     PENDING = "pending"
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    DEAD_LETTER = "dead_letter"  # Retries exhausted; kept for inspection
 
 class TaskQueue:
     """
-    Simple in-memory task queue for tracking background documentation tasks.
+    Durable task queue backed by the "tasks" MongoDB collection.
+
+    Workers claim tasks atomically with find_one_and_update and hold them
+    under a lease they renew with heartbeats. A task whose lease expires
+    (its worker crashed or was restarted) becomes claimable again. Every
+    claim counts as an attempt; failed tasks are retried with exponential
+    delay until max_attempts, then dead-lettered. Finished tasks get an
+    expires_at date and are removed by a TTL index.
     """
-    
-    def __init__(self):
-        """Initialize an empty task queue"""
-        self.tasks = {}
-    
-    def add_task(self, task_id: str, description: str) -> Dict[str, Any]:
+
+    def __init__(self, collection_name: str = "tasks"):
+        """Initialize the queue on a collection"""
+        self.collection_name = collection_name
+
+    def _collection(self):
+        """Get the backing collection"""
+        database = get_db()
+        if database is None:
+            raise RuntimeError("Database is not connected")
+        return database[self.collection_name]
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _format(task: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Convert a stored task into its API form"""
+        if task is None:
+            return None
+        task = dict(task)
+        task["task_id"] = str(task.pop("_id"))
+        return task
+
+    async def add_task(
+        self,
+        task_type: str,
+        payload: Dict[str, Any],
+        description: str,
+        owner_id: Optional[str] = None,
+        max_attempts: int = TASK_MAX_ATTEMPTS
+    ) -> Dict[str, Any]:
         """
         Add a new task to the queue
-        
+
         Args:
-            task_id: Unique identifier for the task
+            task_type: Which handler runs the task
+            payload: Handler arguments
             description: Description of the task
-            
+            owner_id: Optional ID of the user who started the task
+            max_attempts: Claims allowed before the task is dead-lettered
+
         Returns:
             Task data dictionary
         """
-        self.tasks[task_id] = {
-            "task_id": task_id,
+        now = self._now()
+        task = {
+            "_id": ObjectId(),
+            "task_type": task_type,
+            "payload": payload,
             "status": TaskStatus.PENDING,
             "description": description,
+            "owner_id": owner_id,
+            "progress": {},
+            "completed_file_ids": [],  # Per-file checkpoints
             "result": None,
             "error": None,
-            "created_at": time.time(),
-            "updated_at": time.time()
+            "attempts": 0,
+            "max_attempts": max(1, max_attempts),
+            "available_at": now,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "expires_at": None,
+            "created_at": now,
+            "updated_at": now
         }
-        return self.tasks[task_id]
-    
-    def update_task(self, task_id: str, status: str, result: Any = None, error: str = None) -> Optional[Dict[str, Any]]:
+        await self._collection().insert_one(task)
+        return self._format(task)
+
+    async def claim_task(self, worker_id: str, lease_seconds: float = TASK_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest runnable task
+
+        Runnable tasks are pending tasks whose retry delay has passed and
+        processing tasks whose lease expired.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: How long the claim is valid without a heartbeat
+
+        Returns:
+            The claimed task, or None if nothing is runnable
+        """
+        collection = self._collection()
+
+        while True:
+            now = self._now()
+            task = await collection.find_one_and_update(
+                {"$or": [
+                    {"status": TaskStatus.PENDING, "available_at": {"$lte": now}},
+                    {"status": TaskStatus.PROCESSING, "lease_expires_at": {"$lt": now}}
+                ]},
+                {
+                    "$set": {
+                        "status": TaskStatus.PROCESSING,
+                        "lease_owner": worker_id,
+                        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if task is None:
+                return None
+
+            if task["attempts"] <= task["max_attempts"]:
+                if task["attempts"] > 1:
+                    logger.info(f"Resuming task {task['_id']} (attempt {task['attempts']}/{task['max_attempts']})")
+                return self._format(task)
+
+            # A task whose worker keeps dying is not retried forever
+            logger.error(f"Task {task['_id']} dead-lettered after {task['max_attempts']} attempts")
+            await collection.update_one(
+                {"_id": task["_id"]},
+                {"$set": {
+                    "status": TaskStatus.DEAD_LETTER,
+                    "error": task.get("error") or "Lease expired too many times",
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "updated_at": now
+                }}
+            )
+
+    async def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float = TASK_LEASE_SECONDS) -> bool:
+        """
+        Extend a task's lease
+
+        Args:
+            task_id: The task being worked on
+            worker_id: The worker holding the lease
+            lease_seconds: New lease length from now
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        now = self._now()
+        result = await self._collection().update_one(
+            {"_id": ObjectId(task_id), "lease_owner": worker_id, "status": TaskStatus.PROCESSING},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}}
+        )
+        return result.matched_count == 1
+
+    async def update_progress(self, task_id: str, worker_id: str, progress: Dict[str, Any]) -> bool:
+        """
+        Store a task's progress record
+
+        Args:
+            task_id: The task to update
+            worker_id: The worker holding the lease
+            progress: The new progress record
+
+        Returns:
+            False if the lease was lost
+        """
+        result = await self._collection().update_one(
+            {"_id": ObjectId(task_id), "lease_owner": worker_id},
+            {"$set": {"progress": progress, "updated_at": self._now()}}
+        )
+        return result.matched_count == 1
+
+    async def checkpoint_file(self, task_id: str, worker_id: str, file_id: str, progress: Dict[str, Any]) -> bool:
+        """
+        Record a finished file so a resumed task does not redo it
+
+        Args:
+            task_id: The task to update
+            worker_id: The worker holding the lease
+            file_id: The file that was completed
+            progress: The new progress record
+
+        Returns:
+            False if the lease was lost
         """
-        Update the status of a task
-        
+        result = await self._collection().update_one(
+            {"_id": ObjectId(task_id), "lease_owner": worker_id},
+            {
+                "$addToSet": {"completed_file_ids": file_id},
+                "$set": {"progress": progress, "updated_at": self._now()}
+            }
+        )
+        return result.matched_count == 1
+
+    async def complete_task(self, task_id: str, worker_id: str, result: Any = None) -> bool:
+        """
+        Mark a task as completed
+
         Args:
             task_id: The task to update
-            status: New status (use TaskStatus constants)
-            result: Optional result data for completed tasks
-            error: Optional error message for failed tasks
-            
+            worker_id: The worker holding the lease
+            result: Result data of the task
+
+        Returns:
+            False if the lease was lost
+        """
+        now = self._now()
+        update = await self._collection().update_one(
+            {"_id": ObjectId(task_id), "lease_owner": worker_id},
+            {"$set": {
+                "status": TaskStatus.COMPLETED,
+                "result": result,
+                "error": None,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "expires_at": now + timedelta(seconds=TASK_RETENTION_SECONDS),
+                "updated_at": now
+            }}
+        )
+        return update.matched_count == 1
+
+    async def fail_task(self, task_id: str, worker_id: str, error: str, retryable: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt
+
+        Retryable failures go back to pending with an exponential delay
+        until the task runs out of attempts and is dead-lettered.
+        Non-retryable failures (bad input) fail the task right away.
+
+        Args:
+            task_id: The task that failed
+            worker_id: The worker holding the lease
+            error: Error message
+            retryable: Whether another attempt could succeed
+
+        Returns:
+            The task's new status, or None if the lease was lost
+        """
+        collection = self._collection()
+        task = await collection.find_one({"_id": ObjectId(task_id), "lease_owner": worker_id})
+        if task is None:
+            return None
+
+        now = self._now()
+        update = {
+            "error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "updated_at": now
+        }
+
+        if retryable and task["attempts"] < task["max_attempts"]:
+            delay = TASK_RETRY_DELAY * (2 ** (task["attempts"] - 1))
+            update.update({"status": TaskStatus.PENDING, "available_at": now + timedelta(seconds=delay)})
+        elif retryable:
+            update["status"] = TaskStatus.DEAD_LETTER
+        else:
+            update.update({
+                "status": TaskStatus.FAILED,
+                "expires_at": now + timedelta(seconds=TASK_RETENTION_SECONDS)
+            })
+
+        await collection.update_one({"_id": task["_id"], "lease_owner": worker_id}, {"$set": update})
+        return update["status"]
+
+    async def release_task(self, task_id: str, worker_id: str) -> bool:
+        """
+        Give a claimed task back without counting the attempt (used on shutdown)
+
+        Args:
+            task_id: The task to release
+            worker_id: The worker holding the lease
+
         Returns:
-            Updated task data dictionary or None if task not found
-        """
-        if task_id in self.tasks:
-            self.tasks[task_id]["status"] = status
-            self.tasks[task_id]["updated_at"] = time.time()
-            
-            if result is not None:
-                self.tasks[task_id]["result"] = result
-                
-            if error is not None:
-                self.tasks[task_id]["error"] = error
-                
-            return self.tasks[task_id]
-        return None
-    
-    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+            False if the lease was already lost
+        """
+        now = self._now()
+        result = await self._collection().update_one(
+            {"_id": ObjectId(task_id), "lease_owner": worker_id, "status": TaskStatus.PROCESSING},
+            {
+                "$set": {
+                    "status": TaskStatus.PENDING,
+                    "available_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": -1}
+            }
+        )
+        return result.matched_count == 1
+
+    async def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         Get the current state of a task
-        
+
         Args:
             task_id: The task to retrieve
-            
+
         Returns:
             Task data dictionary or None if not found
         """
-        return self.tasks.get(task_id)
-    
-    def list_tasks(self, limit: int = 100, skip: int = 0) -> list:
+        if not ObjectId.is_valid(task_id):
+            return None
+        return self._format(await self._collection().find_one({"_id": ObjectId(task_id)}))
+
+    async def count_by_status(self) -> Dict[str, int]:
+        """
+        Count tasks by status
+
+        Returns:
+            Dictionary of status to task count, including statuses with no tasks
+        """
+        counts = {
+            status: 0 for status in (
+                TaskStatus.PENDING, TaskStatus.PROCESSING, TaskStatus.COMPLETED,
+                TaskStatus.FAILED, TaskStatus.DEAD_LETTER
+            )
+        }
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        for group in await self._collection().aggregate(pipeline).to_list(length=None):
+            counts[group["_id"]] = group["count"]
+        return counts
+
+    async def list_tasks(self, limit: int = 100, skip: int = 0, owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get a list of tasks
-        
+
         Args:
             limit: Maximum number of tasks to return
             skip: Number of tasks to skip
-            
+            owner_id: Only return tasks of this user
+
         Returns:
             List of task dictionaries
         """
-        task_list = list(self.tasks.values())
+        query = {"owner_id": owner_id} if owner_id else {}
         # Sort by created_at descending (newest first)
-        task_list.sort(key=lambda x: x.get("created_at", 0), reverse=True)
-        return task_list[skip:skip+limit]
-    
-    def clear_completed_tasks(self, max_age: int = 3600) -> int:
-        """
-        Clear completed or failed tasks that are older than max_age seconds
-        
-        Args:
-            max_age: Maximum age in seconds to keep completed tasks
-            
-        Returns:
-            Number of tasks cleared
-        """
-        current_time = time.time()
-        count = 0
-        
-        for task_id in list(self.tasks.keys()):
-            task = self.tasks[task_id]
-            status = task.get("status")
-            updated_at = task.get("updated_at", 0)
-            
-            # Remove completed or failed tasks that are older than max_age
-            if status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-                if current_time - updated_at > max_age:
-                    del self.tasks[task_id]
-                    count += 1
-                    
-        return count
+        cursor = self._collection().find(query).sort("created_at", -1).skip(skip).limit(limit)
+        return [self._format(task) for task in await cursor.to_list(length=limit)]
 
 # Create a singleton task queue
 task_queue = TaskQueue()
@@ -130,4 +378,4 @@ task_queue = TaskQueue()
 @lru_cache(maxsize=1)
 def get_task_queue():
     """Get the global task queue instance"""
-    return task_queue
\ No newline at end of file
+    return task_queue
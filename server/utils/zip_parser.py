@@ -1,3 +1,4 @@
+import asyncio
 import os
 import zipfile
 import tempfile
@@ -10,7 +11,8 @@ from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from bson import ObjectId
 from model.File import FileUploadInfo, FileModel
-from utils.parser import CodeParserService
+from utils.parser import decode_source
+from utils.parse_cache import ParseCache, get_parse_cache
 
 logger = logging.getLogger(__name__)
 
@@ -72,10 +74,9 @@ async def extract_and_process_zip(zip_file: UploadFile, project_id: str, db) ->
         # Find the actual project root
         root_dir = find_project_root(temp_dir)
         
-        # Initialize parser
-        code_parser = CodeParserService()
-        
-        # Process each Python file
+        # Read every Python file first, so they can be parsed concurrently
+        candidates = []
+        seen_names = set()
         for root, dirs, files in os.walk(root_dir):
             # Skip excluded directories
             dirs[:] = [d for d in dirs if d not in DEFAULT_EXCLUDED_FOLDERS]
@@ -85,8 +86,8 @@ async def extract_and_process_zip(zip_file: UploadFile, project_id: str, db) ->
                     file_path = os.path.join(root, file)
                     relative_path = os.path.relpath(file_path, root_dir)
                     
-                    # Skip if file already exists in project
-                    existing_file = await db.files.find_one({
+                    # Skip if file already exists in project (or earlier in this ZIP)
+                    existing_file = file in seen_names or await db.files.find_one({
                         "project_id": ObjectId(project_id),
                         "file_name": file
                     })
@@ -96,68 +97,72 @@ async def extract_and_process_zip(zip_file: UploadFile, project_id: str, db) ->
                         continue
                     
                     try:
-                        # Read file content
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
+                        # Read file content once; it is parsed from memory
+                        with open(file_path, 'rb') as f:
+                            raw_content = f.read()
+                        content = decode_source(raw_content)
                         
                         # Validate content size
-                        content_size = len(content.encode('utf-8'))
+                        content_size = len(raw_content)
                         if content_size > FileModel.MAX_FILE_SIZE:
                             logger.warning(f"File {file} too large ({content_size} bytes), skipping")
                             continue
                         
-                        # Parse structure
-                        try:
-                            structure = code_parser.parse_file(file_path)
-                            processed = True
-                        except Exception as parse_error:
-                            logger.warning(f"Could not parse {file}: {str(parse_error)}")
-                            structure = {
-                                "file_name": file,
-                                "error": f"Parse error: {str(parse_error)}",
-                                "classes": [],
-                                "functions": [],
-                            }
-                            processed = False
-                        
-                        # Create file document with content in database
-                        file_doc = FileModel(
-                            project_id=ObjectId(project_id),
-                            file_name=file,
-                            content=content,  # Store in database
-                            content_type="text/x-python",
-                            size=content_size,
-                            relative_path=relative_path,
-                            processed=processed,
-                            structure=(
-                                structure.model_dump() if hasattr(structure, 'model_dump') 
-                                else structure if isinstance(structure, dict)
-                                else structure.dict() if hasattr(structure, 'dict')
-                                else {}
-                            ),
-                            # No file_path - database-only storage
-                        )
-                        
-                        # Save to database
-                        result = await db.files.insert_one(file_doc.model_dump(by_alias=True))
-                        
-                        file_metadata_list.append(FileUploadInfo(
-                            file_name=file,
-                            file_path=relative_path,  # Keep for response info
-                            size=content_size,
-                            processed=processed,
-                        ))
-                        
-                        logger.info(f"Successfully processed file: {file}")
-                        
-                    except UnicodeDecodeError:
-                        logger.warning(f"File {file} is not valid UTF-8, skipping")
+                        seen_names.add(file)
+                        candidates.append((file, relative_path, content, content_size))
+                    except (UnicodeDecodeError, SyntaxError):
+                        # SyntaxError: the coding cookie names an unknown encoding
+                        logger.warning(f"File {file} could not be decoded, skipping")
                         continue
                     except Exception as e:
-                        logger.error(f"Error processing file {file}: {str(e)}")
+                        logger.error(f"Error reading file {file}: {str(e)}")
                         # Continue with other files
                         continue
         
+        # Parse structures; identical files share one parse through the parse cache
+        parse_cache = get_parse_cache()
+        parsed = await asyncio.gather(*(
+            parse_zip_file(parse_cache, content, file)
+            for file, _, content, _ in candidates
+        ))
+        
+        for (file, relative_path, content, content_size), (structure, processed) in zip(candidates, parsed):
+            try:
+                # Create file document with content in database
+                file_doc = FileModel(
+                    project_id=ObjectId(project_id),
+                    file_name=file,
+                    content=content,  # Store in database
+                    content_type="text/x-python",
+                    size=content_size,
+                    relative_path=relative_path,
+                    processed=processed,
+                    structure=(
+                        structure.model_dump() if hasattr(structure, 'model_dump') 
+                        else structure if isinstance(structure, dict)
+                        else structure.dict() if hasattr(structure, 'dict')
+                        else {}
+                    ),
+                    # No file_path - database-only storage
+                )
+                
+                # Save to database
+                result = await db.files.insert_one(file_doc.model_dump(by_alias=True))
+                
+                file_metadata_list.append(FileUploadInfo(
+                    file_name=file,
+                    file_path=relative_path,  # Keep for response info
+                    size=content_size,
+                    processed=processed,
+                ))
+                
+                logger.info(f"Successfully processed file: {file}")
+                
+            except Exception as e:
+                logger.error(f"Error processing file {file}: {str(e)}")
+                # Continue with other files
+                continue
+        
         if not file_metadata_list:
             raise HTTPException(
                 status_code=400,
@@ -183,6 +188,24 @@ async def extract_and_process_zip(zip_file: UploadFile, project_id: str, db) ->
             except Exception as cleanup_e:
                 logger.warning(f"Could not clean up temp directory {temp_dir}: {str(cleanup_e)}")
 
+async def parse_zip_file(parse_cache: ParseCache, content: str, file: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse one file from a ZIP archive.
+    
+    Returns:
+        Tuple of (structure, processed); failures give an error structure
+    """
+    try:
+        return await parse_cache.parse(content, file), True
+    except Exception as parse_error:
+        logger.warning(f"Could not parse {file}: {str(parse_error)}")
+        return {
+            "file_name": file,
+            "error": f"Parse error: {str(parse_error)}",
+            "classes": [],
+            "functions": [],
+        }, False
+
 def find_project_root(extract_dir: str) -> str:
     """
     Find the actual project root in the extracted directory.
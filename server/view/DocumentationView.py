@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from controller.DocumentationController import (
     generate_docstring_for_code,
     document_file_functions,
     document_project_functions,
     get_file_documentation_data,
     get_project_documentation_data,
-    export_file_documentation_content
+    export_file_documentation_content,
+    get_docstring_cache_stats,
+    get_inference_status,
+    invalidate_docstring_cache,
+    stream_documentation
 )
+from controller.TaskController import start_project_documentation_task
 from model.Documentation import (
     DocstringRequest,
     DocstringResponse,
@@ -15,11 +20,16 @@ from model.Documentation import (
     FileDocumentationResponse,
     ProjectDocumentationRequest,
     ProjectDocumentationResponse,
-    DocumentedItem
+    DocumentedItem,
+    DocstringCacheStats,
+    DocstringCacheInvalidationResponse,
+    InferenceStatusResponse
 )
+from model.Task import TaskSubmissionResponse
 from utils.auth import get_current_user
 from utils.db import get_db
 from bson import ObjectId
+from typing import Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,14 +37,39 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Media types of the streaming documentation endpoints
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
 @router.post("/docs/generate", response_model=DocstringResponse)
 async def generate_docstring(
     request: DocstringRequest,
+    draft: bool = Query(default=False, description="Return a local draft at once if the model result is not cached yet"),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """Generate a docstring for a code snippet."""
-    return await generate_docstring_for_code(request)
+    return await generate_docstring_for_code(request, draft=draft)
+
+@router.get("/docs/inference/status", response_model=InferenceStatusResponse)
+async def inference_status(current_user = Depends(get_current_user)):
+    """Get the active backend, the endpoint health state and the current concurrency limit."""
+    return get_inference_status()
+
+@router.get("/docs/cache/stats", response_model=DocstringCacheStats)
+async def docstring_cache_stats(current_user = Depends(get_current_user)):
+    """Get hit/miss counters of the docstring cache."""
+    return get_docstring_cache_stats()
+
+@router.delete("/docs/cache", response_model=DocstringCacheInvalidationResponse)
+async def clear_docstring_cache(
+    model_id: Optional[str] = Query(default=None, description="Model version to invalidate (defaults to the current model)"),
+    current_user = Depends(get_current_user)
+):
+    """Invalidate cached docstrings for a model version."""
+    return await invalidate_docstring_cache(model_id)
 
 @router.post("/files/{file_id}/document", response_model=FileDocumentationResponse)
 async def document_file(
@@ -48,18 +83,53 @@ async def document_file(
     # await verify_file_owner(file_id, current_user["_id"], db)
     return await document_file_functions(file_id, options, db)
 
-@router.post("/projects/{project_id}/document", response_model=ProjectDocumentationResponse)
+@router.post("/projects/{project_id}/document", response_model=Union[ProjectDocumentationResponse, TaskSubmissionResponse])
 async def document_project(
     project_id: str,
+    response: Response,
     options: ProjectDocumentationRequest = None,
+    run_async: bool = Query(default=False, alias="async", description="Run in the background and return a task ID to poll at /tasks/{task_id}"),
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """Generate documentation for all files in a project."""
     # TODO: Add project ownership verification
     # await verify_project_owner(project_id, current_user["_id"], db)
+    if run_async:
+        response.status_code = 202
+        return await start_project_documentation_task(project_id, options, current_user, db)
     return await document_project_functions(project_id, options, db)
 
+@router.post("/files/{file_id}/document/stream")
+async def document_file_stream(
+    file_id: str,
+    options: FileDocumentationRequest = None,
+    format: str = Query(default="ndjson", regex="^(ndjson|sse)$"),
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Generate documentation for a file, streaming each item as it completes."""
+    events = await stream_documentation(
+        lambda on_event: document_file_functions(file_id, options, db, on_event=on_event),
+        format
+    )
+    return StreamingResponse(events, media_type=STREAM_MEDIA_TYPES[format])
+
+@router.post("/projects/{project_id}/document/stream")
+async def document_project_stream(
+    project_id: str,
+    options: ProjectDocumentationRequest = None,
+    format: str = Query(default="ndjson", regex="^(ndjson|sse)$"),
+    current_user = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Generate documentation for a project, streaming each item as it completes."""
+    events = await stream_documentation(
+        lambda on_event: document_project_functions(project_id, options, db, on_event=on_event),
+        format
+    )
+    return StreamingResponse(events, media_type=STREAM_MEDIA_TYPES[format])
+
 @router.get("/files/{file_id}/documentation", response_model=FileDocumentationResponse)
 async def get_file_documentation(
     file_id: str,
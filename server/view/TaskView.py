@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from controller.TaskController import get_task_status
+from model.Task import TaskStatusResponse
+from utils.auth import get_current_user
+
+
+router = APIRouter()
+
+@router.get("/tasks/{task_id}", response_model=TaskStatusResponse)
+async def get_task(task_id: str, current_user = Depends(get_current_user)):
+    """Get the status and progress of a background documentation task."""
+    return await get_task_status(task_id, current_user)